@@ -0,0 +1,202 @@
+import argparse
+import sys
+from pathlib import Path
+
+from config.settings import ARCHETYPES
+
+def cmd_rate(args) -> int:
+    from service.batch import BatchRater, Checkpoint, CheckpointMismatch, read_names, write_output
+
+    names = read_names(Path(args.input))
+    if not names:
+        print("输入文件中没有球员姓名", file=sys.stderr)
+        return 1
+    output = Path(args.output)
+    sliders = {"isolation": args.isolation, "def_eye_test": args.def_eye, "clutch": args.clutch}
+    rater = BatchRater(args.archetype, sliders, season=args.season, workers=args.workers, chunk_size=args.chunk_size)
+    checkpoint = Checkpoint(Path(args.checkpoint) if args.checkpoint else output.with_name(output.name + ".ckpt.jsonl"),
+                            config=rater.config)
+    try:
+        df = rater.run(names, checkpoint)
+    except CheckpointMismatch as e:
+        print(f"[rate] {e}", file=sys.stderr)
+        return 1
+    write_output(df, output, table=args.table)
+    checkpoint.remove()
+    ok = int((df["STATUS"] == "ok").sum()) if not df.empty else 0
+    print(f"[rate] 完成: {ok}/{len(names)} 名球员已评级 -> {output}", file=sys.stderr)
+    return 0
+
+def cmd_comps(args) -> int:
+    from nba_api.stats.static import players
+    from data.comps import build_index
+    from data.feature_store import all_seasons
+    from data.synergy import current_season
+
+    first = int(args.first_season[:4])
+    index = build_index(all_seasons(first), workers=args.workers,
+                        progress=lambda season, rows: print(f"[comps] {season}: {rows} 个球员赛季", file=sys.stderr))
+    print(f"[comps] 索引完成: {index.stats()}", file=sys.stderr)
+    if not args.player:
+        return 0
+    found = players.find_players_by_full_name(args.player)
+    if not found:
+        print(f"找不到球员: {args.player}", file=sys.stderr)
+        return 1
+    try:
+        comps = index.query(found[0]["id"], args.season or current_season(), k=args.top, exclude_player=not args.same_player)
+    except KeyError as e:
+        print(e, file=sys.stderr)
+        return 1
+    cols = ["PLAYER_NAME", "SEASON", "TEAM_ABBREVIATION", "GP", "MIN", "SIMILARITY"]
+    print(comps[cols].to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+    return 0
+
+def cmd_backfill(args) -> int:
+    from data.feature_store import FEATURE_DIR, all_seasons, backfill
+
+    seasons = all_seasons(int(args.first_season[:4]))
+    if args.last_season:
+        seasons = [s for s in seasons if s <= args.last_season]
+    history = backfill(seasons, path=Path(args.path) if args.path else FEATURE_DIR, workers=args.workers,
+                       refresh=args.refresh,
+                       progress=lambda season, rows, source: print(f"[backfill] {season}: {rows} 行 ({source})",
+                                                                   file=sys.stderr))
+    size = history.matrix.nbytes / 1024 / 1024
+    print(f"[backfill] 完成: {len(history)} 个球员赛季, {len(history.seasons)} 个赛季, "
+          f"{len(history.schema)} 个特征, {size:.1f} MB -> {history.path}", file=sys.stderr)
+    return 0
+
+def cmd_team_backfill(args) -> int:
+    from data.feature_store import all_seasons
+    from data.synergy import current_season
+    from data.team_archive import TeamArchive, backfill_teams, get_team_archive
+
+    seasons = all_seasons(int(args.first_season[:4]))
+    if args.last_season:
+        seasons = [s for s in seasons if s <= args.last_season]
+    if not args.include_current:
+        seasons = [s for s in seasons if s != current_season()]
+    archive = TeamArchive(Path(args.path)) if args.path else get_team_archive()
+    backfill_teams(seasons, archive=archive, workers=args.workers, refresh=args.refresh,
+                   progress=lambda season, rows: print(f"[team-backfill] {season}: {rows}", file=sys.stderr))
+    size = sum(meta["bytes"] for meta in archive.index["seasons"].values()) / 1024 / 1024
+    print(f"[team-backfill] 完成: 已归档 {len(archive.seasons())} 个赛季, {size:.1f} MB -> {archive.path}",
+          file=sys.stderr)
+    return 0
+
+def cmd_logos(args) -> int:
+    from nba_api.stats.static import teams
+    from data.logos import LogoCache, get_logo_cache
+
+    cache = LogoCache(offline=args.offline) if args.offline else get_logo_cache()
+    if args.import_bundle:
+        print(f"[logos] 已导入 {cache.import_bundle(Path(args.import_bundle))} 个 Logo", file=sys.stderr)
+    status = cache.prefetch(t["abbreviation"] for t in teams.get_teams())
+    missing = [abbr for abbr, ok in status.items() if not ok]
+    print(f"[logos] 可用 {len(status) - len(missing)}/{len(status)}" + (f"，缺失: {', '.join(missing)}" if missing else ""),
+          file=sys.stderr)
+    if args.export_bundle:
+        print(f"[logos] 已打包 {cache.export_bundle(Path(args.export_bundle))} 个 Logo -> {args.export_bundle}",
+              file=sys.stderr)
+    return 1 if missing else 0
+
+def cmd_lineups(args) -> int:
+    import time
+    from nba_api.stats.static import players, teams
+    from data.lineups import get_lineup_store
+    from data.synergy import current_season
+
+    pids = []
+    for name in args.player or []:
+        found = players.find_players_by_full_name(name)
+        if not found:
+            print(f"找不到球员: {name}", file=sys.stderr)
+            return 1
+        pids.append(found[0]["id"])
+    team_id = None
+    if args.team:
+        found = teams.find_teams_by_full_name(args.team) or teams.find_team_by_abbreviation(args.team)
+        if not found:
+            print(f"找不到球队: {args.team}", file=sys.stderr)
+            return 1
+        team_id = found[0]["id"] if isinstance(found, list) else found["id"]
+    season = args.season or current_season()
+    index = get_lineup_store().season(season)
+    print(f"[lineups] {season}: {len(index)} 组阵容已加载", file=sys.stderr)
+    start = time.perf_counter()
+    result = index.query(players=pids, team_id=team_id, size=args.size, min_minutes=args.min_minutes,
+                         sort=args.sort, ascending=args.ascending, limit=args.top)
+    print(f"[lineups] 查询耗时 {(time.perf_counter() - start) * 1000:.2f} ms", file=sys.stderr)
+    cols = ["GROUP_NAME", "TEAM_ABBREVIATION", "GROUP_SIZE", "MIN", "OFF_RATING", "DEF_RATING", "NET_RATING"]
+    print(result[cols].to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="NBA Player Rater 命令行工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rate = sub.add_parser("rate", help="批量评级：一次下载联盟数据，向量化计算所有球员")
+    rate.add_argument("--input", required=True, help="球员名单文件，每行一个英文全名 (# 开头为注释)")
+    rate.add_argument("--output", default="ratings.csv", help="输出文件: .csv / .parquet / .db")
+    rate.add_argument("--archetype", choices=ARCHETYPES, default=ARCHETYPES[0])
+    rate.add_argument("--season", default=None, help="指定赛季 (如 2024-25)，默认当前赛季并回退上赛季")
+    rate.add_argument("--workers", type=int, default=4, help="并行下载/计算线程数")
+    rate.add_argument("--chunk-size", type=int, default=50, help="每批处理的球员数 (断点粒度)")
+    rate.add_argument("--checkpoint", default=None, help="断点文件路径，默认 <output>.ckpt.jsonl")
+    rate.add_argument("--table", default="batch_ratings", help="SQLite 输出的表名")
+    rate.add_argument("--isolation", type=int, default=75, help="硬解能力")
+    rate.add_argument("--def-eye", type=int, default=75, help="防守观感")
+    rate.add_argument("--clutch", type=int, default=75, help="关键属性")
+    rate.set_defaults(func=cmd_rate)
+
+    comps = sub.add_parser("comps", help="历史相似赛季：建立 (或增量加载) 索引并查询最相似的球员赛季")
+    comps.add_argument("--player", default=None, help="球员英文全名；省略时只构建/预热索引")
+    comps.add_argument("--season", default=None, help="球员赛季 (如 2015-16)，默认当前赛季")
+    comps.add_argument("--top", type=int, default=10, help="返回的相似赛季个数")
+    comps.add_argument("--same-player", action="store_true", help="结果中保留同一球员的其他赛季")
+    comps.add_argument("--first-season", default="1996-97", help="索引的起始赛季")
+    comps.add_argument("--workers", type=int, default=4, help="并行加载赛季的线程数")
+    comps.set_defaults(func=cmd_comps)
+
+    fill = sub.add_parser("backfill", help="离线回填历史球员赛季特征库 (float32 mmap，供各模块毫秒级加载)")
+    fill.add_argument("--first-season", default="1996-97", help="回填的起始赛季")
+    fill.add_argument("--last-season", default=None, help="回填的结束赛季，默认当前赛季")
+    fill.add_argument("--refresh", action="store_true", help="已入库的往季也重新拉取")
+    fill.add_argument("--path", default=None, help="特征库目录，默认 .cache/features")
+    fill.add_argument("--workers", type=int, default=4, help="并行拉取赛季的线程数")
+    fill.set_defaults(func=cmd_backfill)
+
+    team_fill = sub.add_parser("team-backfill", help="离线归档 1995-96 以来所有球队赛季 (基础/高阶/投篮分段/Synergy)")
+    team_fill.add_argument("--first-season", default="1995-96", help="归档的起始赛季")
+    team_fill.add_argument("--last-season", default=None, help="归档的结束赛季，默认最近一个已结束赛季")
+    team_fill.add_argument("--include-current", action="store_true", help="同时归档本赛季 (数据仍会变化)")
+    team_fill.add_argument("--refresh", action="store_true", help="已归档的赛季也重新拉取")
+    team_fill.add_argument("--path", default=None, help="归档目录，默认 .cache/team_archive")
+    team_fill.add_argument("--workers", type=int, default=8, help="每个赛季并发拉取的线程数")
+    team_fill.set_defaults(func=cmd_team_backfill)
+
+    logos = sub.add_parser("logos", help="预取 30 支球队 Logo 到本地缓存，可导入/导出离线包")
+    logos.add_argument("--export-bundle", default=None, help="预取后把缓存打包为 zip (离线包)")
+    logos.add_argument("--import-bundle", default=None, help="先导入离线包 zip，再检查缺失")
+    logos.add_argument("--offline", action="store_true", help="不联网，只检查本地缓存/离线包")
+    logos.set_defaults(func=cmd_logos)
+
+    lineups = sub.add_parser("lineups", help="全联盟 2/3/5 人阵容查询 (按球员组合/球队/分钟过滤并排序)")
+    lineups.add_argument("--player", action="append", help="必须同时在场的球员英文全名，可重复")
+    lineups.add_argument("--team", default=None, help="球队全名或缩写；省略时查询全联盟")
+    lineups.add_argument("--season", default=None, help="赛季 (如 2023-24)，默认当前赛季")
+    lineups.add_argument("--size", type=int, choices=[2, 3, 5], default=None, help="阵容人数，默认全部")
+    lineups.add_argument("--min-minutes", type=float, default=100, help="最少同场分钟")
+    lineups.add_argument("--sort", default="NET_RATING", help="排序指标 (NET_RATING / OFF_RATING / MIN ...)")
+    lineups.add_argument("--ascending", action="store_true", help="升序排列 (如 DEF_RATING)")
+    lineups.add_argument("--top", type=int, default=20, help="输出的阵容数")
+    lineups.set_defaults(func=cmd_lineups)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
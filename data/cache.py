@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+_MISSING = object()
+T = TypeVar("T")
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+class SingleFlight:
+    """同一个 key 同时只允许一次真实调用，并发到达的相同请求等待并共享这次结果"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]):
+        """返回 (结果, 是否复用了他人的在途请求)"""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "requests": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+class TTLCache:
+    """进程级线程安全缓存：同一进程内所有会话/请求共享一份数据。
+
+    get / get_or_load 返回缓存里的对象本身而不是副本：建在 TTLCache 上的各个仓库返回的表都是共享数据，
+    调用方不得原地修改 (需要时先 copy 或使用 rename/assign)。
+    """
+
+    def __init__(self, ttl: float = 3600, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, tuple] = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            if key in self._data:
+                del self._data[key]
+            elif len(self._data) >= self.maxsize:
+                # TTL 固定，插入顺序即过期顺序，淘汰最早写入的一项
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """未命中时同一个 key 只运行一次 loader，并发的调用方等待并拿到同一个对象"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def load():
+            # 排在上一轮发起者之后进来的调用方，缓存可能已经写好
+            with self._lock:
+                item = self._data.get(key)
+            if item is not None and item[0] >= time.monotonic():
+                return item[1]
+            value = loader()
+            self.set(key, value)
+            return value
+
+        return self._flight.do(key, load)[0]
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+        flight = self._flight.stats()
+        stats.update(loads=flight["requests"], coalesced=flight["coalesced"])
+        return stats
+
+def singleton(factory: Callable[[], T]) -> Callable[[], T]:
+    """进程级单例的 getter：首次调用时在锁内创建，之后所有线程/会话拿到同一个实例；创建失败下次重试"""
+    lock = threading.Lock()
+    instance = []
+
+    def get() -> T:
+        with lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+
+    return get
+
+def atomic_write(path: Path, write: Callable[[Path], Any]):
+    """write(tmp) 写同目录下的临时文件后 os.replace 到 path：读取方只会看到旧文件或完整的新文件。
+
+    临时文件名带进程号与线程号 (并发写互不覆盖)，并保留原后缀 (np.savez 会给不以 .npz 结尾的文件名追加后缀)。
+    """
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp{path.suffix}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
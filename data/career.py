@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from nba_api.stats.endpoints import PlayerDashboardByYearOverYear
+
+from data.cache import TTLCache
+from data.nba_client import fetch_frames
+from data.store import get_store
+from data.synergy import get_synergy_store
+from logic.rates import add_rate_columns
+
+SYNERGY_FIRST_SEASON = 2015
+TRACKING_FIRST_SEASON = 2013
+
+def _by_year(player_id: int, measure: str) -> pd.DataFrame:
+    df = fetch_frames(
+        PlayerDashboardByYearOverYear,
+        player_id=player_id,
+        measure_type_detailed=measure,
+        per_mode_detailed="Totals",
+        season_type_playoffs="Regular Season",
+    )[1]  # ByYearPlayerDashboard
+    if df.empty:
+        return df
+    df = df.rename(columns={"GROUP_VALUE": "SEASON"})
+    # 赛季中被交易时每支球队各一行 (另有合计行)，保留出场最多的一行即整季数据
+    df = df.sort_values("GP", ascending=False).drop_duplicates("SEASON")
+    return df.set_index("SEASON").sort_index()
+
+class CareerLoader:
+    """球员整个生涯的数据在后台一次性批量拉取并缓存。
+
+    Base/Advanced 由 PlayerDashboardByYearOverYear 各一次请求拿到全部赛季；
+    Synergy / Tracking 取自按赛季共享的联盟表 (data.synergy / data.store)，
+    其他球员的生涯加载也会复用。结果为只读共享数据。
+    """
+
+    def __init__(self, play_types: Iterable[str], tracking_ranges: Iterable[str], workers: int = 2,
+                 io_workers: int = 8, ttl: float = 6 * 3600):
+        self.play_types = list(play_types)
+        self.tracking_ranges = list(tracking_ranges)
+        self.careers = TTLCache(ttl=ttl, maxsize=256)
+        self._jobs = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="career")
+        self._io = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="career-io")
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, player_id: int) -> Dict:
+        base_f = self._io.submit(_by_year, player_id, "Base")
+        adv_f = self._io.submit(_by_year, player_id, "Advanced")
+        base, adv = base_f.result(), adv_f.result()
+        if not base.empty and "POSS" in adv.columns:
+            # 整段生涯一次性算好 Per 100 / Per 36 (官方逐季 POSS)
+            base = add_rate_columns(base.assign(POSS=adv["POSS"]))
+        seasons = list(base.index)
+
+        store, synergy = get_store(), get_synergy_store()
+        tables = {}
+        for season in seasons:
+            start_year = int(season[:4])
+            if start_year >= SYNERGY_FIRST_SEASON:
+                for pt in self.play_types:
+                    tables[("synergy", season, pt)] = self._io.submit(synergy.table, season, pt)
+            if start_year >= TRACKING_FIRST_SEASON:
+                for rng in self.tracking_ranges:
+                    tables[("tracking", season, rng)] = self._io.submit(store.player_pt_shot, season, rng)
+
+        career = {"player_id": player_id, "seasons": seasons, "base": base, "adv": adv,
+                  "synergy": {}, "tracking": {}}
+        for (kind, season, name), fut in tables.items():
+            try:
+                df = fut.result()
+            except Exception as e:
+                print(f"Career Table Error ({kind} {season} {name}): {e}")
+                continue
+            if kind == "synergy":
+                row = df.loc[player_id] if player_id in df.index else None
+            else:
+                rows = df[df["PLAYER_ID"] == player_id] if "PLAYER_ID" in df.columns else df.iloc[0:0]
+                row = rows.iloc[0] if not rows.empty else None
+            if row is not None:
+                career[kind].setdefault(season, {})[name] = row
+        return career
+
+    def _run(self, player_id: int) -> Dict:
+        try:
+            career = self._load(player_id)
+            self.careers.set(player_id, career)
+            return career
+        finally:
+            with self._lock:
+                self._pending.pop(player_id, None)
+
+    def submit(self, player_id: int) -> Future:
+        """提交后台预取；已缓存或正在加载时不会重复请求"""
+        with self._lock:
+            fut = self._pending.get(player_id)
+            if fut is not None:
+                return fut
+            career = self.careers.get(player_id)
+            if career is not None:
+                fut = Future()
+                fut.set_result(career)
+                return fut
+            fut = self._pending[player_id] = self._jobs.submit(self._run, player_id)
+            return fut
+
+    def ready(self, player_id: int) -> bool:
+        return self.careers.get(player_id) is not None
+
+    def get(self, player_id: int, timeout: Optional[float] = None) -> Dict:
+        return self.submit(player_id).result(timeout=timeout)
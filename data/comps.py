@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+from data.cache import CACHE_DIR, TTLCache, atomic_write, singleton
+from data.feature_store import all_seasons, get_feature_history, season_features
+from data.synergy import current_season
+from logic.similarity import KEY_COLS, SimilarityIndex, feature_columns, standardize_season
+
+# 出场时间过少的赛季噪声太大，不进入相似度索引
+MIN_MINUTES = 500
+
+class SeasonFeatureStore:
+    """每个赛季的相似度特征 (Per 100 + 高阶 + Synergy/Tracking 频率，赛季内标准化)。
+
+    往季优先读 data.feature_store 的 mmap 特征库，否则由联盟总表实时拼出；
+    结果落盘到 .cache/similarity：往季永久有效，本赛季按 ttl 过期后重新计算。
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR / "similarity", ttl: float = 6 * 3600):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.frames = TTLCache(ttl=ttl, maxsize=64)
+
+    def _path(self, season: str) -> Path:
+        return self.cache_dir / f"{season}.pkl"
+
+    def fresh(self, season: str) -> bool:
+        path = self._path(season)
+        if not path.exists():
+            return False
+        if season != current_season():
+            return True
+        return time.time() - path.stat().st_mtime < self.ttl
+
+    def _build(self, season: str) -> pd.DataFrame:
+        history = get_feature_history()
+        if history is not None and season in history and season != current_season():
+            raw = history.season(season)
+        else:
+            raw = season_features(season)
+        if raw.empty:
+            return pd.DataFrame(columns=KEY_COLS + feature_columns())
+        df = raw[pd.to_numeric(raw["MIN"], errors="coerce") >= MIN_MINUTES]
+        return standardize_season(df)
+
+    def _load(self, season: str) -> pd.DataFrame:
+        path = self._path(season)
+        if self.fresh(season):
+            try:
+                return pd.read_pickle(path)
+            except Exception:
+                pass
+        df = self._build(season)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, df.to_pickle)
+        return df
+
+    def season(self, season: str) -> pd.DataFrame:
+        return self.frames.get_or_load(season, lambda: self._load(season))
+
+def build_index(seasons: Optional[Iterable[str]] = None, workers: int = 4,
+                features: Optional[SeasonFeatureStore] = None,
+                progress: Optional[Callable[[str, int], None]] = None) -> SimilarityIndex:
+    """并发加载各赛季特征并建索引；progress(season, rows) 在每个赛季完成时回调"""
+    features = features or get_feature_store()
+    index = SimilarityIndex()
+    seasons = list(seasons or all_seasons())
+
+    def load(season):
+        # 单个赛季失败只跳过该赛季，不拖垮整个索引
+        try:
+            return features.season(season)
+        except Exception as e:
+            print(f"Warning: {season} 相似度特征获取失败: {e}")
+            return None
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for season, df in zip(seasons, pool.map(load, seasons)):
+            if df is None:
+                continue
+            frames.append(df)
+            if progress:
+                progress(season, len(df))
+    frames = [df for df in frames if not df.empty]
+    if frames:
+        index.upsert(pd.concat(frames, ignore_index=True))
+    return index
+
+def refresh_current(index: SimilarityIndex, features: Optional[SeasonFeatureStore] = None) -> bool:
+    """本赛季特征过期时重新计算并增量写入索引，返回是否发生了更新"""
+    features = features or get_feature_store()
+    season = current_season()
+    if features.fresh(season) and season in index.seasons():
+        return False
+    index.upsert(features.season(season))
+    return True
+
+get_feature_store = singleton(SeasonFeatureStore)
+_INDEX: Optional[SimilarityIndex] = None
+_BUILD: Optional[Future] = None
+_LOCK = threading.Lock()
+
+def get_similarity_index() -> SimilarityIndex:
+    """进程级索引：首次调用时构建 (往季读磁盘缓存)，之后只增量刷新本赛季。
+
+    构建在锁外进行，并发的调用方等待同一个 Future，而不是排队占着全局锁。
+    """
+    global _INDEX, _BUILD
+    features = get_feature_store()
+    with _LOCK:
+        index, build, owner = _INDEX, _BUILD, False
+        if index is None and build is None:
+            build = _BUILD = Future()
+            owner = True
+    if index is None and owner:
+        try:
+            index = build_index(features=features)
+        except BaseException as e:
+            with _LOCK:
+                _BUILD = None
+            build.set_exception(e)
+            raise
+        with _LOCK:
+            _INDEX, _BUILD = index, None
+        build.set_result(index)
+        return index
+    if index is None:
+        return build.result()
+    refresh_current(index, features)
+    return index
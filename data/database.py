@@ -45,4 +45,22 @@ def get_player_history(name: str, limit: int = 7):
     )
     rows = cur.fetchall()
     conn.close()
-    return rows
\ No newline at end of file
+    return rows
+
+def get_leaderboard(limit: int = 20, archetype: str = None):
+    conn = _get_conn()
+    cur = conn.cursor()
+    sql = (
+        "SELECT player_name, archetype, ovr_score, created_at FROM ratings_history r "
+        "WHERE id = (SELECT MAX(id) FROM ratings_history WHERE player_name = r.player_name AND archetype = r.archetype)"
+    )
+    params = []
+    if archetype:
+        sql += " AND archetype = ?"
+        params.append(archetype)
+    sql += " ORDER BY ovr_score DESC, created_at DESC LIMIT ?"
+    params.append(limit)
+    cur.execute(sql, params)
+    rows = cur.fetchall()
+    conn.close()
+    return rows
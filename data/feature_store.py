@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.cache import CACHE_DIR
+from data.career import SYNERGY_FIRST_SEASON, TRACKING_FIRST_SEASON
+from data.store import get_store
+from data.synergy import current_season, get_synergy_store
+from logic.rates import rate_columns
+from logic.similarity import SYNERGY_FEATURES, TRACKING_FEATURES
+
+FIRST_SEASON = 1996
+FEATURE_DIR = CACHE_DIR / "features"
+ADVANCED_COLS = ["TS_PCT", "EFG_PCT", "USG_PCT", "AST_PCT", "OREB_PCT", "DREB_PCT", "REB_PCT",
+                 "FG3_PCT", "FT_PCT", "PIE", "PACE", "NET_RATING"]
+# 固定特征表结构：列顺序即矩阵列号，改动时需重新 backfill (SCHEMA_VERSION 加一)
+FEATURE_SCHEMA = ["AGE", "GP", "MIN", "POSS"] + rate_columns() + ADVANCED_COLS + \
+                 list(SYNERGY_FEATURES.values()) + list(TRACKING_FEATURES.values())
+SCHEMA_VERSION = 1
+INDEX_DTYPE = np.dtype([("PLAYER_ID", "i8"), ("SEASON", "i2"), ("TEAM_ABBREVIATION", "U3")])
+
+def season_label(start_year: int) -> str:
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+def all_seasons(first: int = FIRST_SEASON) -> List[str]:
+    last = int(current_season()[:4])
+    return [season_label(y) for y in range(first, last + 1)]
+
+def season_features(season: str) -> pd.DataFrame:
+    """实时拼出一个赛季全部球员的原始特征 (未标准化、不过滤出场时间)，列为 FEATURE_SCHEMA"""
+    store, synergy = get_store(), get_synergy_store()
+    rates = store.player_rates(season, "Totals")
+    keys = ["PLAYER_ID", "PLAYER_NAME", "TEAM_ABBREVIATION"]
+    if rates.empty:
+        return pd.DataFrame(columns=keys + ["SEASON"] + FEATURE_SCHEMA)
+    df = rates.assign(SEASON=season)
+    start_year = int(season[:4])
+    extra = {}
+    if start_year >= SYNERGY_FIRST_SEASON:
+        for play_type, col in SYNERGY_FEATURES.items():
+            table = synergy.table(season, play_type)
+            if "POSS_PCT" in table.columns:
+                extra[col] = df["PLAYER_ID"].map(table["POSS_PCT"])
+    if start_year >= TRACKING_FIRST_SEASON:
+        for general_range, col in TRACKING_FEATURES.items():
+            table = store.player_pt_shot(season, general_range)
+            if "FGA_FREQUENCY" in table.columns:
+                freq = table.drop_duplicates("PLAYER_ID").set_index("PLAYER_ID")["FGA_FREQUENCY"]
+                extra[col] = df["PLAYER_ID"].map(freq)
+    return df.assign(**extra).reindex(columns=keys + ["SEASON"] + FEATURE_SCHEMA)
+
+class HistoricalFeatureStore:
+    """1996 年以来所有球员赛季的只读特征库。
+
+    features.npy 为 float32 矩阵 (行 = 球员赛季，列 = FEATURE_SCHEMA)，以 mmap 只读打开，
+    多进程共享同一份页缓存；index.npy 为每行的 (PLAYER_ID, 赛季起始年, 球队)；
+    meta.json 记录结构版本、赛季列表与行偏移 (同赛季的行连续存放) 以及球员姓名。
+    由 backfill() 离线生成，加载只读文件头，毫秒级完成。
+    """
+
+    def __init__(self, path: Path = FEATURE_DIR):
+        self.path = path
+        self.mtime = (path / "meta.json").stat().st_mtime
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("schema_version") != SCHEMA_VERSION or meta.get("schema") != FEATURE_SCHEMA:
+            raise ValueError(f"特征库结构版本不匹配，请重新执行 backfill: {path}")
+        self.meta = meta
+        self.schema: List[str] = meta["schema"]
+        self.seasons: List[str] = meta["seasons"]
+        self.offsets = np.asarray(meta["offsets"], dtype=np.int64)
+        self.names: Dict[int, str] = {int(k): v for k, v in meta["names"].items()}
+        self.matrix = np.load(path / "features.npy", mmap_mode="r")
+        self.index = np.load(path / "index.npy", mmap_mode="r")
+        self._season_pos = {season: i for i, season in enumerate(self.seasons)}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, season: str) -> bool:
+        return season in self._season_pos
+
+    def season_slice(self, season: str) -> slice:
+        i = self._season_pos[season]
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def _frame(self, rows) -> pd.DataFrame:
+        index = self.index[rows]
+        df = pd.DataFrame(np.asarray(self.matrix[rows]), columns=self.schema)
+        ids = index["PLAYER_ID"].astype(np.int64)
+        df.insert(0, "PLAYER_ID", ids)
+        df.insert(1, "PLAYER_NAME", [self.names.get(int(i), "") for i in ids])
+        df.insert(2, "SEASON", [season_label(int(y)) for y in index["SEASON"]])
+        df.insert(3, "TEAM_ABBREVIATION", index["TEAM_ABBREVIATION"])
+        return df
+
+    def season(self, season: str) -> pd.DataFrame:
+        """某赛季全部球员的特征 (矩阵切片为连续内存，只拷贝这一段)"""
+        return self._frame(self.season_slice(season))
+
+    def player(self, player_id: int) -> pd.DataFrame:
+        rows = np.flatnonzero(self.index["PLAYER_ID"] == player_id)
+        return self._frame(rows)
+
+    def frame(self) -> pd.DataFrame:
+        return self._frame(slice(None))
+
+def _write(path: Path, frames: List[pd.DataFrame], built_from: Dict[str, str]):
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FEATURE_SCHEMA)
+    seasons = list(dict.fromkeys(df["SEASON"])) if not df.empty else []
+    offsets = [0]
+    for season in seasons:
+        offsets.append(offsets[-1] + int((df["SEASON"] == season).sum()))
+
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    matrix = np.lib.format.open_memmap(tmp / "features.npy", mode="w+", dtype=np.float32,
+                                       shape=(len(df), len(FEATURE_SCHEMA)))
+    matrix[:] = df.reindex(columns=FEATURE_SCHEMA).apply(pd.to_numeric, errors="coerce").to_numpy(np.float32)
+    matrix.flush()
+    del matrix
+    index = np.zeros(len(df), dtype=INDEX_DTYPE)
+    if len(df):
+        index["PLAYER_ID"] = df["PLAYER_ID"].astype(np.int64)
+        index["SEASON"] = df["SEASON"].str[:4].astype(int)
+        index["TEAM_ABBREVIATION"] = df["TEAM_ABBREVIATION"].fillna("").astype(str)
+    np.save(tmp / "index.npy", index)
+    names = df.drop_duplicates("PLAYER_ID", keep="last").set_index("PLAYER_ID")["PLAYER_NAME"] \
+        if len(df) else pd.Series(dtype=str)
+    meta = {
+        "schema_version": SCHEMA_VERSION,
+        "schema": FEATURE_SCHEMA,
+        "seasons": seasons,
+        "offsets": offsets,
+        "names": {str(int(k)): v for k, v in names.items()},
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "built_from": built_from,
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    # 整个目录替换：已打开旧文件的进程继续读旧的 mmap，新进程读到完整的新库
+    old = path.with_name(f"{path.name}.{os.getpid()}.old")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+def backfill(seasons: Optional[Iterable[str]] = None, path: Path = FEATURE_DIR, workers: int = 4,
+             refresh: bool = False,
+             progress: Optional[Callable[[str, int, str], None]] = None) -> HistoricalFeatureStore:
+    """离线回填：已入库的往季直接沿用，缺失赛季与本赛季重新拉取，重写整个特征库。
+
+    progress(season, rows, source) 在每个赛季就绪时回调，source 为 "store" 或 "live"。
+    """
+    seasons = list(seasons or all_seasons())
+    try:
+        existing = HistoricalFeatureStore(path)
+    except (FileNotFoundError, ValueError):
+        existing = None
+    stored = set(existing.seasons) if existing is not None else set()
+    keep = set() if refresh else stored - {current_season()}
+    # 未在本次范围内的已入库赛季原样保留
+    kept_outside = [s for s in stored if s not in seasons]
+
+    def load(season: str):
+        if season in keep:
+            return existing.season(season), "store"
+        return season_features(season), "live"
+
+    frames, built_from = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for season, (df, source) in zip(seasons, pool.map(load, seasons)):
+            frames[season] = df
+            built_from[season] = source
+            if progress:
+                progress(season, len(df), source)
+    for season in kept_outside:
+        frames[season] = existing.season(season)
+        built_from[season] = "store"
+    ordered = [frames[s] for s in sorted(frames) if not frames[s].empty]
+    _write(path, ordered, dict(sorted(built_from.items())))
+    return HistoricalFeatureStore(path)
+
+_HISTORY: Optional[HistoricalFeatureStore] = None
+_HISTORY_LOCK = threading.Lock()
+
+def get_feature_history(path: Path = FEATURE_DIR) -> Optional[HistoricalFeatureStore]:
+    """进程级只读特征库；尚未 backfill 时返回 None，调用方退回实时拉取。
+
+    其他进程重新 backfill 后 (meta.json 更新) 自动重新映射。
+    """
+    global _HISTORY
+    with _HISTORY_LOCK:
+        try:
+            mtime = (path / "meta.json").stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if _HISTORY is None or _HISTORY.path != path or _HISTORY.mtime != mtime:
+            try:
+                _HISTORY = HistoricalFeatureStore(path)
+            except (FileNotFoundError, ValueError):
+                return None
+        return _HISTORY
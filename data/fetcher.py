@@ -3,9 +3,10 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from nba_api.stats.static import players
-from nba_api.stats.endpoints import leaguedashplayerstats
 import streamlit as st
 import requests
+from data.ratelimit import get_limiter, is_throttle_error, retry_after
+from data.store import get_store
 
 HEADERS = {
     "Accept": "application/json, text/plain, */*",
@@ -36,6 +37,23 @@ class NBADataFetcher:
                 return p.get("id")
         return None
 
+    def resolve_players(self, names) -> Dict[str, Optional[int]]:
+        all_players = players.get_players()
+        exact = {}
+        for p in all_players:
+            exact.setdefault(p.get("full_name", "").lower(), p.get("id"))
+        resolved = {}
+        for name in names:
+            key = name.strip().lower()
+            pid = exact.get(key)
+            if pid is None and key:
+                for p in all_players:
+                    if key in p.get("full_name", "").lower():
+                        pid = p.get("id")
+                        break
+            resolved[name] = pid
+        return resolved
+
     def _season_str(self) -> str:
         year = datetime.now().year
         if datetime.now().month >= 9:
@@ -56,27 +74,9 @@ class NBADataFetcher:
         last_error = None
         for season in season_tries:
             try:
-                base_resp = leaguedashplayerstats.LeagueDashPlayerStats(
-                    season=season,
-                    per_mode_detailed="PerGame",
-                    measure_type_detailed_defense="Base",
-                    timeout=self.timeout,
-                )
-                adv_resp = leaguedashplayerstats.LeagueDashPlayerStats(
-                    season=season,
-                    per_mode_detailed="PerGame",
-                    measure_type_detailed_defense="Advanced",
-                    timeout=self.timeout,
-                )
-                def_resp = leaguedashplayerstats.LeagueDashPlayerStats(
-                    season=season,
-                    per_mode_detailed="PerGame",
-                    measure_type_detailed_defense="Defense",
-                    timeout=self.timeout,
-                )
-                base_df = base_resp.get_data_frames()[0]
-                adv_df = adv_resp.get_data_frames()[0]
-                def_df = def_resp.get_data_frames()[0]
+                base_df = self._league_table("Base", season)
+                adv_df = self._league_table("Advanced", season)
+                def_df = self._league_table("Defense", season)
                 base_df = base_df[base_df["PLAYER_ID"] == player_id]
                 adv_df = adv_df[adv_df["PLAYER_ID"] == player_id]
                 def_df = def_df[def_df["PLAYER_ID"] == player_id]
@@ -99,6 +99,9 @@ class NBADataFetcher:
                 continue
         raise APIConnectionError(last_error or "unknown error")
 
+    def _league_table(self, measure: str, season: str) -> pd.DataFrame:
+        return get_store().player_stats(season, measure, per_mode="PerGame", timeout=self.timeout)
+
     def _fetch_ldps_http(self, measure: str, season: str) -> Optional[pd.DataFrame]:
         url = "https://stats.nba.com/stats/leaguedashplayerstats"
         params = {
@@ -107,9 +110,12 @@ class NBADataFetcher:
             "PerMode": "PerGame",
             "MeasureType": measure,
         }
+        limiter = get_limiter(url)
         try:
+            limiter.acquire()
             r = requests.get(url, params=params, headers=HEADERS, timeout=self.timeout)
             r.raise_for_status()
+            limiter.reward()
             data = r.json()
             rs = data.get("resultSets") or []
             if not rs:
@@ -118,7 +124,9 @@ class NBADataFetcher:
             rows = rs[0].get("rowSet")
             df = pd.DataFrame(rows, columns=headers)
             return df
-        except Exception:
+        except Exception as e:
+            if is_throttle_error(e):
+                limiter.penalize(retry_after(e))
             return None
 
     def _clean_data(self, raw: Dict[str, pd.DataFrame]) -> Dict:
@@ -171,6 +179,47 @@ class NBADataFetcher:
             "INSUFFICIENT": insufficient
         }
 
+    def _clean_frame(self, base: pd.DataFrame, adv: pd.DataFrame) -> pd.DataFrame:
+        adv_cols = [c for c in ["PLAYER_ID", "TS_PCT", "AST_PCT", "REB_PCT", "STL_PCT", "BLK_PCT"] if c in adv.columns]
+        df = base.merge(adv[adv_cols], on="PLAYER_ID", how="left") if "PLAYER_ID" in adv_cols else base.copy()
+
+        def col(name: str) -> pd.Series:
+            if name in df.columns:
+                return pd.to_numeric(df[name], errors="coerce").fillna(0.0).astype(float)
+            return pd.Series(0.0, index=df.index)
+
+        gp, mpg = col("GP"), col("MIN")
+        pts_pg, ast_pg, tov_pg, reb_pg = col("PTS"), col("AST"), col("TOV"), col("REB")
+        min_floor = mpg.clip(lower=1.0)
+        stl_pct, blk_pct = col("STL_PCT"), col("BLK_PCT")
+        missing_def = (stl_pct == 0.0) | (blk_pct == 0.0)
+        stl_pct = stl_pct.where(~missing_def, col("STL") / min_floor * 100.0)
+        blk_pct = blk_pct.where(~missing_def, col("BLK") / min_floor * 100.0)
+        denom = 2.0 * (col("FGA") + 0.44 * col("FTA"))
+        ts_calc = (pts_pg / denom.where(denom > 0)).fillna(0.0)
+        ts_pct = col("TS_PCT")
+        ts_pct = ts_pct.where(ts_pct != 0.0, ts_calc)
+        ast_pct = col("AST_PCT")
+        ast_pct = ast_pct.where(ast_pct != 0.0, ast_pg / min_floor * 100.0)
+        reb_pct = col("REB_PCT")
+        reb_pct = reb_pct.where(reb_pct > 0, reb_pg / gp.clip(lower=1.0))
+        return pd.DataFrame({
+            "PLAYER_ID": df["PLAYER_ID"],
+            "PLAYER_NAME": df["PLAYER_NAME"] if "PLAYER_NAME" in df.columns else "",
+            "GP": gp,
+            "MIN": mpg,
+            "PTS": pts_pg,
+            "TS_PCT": ts_pct,
+            "AST_PCT": ast_pct,
+            "AST_TO": ast_pg / tov_pg.clip(lower=1.0),
+            "REB_PCT": reb_pct,
+            "THREE_PCT": col("FG3_PCT"),
+            "THREE_PM": col("FG3M"),
+            "STL_PCT": stl_pct,
+            "BLK_PCT": blk_pct,
+            "INSUFFICIENT": (gp < 10) | (mpg < 15),
+        })
+
     def get_mock_data(self, player_name: str) -> Dict:
         return {
             "PLAYER_NAME": player_name,
@@ -188,9 +237,10 @@ class NBADataFetcher:
             "INSUFFICIENT": False
         }
 
-@st.cache_data(ttl=3600)
-def fetch_data_pipeline(name: str) -> Dict:
+def run_data_pipeline(name: str, offline: bool = False) -> Dict:
     f = NBADataFetcher()
+    if offline:
+        return {"stats": f.get_mock_data(name), "source": "mock", "reason": "离线模式：使用本地模拟数据"}
     pid = f.search_player(name)
     if not pid:
         return {"stats": f.get_mock_data(name), "source": "mock", "reason": "未找到匹配球员（请使用英文全名或更精确的拼写）"}
@@ -199,4 +249,8 @@ def fetch_data_pipeline(name: str) -> Dict:
         clean = f._clean_data(raw)
         return {"stats": clean, "source": "real"}
     except Exception as e:
-        return {"stats": f.get_mock_data(name), "source": "mock", "reason": f"数据源错误：{e}"}
\ No newline at end of file
+        return {"stats": f.get_mock_data(name), "source": "mock", "reason": f"数据源错误：{e}"}
+
+@st.cache_data(ttl=3600)
+def fetch_data_pipeline(name: str) -> Dict:
+    return run_data_pipeline(name)
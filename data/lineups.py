@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from data.cache import CACHE_DIR, TTLCache, atomic_write, singleton
+from data.store import get_store
+from data.synergy import current_season
+from logic.lineups import LineupIndex
+
+LINEUP_DIR = CACHE_DIR / "lineups"
+GROUP_SIZES = (2, 3, 5)
+# 官方阵容数据从 2007-08 开始
+LINEUP_FIRST_SEASON = 2007
+
+def season_lineups(season: str, sizes: Iterable[int] = GROUP_SIZES, workers: int = 6) -> pd.DataFrame:
+    """全联盟各人数阵容的 Base + Advanced 总表 (每种人数、每种口径一次请求，并发拉取)"""
+    if int(season[:4]) < LINEUP_FIRST_SEASON:
+        return pd.DataFrame()
+    store = get_store()
+    sizes = list(sizes)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        base = list(pool.map(lambda n: store.lineups(season, n, "Base"), sizes))
+        adv = list(pool.map(lambda n: store.lineups(season, n, "Advanced"), sizes))
+    frames = []
+    for n, b, a in zip(sizes, base, adv):
+        if b.empty:
+            continue
+        extra = ["GROUP_ID", "TEAM_ID"] + [c for c in a.columns if c not in b.columns]
+        frames.append(b.merge(a[extra], on=["GROUP_ID", "TEAM_ID"], how="left").assign(GROUP_SIZE=n))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+class LineupStore:
+    """按赛季缓存阵容索引：往季建好后以 npz 落盘 (列式数组，无 pickle)，本赛季只在内存中按 TTL 刷新"""
+
+    def __init__(self, path: Path = LINEUP_DIR, ttl: float = 3600):
+        self.path = path
+        self.indexes = TTLCache(ttl=ttl, maxsize=32)
+
+    def _file(self, season: str) -> Path:
+        return self.path / f"{season}.npz"
+
+    def _load(self, season: str) -> LineupIndex:
+        archived = season != current_season()
+        if archived and self._file(season).exists():
+            with np.load(self._file(season)) as arrays:
+                return LineupIndex.from_arrays({k: arrays[k] for k in arrays.files})
+        index = LineupIndex.from_frame(season_lineups(season))
+        if archived and len(index):
+            self.path.mkdir(parents=True, exist_ok=True)
+            atomic_write(self._file(season), lambda tmp: np.savez(tmp, **index.to_arrays()))
+        return index
+
+    def season(self, season: str) -> LineupIndex:
+        return self.indexes.get_or_load(season, lambda: self._load(season))
+
+    def query(self, season: str, **kwargs) -> pd.DataFrame:
+        """参数同 LineupIndex.query"""
+        return self.season(season).query(**kwargs)
+
+get_lineup_store = singleton(LineupStore)
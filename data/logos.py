@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import requests
+from PIL import Image
+
+from data.cache import CACHE_DIR, SingleFlight, atomic_write, singleton
+from data.ratelimit import get_limiter
+
+LOGO_DIR = CACHE_DIR / "logos"
+LOGO_URL = "https://a.espncdn.com/i/teamlogos/nba/500/{abbr}.png"
+# 下载失败 (404 / 断网 / 超时) 的 Logo 在这段时间内不再重试，每张缺失的图最多耗一次超时
+FAILURE_TTL = 300
+# Logo 映射修正 (处理少数 API 缩写与 ESPN 图源不一致的情况)
+LOGO_MAPPING = {
+    'UTA': 'uth', 'NOP': 'no', 'NYK': 'ny', 'GSW': 'gs', 'SAS': 'sa'
+}
+
+def logo_url(abbreviation: str) -> str:
+    return LOGO_URL.format(abbr=LOGO_MAPPING.get(abbreviation, abbreviation.lower()))
+
+class LogoCache:
+    """球队 Logo 本地缓存。
+
+    PNG 按内容 sha256 存入 objects/，manifest.json 记录 URL -> 哈希 (内容寻址，相同图片只存一份)；
+    解码后的 RGBA 数组在进程内常驻，同一张图每个进程只解码一次。
+    offline=True (或环境变量 NBA_LOGOS_OFFLINE=1) 时只读本地/离线包，缺失的 Logo 返回 None。
+    """
+
+    def __init__(self, cache_dir: Path = LOGO_DIR, offline: Optional[bool] = None, timeout: float = 5,
+                 failure_ttl: float = FAILURE_TTL):
+        self.cache_dir = cache_dir
+        self.offline = os.environ.get("NBA_LOGOS_OFFLINE") == "1" if offline is None else offline
+        self.timeout = timeout
+        self.failure_ttl = failure_ttl
+        self._images: Dict[str, np.ndarray] = {}
+        self._failed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._downloads = SingleFlight()
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            return json.loads((self.cache_dir / "manifest.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        text = json.dumps(self._manifest, indent=1, sort_keys=True)
+        atomic_write(self.cache_dir / "manifest.json", lambda tmp: tmp.write_text(text, encoding="utf-8"))
+
+    def _object(self, digest: str) -> Path:
+        return self.cache_dir / "objects" / f"{digest}.png"
+
+    def _store(self, url: str, content: bytes):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists():
+            atomic_write(path, lambda tmp: tmp.write_bytes(content))
+        with self._lock:
+            self._manifest[url] = digest
+            self._save_manifest()
+
+    def _local(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            digest = self._manifest.get(url)
+        if digest and self._object(digest).exists():
+            return self._object(digest).read_bytes()
+        return None
+
+    def content(self, abbreviation: str) -> Optional[bytes]:
+        """PNG 原始字节：先查本地，缺失且非离线模式时下载一次并落盘；同一 URL 的并发下载合并为一次"""
+        url = logo_url(abbreviation)
+        content = self._local(url)
+        if content is not None or self.offline:
+            return content
+        return self._downloads.do(url, lambda: self._download(url, abbreviation))[0]
+
+    def _download(self, url: str, abbreviation: str) -> Optional[bytes]:
+        # 排在上一次下载之后进来的调用方，图片可能已经落盘
+        content = self._local(url)
+        if content is not None:
+            return content
+        with self._lock:
+            retry_at = self._failed.get(url)
+        if retry_at is not None and time.monotonic() < retry_at:
+            return None
+        try:
+            get_limiter(url).acquire()
+            response = requests.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Warning: 无法下载 {abbreviation} 的 Logo: {e}")
+            with self._lock:
+                self._failed[url] = time.monotonic() + self.failure_ttl
+            return None
+        self._store(url, response.content)
+        return response.content
+
+    def image(self, abbreviation: str) -> Optional[np.ndarray]:
+        """解码后的 RGBA 数组 (进程内缓存)，可直接交给 matplotlib 的 OffsetImage"""
+        with self._lock:
+            cached = self._images.get(abbreviation)
+        if cached is not None:
+            return cached
+        content = self.content(abbreviation)
+        if content is None:
+            return None
+        try:
+            array = np.asarray(Image.open(BytesIO(content)).convert("RGBA"))
+        except Exception as e:
+            print(f"Warning: 无法解码 {abbreviation} 的 Logo: {e}")
+            return None
+        array.setflags(write=False)
+        with self._lock:
+            self._images[abbreviation] = array
+        return array
+
+    def prefetch(self, abbreviations: Iterable[str], workers: int = 8) -> Dict[str, bool]:
+        """并发下载并解码，返回每支球队是否可用"""
+        abbreviations = list(dict.fromkeys(abbreviations))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            images = list(pool.map(self.image, abbreviations))
+        return {abbr: img is not None for abbr, img in zip(abbreviations, images)}
+
+    def export_bundle(self, path: Path) -> int:
+        """打包 manifest 与全部图片为 zip，供无网络环境使用；返回图片数"""
+        with self._lock:
+            manifest = dict(self._manifest)
+        digests = sorted(set(manifest.values()))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as zf:
+            zf.writestr("manifest.json", json.dumps(manifest, indent=1, sort_keys=True))
+            for digest in digests:
+                if self._object(digest).exists():
+                    zf.write(self._object(digest), f"objects/{digest}.png")
+        return len(digests)
+
+    def import_bundle(self, path: Path) -> int:
+        """导入离线包，合并进本地缓存；图片按内容哈希校验，返回导入的图片数"""
+        count = 0
+        with zipfile.ZipFile(path) as zf:
+            manifest = json.loads(zf.read("manifest.json"))
+            for url, digest in manifest.items():
+                name = f"objects/{digest}.png"
+                if name not in zf.namelist():
+                    continue
+                content = zf.read(name)
+                if hashlib.sha256(content).hexdigest() != digest:
+                    print(f"Warning: 离线包中 {url} 的图片校验失败，已跳过")
+                    continue
+                self._store(url, content)
+                count += 1
+        return count
+
+get_logo_cache = singleton(LogoCache)
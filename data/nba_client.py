@@ -0,0 +1,53 @@
+from typing import Any, Dict, Hashable, List
+
+import pandas as pd
+
+from data.cache import SingleFlight
+from data.ratelimit import get_limiter, is_throttle_error, retry_after
+
+_FLIGHT = SingleFlight()
+NBA_STATS_HOST = "stats.nba.com"
+# 被限流 (429/超时) 后降速重试的次数
+THROTTLE_RETRIES = 2
+TRANSPORT_PARAMS = {"timeout", "proxy", "headers"}
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+def request_key(endpoint_cls, params: Dict[str, Any]) -> Hashable:
+    # timeout 等传输参数不影响返回内容，不参与去重
+    return (endpoint_cls.__name__, _freeze({k: v for k, v in params.items() if k not in TRANSPORT_PARAMS}))
+
+def fetch_frames(endpoint_cls, **params) -> List[pd.DataFrame]:
+    """所有 NBA API 调用的统一入口：相同 endpoint + 参数的并发请求合并为一次下载。
+
+    每个调用方 (包括发起者) 都拿到各自的副本，原始结果只留在本函数内，调用方原地修改互不影响。
+    """
+    def load():
+        # 只有合并后的真实请求消耗令牌
+        limiter = get_limiter(NBA_STATS_HOST)
+        for attempt in range(THROTTLE_RETRIES + 1):
+            limiter.acquire()
+            try:
+                frames = endpoint_cls(**params).get_data_frames()
+            except Exception as e:
+                if not is_throttle_error(e):
+                    raise
+                limiter.penalize(retry_after(e))
+                if attempt == THROTTLE_RETRIES:
+                    raise
+                continue
+            limiter.reward()
+            return frames
+
+    frames, _ = _FLIGHT.do(request_key(endpoint_cls, params), load)
+    return [df.copy() for df in frames]
+
+def request_stats() -> Dict[str, float]:
+    stats = _FLIGHT.stats()
+    stats.update({f"limiter_{k}": v for k, v in get_limiter(NBA_STATS_HOST).stats().items()})
+    return stats
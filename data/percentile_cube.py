@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.cache import CACHE_DIR, atomic_write
+from data.feature_store import all_seasons
+from data.store import get_store
+from data.synergy import current_season
+from logic.percentiles import GROUPINGS, HUSTLE_FACTORS, RANK_COLS, minutes_band, percentile_ranks, position_group
+
+CUBE_DIR = CACHE_DIR / "percentiles"
+# 官方 Hustle 数据 (截断、干扰投篮等) 从 2015-16 开始
+HUSTLE_FIRST_SEASON = 2015
+INFO_COLS = ["PLAYER_ID", "PLAYER_NAME", "TEAM_ABBREVIATION", "POSITION", "MIN_BAND"]
+VALUE_COLS = ["GP", "MIN", "PTS", "TS_PCT", "rTS%", "AST_PCT", "USG_PCT"] + HUSTLE_FACTORS + ["HUSTLE_SCORE"]
+
+def season_frame(season: str) -> pd.DataFrame:
+    """单赛季 Base + Advanced + Hustle + 位置合并表 (场均，至少 5 场、场均 12 分钟)，附 rTS% 与拼搏指数"""
+    store = get_store()
+    base = store.player_stats(season, "Base", per_mode="PerGame")
+    adv = store.player_stats(season, "Advanced", per_mode="PerGame")
+    hustle = store.player_hustle(season, per_mode="PerGame")
+    index = store.player_index(season)
+
+    df = pd.merge(base, adv[["PLAYER_ID", "AST_PCT", "USG_PCT", "TS_PCT"]], on="PLAYER_ID", how="inner")
+    # Hustle 可能缺列或缺人，left join 后填 0
+    hustle_cols = ["PLAYER_ID"] + [c for c in HUSTLE_FACTORS if c in hustle.columns]
+    df = pd.merge(df, hustle[hustle_cols], on="PLAYER_ID", how="left")
+    if "PERSON_ID" in index.columns and "POSITION" in index.columns:
+        pos = index[["PERSON_ID", "POSITION"]].rename(columns={"PERSON_ID": "PLAYER_ID"})
+        df = pd.merge(df, pos.drop_duplicates("PLAYER_ID"), on="PLAYER_ID", how="left")
+    df = df[(df["GP"] > 5) & (df["MIN"] > 12)].reset_index(drop=True)
+
+    df = df.reindex(columns=list(dict.fromkeys(list(df.columns) + HUSTLE_FACTORS + ["POSITION"])))
+    df[HUSTLE_FACTORS] = df[HUSTLE_FACTORS].fillna(0)
+    df["rTS%"] = (df["TS_PCT"] - df["TS_PCT"].mean()) * 100
+    df["HUSTLE_SCORE"] = df[HUSTLE_FACTORS].sum(axis=1)
+    df["POSITION"] = position_group(df["POSITION"])
+    df["MIN_BAND"] = minutes_band(df["MIN"])
+    return df
+
+def _block(season: str) -> Dict[str, np.ndarray]:
+    """一个赛季的列式块：信息列 (定长 unicode / int64)、数值矩阵 float32、三种人群的百分位矩阵"""
+    df = season_frame(season)
+    block = {c: df[c].astype(str).to_numpy(dtype=str) for c in INFO_COLS if c != "PLAYER_ID"}
+    block["PLAYER_ID"] = df["PLAYER_ID"].to_numpy(np.int64)
+    block["values"] = df.reindex(columns=VALUE_COLS).to_numpy(np.float32)
+    ranks = percentile_ranks(df)
+    block["ranks"] = np.stack([ranks[g] for g in GROUPINGS]) if len(df) else \
+        np.zeros((len(GROUPINGS), 0, len(RANK_COLS)), dtype=np.float32)
+    block["league_ts"] = np.array([df["TS_PCT"].mean() if len(df) else np.nan])
+    return block
+
+def load_block(season: str, path: Path = CUBE_DIR) -> Dict[str, np.ndarray]:
+    """往季块以 npz 落盘复用；本赛季每次重新计算"""
+    target = path / f"{season}.npz"
+    archived = season != current_season()
+    if archived and target.exists():
+        with np.load(target) as arrays:
+            return {k: arrays[k] for k in arrays.files}
+    block = _block(season)
+    if archived and len(block["PLAYER_ID"]):
+        path.mkdir(parents=True, exist_ok=True)
+        atomic_write(target, lambda tmp: np.savez(tmp, **block))
+    return block
+
+class PercentileCube:
+    """多赛季球员百分位立方体：(赛季 × 球员) 行 × 指标列 × 人群 (全联盟 / 同位置 / 同时间档)。
+
+    各赛季块按行拼接，offsets 记录每个赛季的行区间；切换赛季、人群或跨赛季对比都只是数组切片，
+    不再请求接口，也不重新排名。
+    """
+
+    def __init__(self, blocks: Dict[str, Dict[str, np.ndarray]]):
+        self.seasons = [s for s in sorted(blocks) if len(blocks[s]["PLAYER_ID"])]
+        sizes = [len(blocks[s]["PLAYER_ID"]) for s in self.seasons]
+        self.offsets = dict(zip(self.seasons, np.cumsum([0] + sizes)[:-1].tolist()))
+        self.sizes = dict(zip(self.seasons, sizes))
+        self.league_ts = {s: float(blocks[s]["league_ts"][0]) for s in self.seasons}
+
+        def stack(key, axis=0):
+            parts = [blocks[s][key] for s in self.seasons]
+            return np.concatenate(parts, axis=axis) if parts else np.array([])
+
+        self.info = {c: stack(c) for c in INFO_COLS}
+        self.season_col = np.repeat(np.array(self.seasons, dtype=str), sizes) if sizes else np.array([], dtype=str)
+        self.values = stack("values") if sizes else np.zeros((0, len(VALUE_COLS)), dtype=np.float32)
+        self.ranks = stack("ranks", axis=1) if sizes else np.zeros((len(GROUPINGS), 0, len(RANK_COLS)), np.float32)
+        self._value_idx = {c: i for i, c in enumerate(VALUE_COLS)}
+        self._group_idx = {g: i for i, g in enumerate(GROUPINGS)}
+        self._names: Dict[str, Tuple[str, ...]] = {}
+        self._name_rows: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.season_col)
+
+    def season_slice(self, season: str) -> slice:
+        start = self.offsets.get(season, 0)
+        return slice(start, start + self.sizes.get(season, 0))
+
+    def frame(self, season: str, grouping: str = "LEAGUE") -> pd.DataFrame:
+        """某赛季的宽表：信息列 + 数值列 + {指标}_RANK (按 grouping 人群)，列名与旧版合并表一致"""
+        return self.rows(self.season_slice(season), grouping)
+
+    def rows(self, rows, grouping: str = "LEAGUE") -> pd.DataFrame:
+        """任意行 (切片或行号数组) 的宽表，跨赛季对比时行可以来自不同赛季"""
+        out = {c: v[rows] for c, v in self.info.items()}
+        out["SEASON"] = self.season_col[rows]
+        values = self.values[rows]
+        out.update({c: values[:, i] for c, i in self._value_idx.items()})
+        ranks = self.ranks[self._group_idx[grouping]][rows]
+        out.update({f"{c}_RANK": ranks[:, i] for i, c in enumerate(RANK_COLS)})
+        return pd.DataFrame(out)
+
+    def _season_names(self, season: str):
+        # 每个赛季第一次用到时建一次 姓名 -> 行号 索引与排序后的选项列表
+        with self._lock:
+            if season not in self._name_rows:
+                sl = self.season_slice(season)
+                names = self.info["PLAYER_NAME"][sl]
+                rows = {}
+                for i, name in enumerate(names.tolist(), start=sl.start):
+                    rows.setdefault(name, i)
+                self._name_rows[season] = rows
+                self._names[season] = tuple(sorted(rows))
+            return self._names[season], self._name_rows[season]
+
+    def names(self, season: str) -> Tuple[str, ...]:
+        """某赛季排好序的球员姓名 (下拉框选项)"""
+        return self._season_names(season)[0]
+
+    def locate(self, season: str, name: str) -> Optional[int]:
+        return self._season_names(season)[1].get(name)
+
+    def record(self, row: int, grouping: str = "LEAGUE") -> Dict[str, object]:
+        """单行 -> {列名: 值}，列名与 rows() 一致"""
+        out = {c: v[row].item() for c, v in self.info.items()}
+        out["SEASON"] = str(self.season_col[row])
+        out.update({c: float(self.values[row, i]) for c, i in self._value_idx.items()})
+        ranks = self.ranks[self._group_idx[grouping], row]
+        out.update({f"{c}_RANK": float(ranks[i]) for i, c in enumerate(RANK_COLS)})
+        return out
+
+    def hustle_leaders(self, season: str, n: int = 10, max_pts: float = 20.0) -> np.ndarray:
+        """某赛季场均得分 < max_pts 的球员按拼搏指数降序的前 n 个行号 (蓝领榜)，只做数组排序"""
+        sl = self.season_slice(season)
+        pts = self.values[sl, self._value_idx["PTS"]]
+        score = self.values[sl, self._value_idx["HUSTLE_SCORE"]]
+        rows = np.flatnonzero(pts < max_pts)
+        order = np.argsort(-score[rows], kind="stable")
+        return rows[order[:n]] + sl.start
+
+    def player_rows(self, player_id: int) -> np.ndarray:
+        """某球员所有赛季的行号 (按赛季升序)"""
+        return np.flatnonzero(self.info["PLAYER_ID"] == player_id)
+
+def build_cube(seasons: Optional[Iterable[str]] = None, workers: int = 4, path: Path = CUBE_DIR,
+               progress: Optional[Callable[[str, int], None]] = None) -> PercentileCube:
+    """并发加载各赛季块 (往季读盘，缺失的赛季经统一限速拉取) 后拼成立方体"""
+    seasons = list(seasons or all_seasons(HUSTLE_FIRST_SEASON))
+
+    def load(season):
+        try:
+            block = load_block(season, path)
+        except Exception as e:
+            print(f"Warning: {season} 百分位数据获取失败: {e}")
+            return season, None
+        if progress:
+            progress(season, len(block["PLAYER_ID"]))
+        return season, block
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        blocks = {season: block for season, block in pool.map(load, seasons) if block is not None}
+    return PercentileCube(blocks)
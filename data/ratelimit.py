@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+class TokenBucket:
+    """令牌桶限速器：空闲时积攒令牌、可小幅突发，持续请求时按 rate 匀速放行。
+
+    遇到 429 / 超时调用 penalize()：速率减半并暂停一段时间；之后每次成功调用
+    reward() 逐步恢复到上限 (AIMD)。所有线程、所有会话共享同一个桶。
+    """
+
+    def __init__(self, rate: float, burst: float = 1, min_rate: Optional[float] = None,
+                 recover_step: Optional[float] = None):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.min_rate = min_rate or rate / 8
+        self.recover_step = recover_step or rate / 20
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.penalties = 0
+        self.waited = 0.0
+
+    def _refill(self, now: float):
+        # 暂停期间 _updated 被推到暂停结束时刻，此前不积攒令牌
+        if now <= self._updated:
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时阻塞；返回本次等待秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 先预扣令牌 (允许为负)，排在后面的调用自然顺延，不会一起醒来突发
+            self._tokens -= 1
+            # 暂停与排队时间相加：被限流后排队的调用在暂停结束后依次放行，而不是同时醒来
+            wait = max(0.0, self._paused_until - now) + max(0.0, -self._tokens) / self.rate
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.waited += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, retry_after: Optional[float] = None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.penalties += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, now + pause)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, self._paused_until)
+
+    def reward(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.recover_step)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "penalties": self.penalties,
+                "waited": round(self.waited, 3),
+            }
+
+# 每个上游站点一个桶：(每秒请求数, 突发容量)
+HOST_LIMITS = {
+    "stats.nba.com": (3.0, 3),
+}
+DEFAULT_LIMIT = (2.0, 2)
+
+_LIMITERS: Dict[str, TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+def _host(host_or_url: str) -> str:
+    return urlparse(host_or_url).netloc if "://" in host_or_url else host_or_url
+
+def get_limiter(host_or_url: str) -> TokenBucket:
+    host = _host(host_or_url)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(host)
+        if limiter is None:
+            rate, burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+            limiter = _LIMITERS[host] = TokenBucket(rate, burst)
+        return limiter
+
+def set_limit(host_or_url: str, rate: float, burst: float = 1) -> TokenBucket:
+    """为某个站点指定速率 (例如爬虫按自己的配置)，替换已有的桶"""
+    host = _host(host_or_url)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS[host] = TokenBucket(rate, burst)
+        return limiter
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    with _LIMITERS_LOCK:
+        limiters = dict(_LIMITERS)
+    return {host: limiter.stats() for host, limiter in limiters.items()}
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """429/503、超时以及重试耗尽 (RetryError) 视为被限流"""
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) in (429, 503):
+        return True
+    name = type(exc).__name__
+    return isinstance(exc, TimeoutError) or "Timeout" in name or name == "RetryError"
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,230 @@
+from typing import Callable, Optional
+
+import pandas as pd
+from nba_api.stats.endpoints import (
+    leaguedashlineups,
+    leaguedashplayerstats,
+    leaguedashteamstats,
+    leaguedashplayerptshot,
+    leaguedashptdefend,
+    leaguehustlestatsplayer,
+    playergamelogs,
+    playerindex,
+    teamgamelogs,
+    teamdashboardbyshootingsplits,
+)
+
+from data.cache import TTLCache, singleton
+from data.nba_client import fetch_frames
+from logic.rates import add_rate_columns, rate_columns
+from logic.team_form import with_opponents
+
+class LeagueDataStore:
+    """进程级联盟数据仓库：同一赛季/口径的联盟总表在整个进程内只下载一次、只保存一份。
+
+    返回的 DataFrame 为所有页面与会话共享 (见 TTLCache)。
+    """
+
+    def __init__(self, ttl: float = 3600, timeout: int = 30):
+        self.tables = TTLCache(ttl=ttl, maxsize=256)
+        self.timeout = timeout
+
+    def _get(self, key: tuple, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        return self.tables.get_or_load(key, loader)
+
+    def player_stats(self, season: str, measure: str = "Base", per_mode: str = "PerGame",
+                     date_from: Optional[str] = "", date_to: Optional[str] = "",
+                     season_type: str = "Regular Season", timeout: Optional[int] = None) -> pd.DataFrame:
+        date_from, date_to = date_from or "", date_to or ""
+        key = ("LeagueDashPlayerStats", season, measure, per_mode, date_from, date_to, season_type)
+
+        def load():
+            df = fetch_frames(
+                leaguedashplayerstats.LeagueDashPlayerStats,
+                season=season,
+                measure_type_detailed_defense=measure,
+                per_mode_detailed=per_mode,
+                date_from_nullable=date_from,
+                date_to_nullable=date_to,
+                season_type_all_star=season_type,
+                timeout=timeout or self.timeout,
+            )[0]
+            # Base 表加载时整表算好 Per 100 / Per 36 (回合按 box score 估算)
+            return add_rate_columns(df) if measure == "Base" else df
+
+        return self._get(key, load)
+
+    def player_rates(self, season: str, per_mode: str = "Totals", date_from: Optional[str] = "",
+                     date_to: Optional[str] = "", season_type: str = "Regular Season") -> pd.DataFrame:
+        """Base + Advanced 合并表，Per 100 按官方 POSS 计算 (缺失时退回估算)"""
+        date_from, date_to = date_from or "", date_to or ""
+        key = ("PlayerRates", season, per_mode, date_from, date_to, season_type)
+
+        def load():
+            base = self.player_stats(season, "Base", per_mode, date_from, date_to, season_type)
+            adv = self.player_stats(season, "Advanced", per_mode, date_from, date_to, season_type)
+            extra = ["PLAYER_ID"] + [c for c in adv.columns if c not in base.columns or c == "POSS"]
+            base = base.drop(columns=rate_columns() + ["POSS"], errors="ignore")
+            return add_rate_columns(base.merge(adv[extra], on="PLAYER_ID", how="left"))
+
+        return self._get(key, load)
+
+    def team_stats(self, season: str, measure: str = "Base", per_mode: str = "PerGame",
+                   date_from: Optional[str] = "", date_to: Optional[str] = "", last_n: int = 0,
+                   season_type: str = "Regular Season") -> pd.DataFrame:
+        """全联盟 30 支球队一张表，按 TEAM_ID 建索引 (同时保留 TEAM_ID 列)，切换球队无需再请求"""
+        date_from, date_to = date_from or "", date_to or ""
+        key = ("LeagueDashTeamStats", season, measure, per_mode, date_from, date_to, last_n, season_type)
+
+        def load():
+            df = fetch_frames(
+                leaguedashteamstats.LeagueDashTeamStats,
+                season=season,
+                measure_type_detailed_defense=measure,
+                per_mode_detailed=per_mode,
+                date_from_nullable=date_from,
+                date_to_nullable=date_to,
+                last_n_games=last_n,
+                season_type_all_star=season_type,
+                timeout=self.timeout,
+            )[0]
+            if "TEAM_ID" in df.columns:
+                df = df.set_index("TEAM_ID", drop=False)
+                # 索引不带名字，避免按 TEAM_ID 列 merge 时与同名索引冲突
+                df.index.name = None
+            return df
+
+        return self._get(key, load)
+
+    def team_row(self, team_id: int, season: str, measure: str = "Base", per_mode: str = "PerGame",
+                 date_from: Optional[str] = "", date_to: Optional[str] = "", last_n: int = 0,
+                 season_type: str = "Regular Season") -> pd.DataFrame:
+        """某支球队的一行 (DataFrame)，没有数据时为空表"""
+        df = self.team_stats(season, measure, per_mode, date_from, date_to, last_n, season_type)
+        return df.loc[[team_id]] if team_id in df.index else df.iloc[0:0]
+
+    def team_shooting_splits(self, team_id: int, season: str, date_from: Optional[str] = "",
+                             date_to: Optional[str] = "", last_n: int = 0,
+                             season_type: str = "Regular Season") -> pd.DataFrame:
+        """某支球队按 5 英尺距离分段的投篮表 (TeamDashboardByShootingSplits 第 2 个结果集)"""
+        date_from, date_to = date_from or "", date_to or ""
+        key = ("TeamDashboardByShootingSplits", team_id, season, date_from, date_to, last_n, season_type)
+        return self._get(key, lambda: fetch_frames(
+            teamdashboardbyshootingsplits.TeamDashboardByShootingSplits,
+            team_id=team_id,
+            season=season,
+            date_from_nullable=date_from,
+            date_to_nullable=date_to,
+            last_n_games=last_n,
+            measure_type_detailed_defense="Base",
+            month=0,
+            season_type_all_star=season_type,
+            timeout=self.timeout,
+        )[1])
+
+    def lineups(self, season: str, group_quantity: int = 5, measure: str = "Base", per_mode: str = "Totals",
+                season_type: str = "Regular Season") -> pd.DataFrame:
+        """全联盟 group_quantity 人阵容表 (LeagueDashLineups，不指定球队，一次请求覆盖 30 队)"""
+        key = ("LeagueDashLineups", season, group_quantity, measure, per_mode, season_type)
+        return self._get(key, lambda: fetch_frames(
+            leaguedashlineups.LeagueDashLineups,
+            season=season,
+            group_quantity=group_quantity,
+            measure_type_detailed_defense=measure,
+            per_mode_detailed=per_mode,
+            season_type_all_star=season_type,
+            timeout=self.timeout,
+        )[0])
+
+    def player_hustle(self, season: str, per_mode: str = "PerGame",
+                      season_type: str = "Regular Season") -> pd.DataFrame:
+        key = ("LeagueHustleStatsPlayer", season, per_mode, season_type)
+        return self._get(key, lambda: fetch_frames(
+            leaguehustlestatsplayer.LeagueHustleStatsPlayer,
+            season=season,
+            per_mode_time=per_mode,
+            season_type_all_star=season_type,
+            timeout=self.timeout,
+        )[0])
+
+    def player_defense(self, season: str, date_from: Optional[str] = "", date_to: Optional[str] = "",
+                       category: str = "Overall", per_mode: str = "PerGame",
+                       season_type: str = "Regular Season") -> pd.DataFrame:
+        date_from, date_to = date_from or "", date_to or ""
+        key = ("LeagueDashPtDefend", season, category, per_mode, date_from, date_to, season_type)
+        return self._get(key, lambda: fetch_frames(
+            leaguedashptdefend.LeagueDashPtDefend,
+            season=season,
+            defense_category=category,
+            per_mode_simple=per_mode,
+            date_from_nullable=date_from,
+            date_to_nullable=date_to,
+            season_type_all_star=season_type,
+            timeout=self.timeout,
+        )[0])
+
+    def player_pt_shot(self, season: str, general_range: str = "Overall", per_mode: str = "PerGame",
+                       season_type: str = "Regular Season") -> pd.DataFrame:
+        """全联盟投篮追踪 (Catch and Shoot / Pull Ups 等)，取代逐个球员的 PlayerDashPtShots"""
+        key = ("LeagueDashPlayerPtShot", season, general_range, per_mode, season_type)
+        return self._get(key, lambda: fetch_frames(
+            leaguedashplayerptshot.LeagueDashPlayerPtShot,
+            season=season,
+            general_range_nullable=general_range,
+            per_mode_simple=per_mode,
+            season_type_all_star=season_type,
+            timeout=self.timeout,
+        )[0])
+
+    def player_index(self, season: str) -> pd.DataFrame:
+        key = ("PlayerIndex", season)
+        return self._get(key, lambda: fetch_frames(
+            playerindex.PlayerIndex,
+            season=season, historical_nullable=0, timeout=self.timeout
+        )[0])
+
+    def player_game_logs(self, season: str, date_from: Optional[str] = "", date_to: Optional[str] = "",
+                         player_id: Optional[int] = None, measure: str = "Base") -> pd.DataFrame:
+        date_from, date_to = date_from or "", date_to or ""
+        key = ("PlayerGameLogs", season, date_from, date_to, player_id, measure)
+
+        def load():
+            df = fetch_frames(
+                playergamelogs.PlayerGameLogs,
+                season_nullable=season,
+                date_from_nullable=date_from,
+                date_to_nullable=date_to,
+                player_id_nullable=player_id or "",
+                measure_type_player_game_logs_nullable=measure,
+                timeout=self.timeout,
+            )[0]
+            if "GAME_DATE" in df.columns:
+                df = df.assign(GAME_DATE=pd.to_datetime(df["GAME_DATE"]))
+            return df
+
+        return self._get(key, load)
+
+    def team_game_logs(self, season: str, date_from: Optional[str] = "",
+                       season_type: str = "Regular Season") -> pd.DataFrame:
+        """全联盟球队比赛日志 (一次请求覆盖 30 队)，每行已按 GAME_ID 补上对手计数 (OPP_ 前缀)"""
+        date_from = date_from or ""
+        key = ("TeamGameLogs", season, date_from, season_type)
+
+        def load():
+            df = fetch_frames(
+                teamgamelogs.TeamGameLogs,
+                season_nullable=season,
+                season_type_nullable=season_type,
+                date_from_nullable=date_from,
+                timeout=self.timeout,
+            )[0]
+            if "GAME_DATE" in df.columns:
+                df = df.assign(GAME_DATE=pd.to_datetime(df["GAME_DATE"]))
+            return with_opponents(df)
+
+        return self._get(key, load)
+
+    def stats(self):
+        return self.tables.stats()
+
+get_store = singleton(LeagueDataStore)
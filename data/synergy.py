@@ -0,0 +1,85 @@
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+from nba_api.stats.endpoints import SynergyPlayTypes
+
+from data.cache import CACHE_DIR, TTLCache, atomic_write, singleton
+from data.nba_client import fetch_frames
+
+ID_COLUMNS = {"P": "PLAYER_ID", "T": "TEAM_ID"}
+
+def current_season() -> str:
+    now = datetime.now()
+    start = now.year if now.month >= 9 else now.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+class SynergyStore:
+    """Synergy 战术类型联盟表仓库。
+
+    SynergyPlayTypes 一次返回全联盟某一战术类型的数据，因此按
+    (赛季, P/T, 战术类型, 进攻/防守) 只下载一次，按 PLAYER_ID / TEAM_ID 建索引，
+    内存里进程共享，同时落盘到 .cache/synergy：往季数据永久有效，本赛季按 ttl 过期。
+    返回的表为共享数据 (见 TTLCache)。
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR / "synergy", ttl: float = 6 * 3600):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.tables = TTLCache(ttl=ttl, maxsize=512)
+
+    def _path(self, key: tuple) -> Path:
+        return self.cache_dir / ("_".join(str(k) for k in key) + ".pkl")
+
+    def _fresh(self, path: Path, season: str) -> bool:
+        if not path.exists():
+            return False
+        if season != current_season():
+            return True
+        return time.time() - path.stat().st_mtime < self.ttl
+
+    def _load(self, key: tuple) -> pd.DataFrame:
+        season, who, play_type, grouping, per_mode, season_type = key
+        path = self._path(key)
+        if self._fresh(path, season):
+            try:
+                return pd.read_pickle(path)
+            except Exception:
+                pass
+        df = fetch_frames(
+            SynergyPlayTypes,
+            player_or_team_abbreviation=who,
+            play_type_nullable=play_type,
+            season=season,
+            type_grouping_nullable=grouping,
+            per_mode_simple=per_mode,
+            season_type_all_star=season_type,
+        )[0]
+        id_col = ID_COLUMNS[who]
+        if id_col in df.columns:
+            # 赛季中被交易的球员每支球队各一行，与原先取第一行的逻辑保持一致
+            df = df.drop_duplicates(id_col).set_index(id_col, drop=False)
+            # 索引不带名字，避免按 id 列 merge 时与同名索引冲突
+            df.index.name = None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, df.to_pickle)
+        return df
+
+    def table(self, season: str, play_type: str, who: str = "P", grouping: str = "offensive",
+              per_mode: str = "PerGame", season_type: str = "Regular Season") -> pd.DataFrame:
+        key = (season, who.upper(), play_type, grouping.lower(), per_mode, season_type)
+        return self.tables.get_or_load(key, lambda: self._load(key))
+
+    def lookup(self, season: str, play_type: str, entity_id: int, who: str = "P",
+               grouping: str = "offensive") -> Optional[pd.Series]:
+        df = self.table(season, play_type, who=who, grouping=grouping)
+        if entity_id not in df.index:
+            return None
+        return df.loc[entity_id]
+
+    def stats(self):
+        return self.tables.stats()
+
+get_synergy_store = singleton(SynergyStore)
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from data.cache import CACHE_DIR, TTLCache, atomic_write, singleton
+from data.career import SYNERGY_FIRST_SEASON
+from data.feature_store import all_seasons
+from data.store import get_store
+from data.synergy import current_season, get_synergy_store
+
+ARCHIVE_DIR = CACHE_DIR / "team_archive"
+ARCHIVE_VERSION = 1
+# 从 1995-96 开始：对比页默认的 72 胜公牛 (1995-96) 也能离线读取
+ARCHIVE_FIRST_SEASON = 1995
+TEAM_PLAY_TYPES = ["Isolation", "PRBallHandler", "PRRollman", "Postup", "Spotup", "Handoff", "Cut",
+                   "OffScreen", "Transition"]
+TABLES = ("base", "advanced", "shooting", "synergy")
+
+def completed_seasons(first: int = ARCHIVE_FIRST_SEASON) -> List[str]:
+    """已结束的赛季 (本赛季数据仍在变化，不进入归档)"""
+    return [s for s in all_seasons(first) if s != current_season()]
+
+def _season_tables(season: str, workers: int = 8) -> Dict[str, pd.DataFrame]:
+    """一个赛季 30 支球队的全部归档表：联盟总表各一次请求，投篮分段按球队并发拉取"""
+    store, synergy = get_store(), get_synergy_store()
+    base = store.team_stats(season, "Base", "PerGame")
+    advanced = store.team_stats(season, "Advanced", "PerGame")
+    team_ids = [int(t) for t in base["TEAM_ID"]] if "TEAM_ID" in base.columns else []
+
+    def shooting(team_id: int) -> pd.DataFrame:
+        return store.team_shooting_splits(team_id, season).assign(TEAM_ID=team_id)
+
+    def play_type(pt: str) -> pd.DataFrame:
+        return synergy.table(season, pt, who="T").assign(PLAY_TYPE=pt)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        shots = list(pool.map(shooting, team_ids))
+        plays = list(pool.map(play_type, TEAM_PLAY_TYPES)) if int(season[:4]) >= SYNERGY_FIRST_SEASON else []
+    shots = [df for df in shots if not df.empty]
+    plays = [df for df in plays if not df.empty]
+    return {
+        "base": base,
+        "advanced": advanced,
+        "shooting": pd.concat(shots, ignore_index=True) if shots else pd.DataFrame(),
+        "synergy": pd.concat(plays, ignore_index=True) if plays else pd.DataFrame(),
+    }
+
+class TeamArchive:
+    """本地球队赛季归档：每个赛季一个 gzip 压缩的 pickle (base/advanced/shooting/synergy 四张表)，
+    index.json 记录已归档的赛季、球队与构建时间。
+
+    往季数据不再变化，读取后进程内常驻；任意跨时代对比直接读盘，无需联网。
+    返回的表为共享数据 (见 TTLCache)。
+    """
+
+    def __init__(self, path: Path = ARCHIVE_DIR):
+        self.path = path
+        self.tables = TTLCache(ttl=7 * 24 * 3600, maxsize=64)
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_mtime = None
+
+    def _file(self, season: str) -> Path:
+        return self.path / f"{season}.pkl.gz"
+
+    @property
+    def index(self) -> Dict:
+        index_path = self.path / "index.json"
+        try:
+            mtime = index_path.stat().st_mtime
+        except FileNotFoundError:
+            return {"version": ARCHIVE_VERSION, "seasons": {}}
+        with self._lock:
+            if self._index is None or self._index_mtime != mtime:
+                self._index = json.loads(index_path.read_text(encoding="utf-8"))
+                self._index_mtime = mtime
+                # 其他进程重新归档后旧的内存表作废
+                self.tables.clear()
+            return self._index
+
+    def seasons(self) -> List[str]:
+        return sorted(self.index.get("seasons", {}))
+
+    def __contains__(self, season: str) -> bool:
+        return season in self.index.get("seasons", {})
+
+    def season(self, season: str) -> Optional[Dict[str, pd.DataFrame]]:
+        if season not in self:
+            return None
+        return self.tables.get_or_load(season, lambda: pd.read_pickle(self._file(season), compression="gzip"))
+
+    def team(self, team_id: int, season: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """某支球队某赛季的各表行；base/advanced 为单行表，shooting 为各距离分段，synergy 按 PLAY_TYPE 建索引"""
+        tables = self.season(season)
+        if tables is None or team_id not in tables["base"].index:
+            return None
+        shooting, synergy = tables["shooting"], tables["synergy"]
+        return {
+            "base": tables["base"].loc[[team_id]],
+            "advanced": tables["advanced"].loc[[team_id]] if team_id in tables["advanced"].index
+            else tables["advanced"].iloc[0:0],
+            "shooting": shooting[shooting["TEAM_ID"] == team_id] if not shooting.empty else shooting,
+            "synergy": synergy[synergy["TEAM_ID"] == team_id].set_index("PLAY_TYPE")
+            if not synergy.empty else synergy,
+        }
+
+    def write(self, season: str, tables: Dict[str, pd.DataFrame]):
+        self.path.mkdir(parents=True, exist_ok=True)
+        target = self._file(season)
+        atomic_write(target, lambda tmp: pd.to_pickle(tables, tmp, compression="gzip"))
+        with self._lock:
+            index_path = self.path / "index.json"
+            index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() \
+                else {"version": ARCHIVE_VERSION, "seasons": {}}
+            base = tables["base"]
+            index["seasons"][season] = {
+                "file": target.name,
+                "teams": [int(t) for t in base["TEAM_ID"]] if "TEAM_ID" in base.columns else [],
+                "tables": {name: len(tables[name]) for name in TABLES},
+                "bytes": target.stat().st_size,
+                "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            text = json.dumps(index, ensure_ascii=False, indent=1, sort_keys=True)
+            atomic_write(index_path, lambda tmp: tmp.write_text(text, encoding="utf-8"))
+
+def backfill_teams(seasons: Optional[Iterable[str]] = None, archive: Optional[TeamArchive] = None,
+                   workers: int = 8, refresh: bool = False,
+                   progress: Optional[Callable[[str, Dict[str, int]], None]] = None) -> TeamArchive:
+    """离线归档：逐赛季拉取并写盘 (每个赛季完成即落盘，中断后重跑会跳过已归档的赛季)"""
+    archive = archive or get_team_archive()
+    for season in list(seasons or completed_seasons()):
+        if season in archive and not refresh:
+            continue
+        tables = _season_tables(season, workers=workers)
+        if tables["base"].empty:
+            continue
+        archive.write(season, tables)
+        if progress:
+            progress(season, {name: len(tables[name]) for name in TABLES})
+    return archive
+
+get_team_archive = singleton(TeamArchive)
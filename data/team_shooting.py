@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import pandas as pd
+
+from data.cache import TTLCache, singleton
+from data.store import get_store
+from data.synergy import current_season
+from data.team_archive import get_team_archive
+from logic.shot_zones import summary, zone_profile, zone_ranks
+
+class TeamShootingStore:
+    """全联盟球队投篮区域画像，每个赛季一张表 (30 行)，进程内共享。
+
+    往季的距离分段直接取本地球队归档 (team-backfill)，否则 30 队并发拉取 (经统一限速)；
+    所有球队的分段拼成一张长表后一次 groupby 聚合，区域命中率按出手量加权。
+    """
+
+    def __init__(self, ttl: float = 3600, workers: int = 8):
+        self.profiles = TTLCache(ttl=ttl, maxsize=64)
+        self.workers = workers
+
+    def league_shots(self, season: str) -> pd.DataFrame:
+        """30 队距离分段长表 (含 TEAM_ID)"""
+        if season != current_season():
+            archived = get_team_archive().season(season)
+            if archived is not None and not archived["shooting"].empty:
+                return archived["shooting"]
+        store = get_store()
+        base = store.team_stats(season, "Base", "PerGame")
+        team_ids = [int(t) for t in base["TEAM_ID"]] if "TEAM_ID" in base.columns else []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            shots = list(pool.map(lambda tid: store.team_shooting_splits(tid, season).assign(TEAM_ID=tid), team_ids))
+        shots = [df for df in shots if not df.empty]
+        return pd.concat(shots, ignore_index=True) if shots else pd.DataFrame()
+
+    def season(self, season: str) -> pd.DataFrame:
+        """区域画像表，按 TEAM_ID 建索引 (共享数据，见 TTLCache)"""
+        return self.profiles.get_or_load(("profile", season), lambda: zone_profile(self.league_shots(season)))
+
+    def cached(self, season: str) -> Optional[pd.DataFrame]:
+        """不联网即可得到的区域画像：已在内存中，或往季已有本地归档；否则返回 None"""
+        profile = self.profiles.get(("profile", season))
+        if profile is not None:
+            return profile
+        if season != current_season():
+            archived = get_team_archive().season(season)
+            if archived is not None and not archived["shooting"].empty:
+                return self.season(season)
+        return None
+
+    def ranks(self, season: str) -> pd.DataFrame:
+        return self.profiles.get_or_load(("ranks", season), lambda: zone_ranks(self.season(season)))
+
+    def team(self, team_id: int, season: str) -> Dict[str, float]:
+        profile = self.season(season)
+        return summary(profile.loc[team_id]) if team_id in profile.index else {}
+
+get_team_shooting_store = singleton(TeamShootingStore)
@@ -1,4 +1,6 @@
 from typing import Dict
+import numpy as np
+import pandas as pd
 from config.settings import SCORING_THRESHOLDS, WEIGHTS, DEFENSE_MULTIPLIERS, SHOOTING_VOLUME_MAX
 
 def normalize(value: float, min_val: float, max_val: float) -> int:
@@ -70,4 +72,54 @@ def get_tier_badge(ovr: int) -> str:
         return "T1.5"
     if ovr >= 80:
         return "T2"
-    return "T3"
\ No newline at end of file
+    return "T3"
+
+def rate_player(stats: Dict, archetype: str, sliders: Dict) -> Dict:
+    subs = calculate_sub_scores(stats, archetype, sliders)
+    ovr = calculate_ovr(subs, archetype)
+    return {"sub_scores": subs, "ovr": ovr, "tier": get_tier_badge(ovr)}
+
+def normalize_array(values, min_val: float, max_val: float) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    if max_val == min_val:
+        return np.full(values.shape, 60, dtype=int)
+    score = 60 + (values - min_val) / (max_val - min_val) * 40
+    return np.clip(np.round(score), 60, 99).astype(int)
+
+def calculate_sub_scores_frame(stats: pd.DataFrame, archetype: str, sliders: Dict) -> pd.DataFrame:
+    ts_min, ts_max = SCORING_THRESHOLDS["TS_PCT"][archetype]
+    scoring = normalize_array(stats["TS_PCT"], ts_min, ts_max)
+    ast_min, ast_max = SCORING_THRESHOLDS["AST_PCT"][archetype]
+    playmaking = normalize_array(stats["AST_PCT"], ast_min, ast_max)
+    playmaking = np.where(stats["AST_TO"].to_numpy() < 2.0, np.maximum(60, playmaking - 5), playmaking)
+    three_min, three_max = SCORING_THRESHOLDS["THREE_PCT"][archetype]
+    shooting_base = normalize_array(stats["THREE_PCT"], three_min, three_max)
+    vol_ratio = np.minimum(1.0, stats["THREE_PM"].to_numpy(dtype=float) / SHOOTING_VOLUME_MAX[archetype])
+    shooting = np.minimum(99, np.round(shooting_base + vol_ratio * 10)).astype(int)
+    reb_min, reb_max = SCORING_THRESHOLDS["REB_PCT"][archetype]
+    rebounding = normalize_array(stats["REB_PCT"], reb_min, reb_max)
+    dm = DEFENSE_MULTIPLIERS[archetype]
+    data_def = np.clip(60 + stats["STL_PCT"].to_numpy(dtype=float) * dm["stl"]
+                       + stats["BLK_PCT"].to_numpy(dtype=float) * dm["blk"], 60, 99)
+    defense = np.round(0.4 * data_def + 0.6 * sliders.get("def_eye_test", 75)).astype(int)
+    n = len(stats)
+    return pd.DataFrame({
+        "Scoring": scoring,
+        "Playmaking": playmaking.astype(int),
+        "Shooting": shooting,
+        "Rebounding": rebounding,
+        "Defense": defense,
+        "Isolation": np.full(n, int(sliders.get("isolation", 75))),
+        "Clutch": np.full(n, int(sliders.get("clutch", 75)))
+    }, index=stats.index)
+
+def calculate_ovr_frame(sub_scores: pd.DataFrame, archetype: str) -> np.ndarray:
+    weights = WEIGHTS[archetype]
+    total = np.zeros(len(sub_scores))
+    for key in ["Scoring", "Playmaking", "Defense", "Rebounding", "Clutch", "Isolation"]:
+        total += sub_scores[key].to_numpy(dtype=float) * weights[key]
+    return np.clip(np.round(total), 60, 99).astype(int)
+
+def get_tier_badges(ovr) -> np.ndarray:
+    ovr = np.asarray(ovr)
+    return np.select([ovr >= 96, ovr >= 90, ovr >= 85, ovr >= 80], ["T0", "T1", "T1.5", "T2"], default="T3")
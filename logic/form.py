@@ -0,0 +1,146 @@
+import threading
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+COUNT_COLS = ["MIN", "PTS", "REB", "AST", "STL", "BLK", "TOV", "FGM", "FGA", "FG3M", "FG3A",
+              "FTM", "FTA", "OREB", "DREB", "PF", "PLUS_MINUS"]
+# 比率类高阶数据无法直接相加：按回合数加权后再求和，窗口内除以总回合数还原
+POSS_WEIGHTED_COLS = ["USG_PCT", "AST_PCT", "PIE"]
+PER_100_COLS = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "FGA", "FG3A", "FTA", "OREB", "DREB"]
+ROLLING_WINDOWS = (5, 10, 20)
+
+def _merge_logs(base: pd.DataFrame, adv: Optional[pd.DataFrame]) -> pd.DataFrame:
+    df = base.copy()
+    if adv is not None and not adv.empty and "GAME_ID" in adv.columns and "GAME_ID" in df.columns:
+        extra = ["GAME_ID"] + [c for c in ["POSS"] + POSS_WEIGHTED_COLS if c in adv.columns and c not in df.columns]
+        df = df.merge(adv[extra], on="GAME_ID", how="left")
+    df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])
+    return df.sort_values("GAME_DATE").reset_index(drop=True)
+
+class PlayerFormEngine:
+    """单个球员单赛季的状态引擎。
+
+    比赛日志只下载一次，按日期排序后对计数类数据做前缀和，任意日期区间、最近 N 场、
+    滚动窗口的汇总都是两次前缀和相减，O(1) 完成。汇总口径与
+    PlayerDashboardByGeneralSplits 的默认 Totals 一致 (计数为总和，POSS 为总回合)。
+    """
+
+    def __init__(self, base_logs: pd.DataFrame, adv_logs: Optional[pd.DataFrame] = None):
+        self.columns = []
+        self.dates = np.array([], dtype="datetime64[ns]")
+        self.prefix = np.zeros((1, 0))
+        self._lock = threading.Lock()
+        self.append_games(base_logs, adv_logs)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        return pd.Timestamp(self.dates[-1]) if len(self.dates) else None
+
+    def _matrix(self, logs: pd.DataFrame) -> np.ndarray:
+        df = logs.copy()
+        if "POSS" not in df.columns or df["POSS"].isna().all():
+            # 没有高阶日志时按 FGA + 0.44*FTA + TOV 估算回合
+            df["POSS"] = df["FGA"] + 0.44 * df["FTA"] + df["TOV"]
+        df["POSS"] = df["POSS"].fillna(0)
+        for col in POSS_WEIGHTED_COLS:
+            df[f"{col}_W"] = df[col].fillna(0) * df["POSS"] if col in df.columns else 0.0
+        if not self.columns:
+            self.columns = [c for c in COUNT_COLS if c in df.columns] + ["POSS"] + \
+                           [f"{c}_W" for c in POSS_WEIGHTED_COLS]
+        for col in self.columns:
+            if col not in df.columns:
+                df[col] = 0.0
+        return df[self.columns].fillna(0).to_numpy(dtype=float)
+
+    def append_games(self, base_logs: pd.DataFrame, adv_logs: Optional[pd.DataFrame] = None) -> int:
+        """追加新比赛 (只接收晚于已有最后一场的日志)，前缀和在末尾延长，返回新增场次"""
+        with self._lock:
+            return self._append(base_logs, adv_logs)
+
+    def _append(self, base_logs: pd.DataFrame, adv_logs: Optional[pd.DataFrame]) -> int:
+        if base_logs is None or base_logs.empty:
+            if not self.columns:
+                self._matrix(pd.DataFrame(columns=COUNT_COLS))
+                self.prefix = np.zeros((1, len(self.columns)))
+            return 0
+        logs = _merge_logs(base_logs, adv_logs)
+        if len(self.dates):
+            logs = logs[logs["GAME_DATE"] > self.last_date]
+            if logs.empty:
+                return 0
+        values = self._matrix(logs)
+        if self.prefix.shape[1] != values.shape[1]:
+            self.prefix = np.zeros((1, values.shape[1]))
+        tail = self.prefix[-1] + np.cumsum(values, axis=0)
+        # 先换前缀和再换日期：并发读取方按 len(dates) 取下标，始终落在有效范围内
+        self.prefix = np.vstack([self.prefix, tail])
+        self.dates = np.concatenate([self.dates, logs["GAME_DATE"].to_numpy(dtype="datetime64[ns]")])
+        return len(logs)
+
+    def _totals(self, start: int, end: int) -> Dict[str, float]:
+        diff = self.prefix[end] - self.prefix[start]
+        return dict(zip(self.columns, diff))
+
+    def summarize(self, start: int, end: int) -> Optional[Dict[str, float]]:
+        """第 start 场 (含) 到第 end 场 (不含) 的汇总"""
+        start, end = max(0, start), min(len(self), end)
+        if end <= start:
+            return None
+        t = self._totals(start, end)
+        gp = end - start
+        poss = t["POSS"]
+        tsa = 2 * (t.get("FGA", 0) + 0.44 * t.get("FTA", 0))
+        out = {k: t.get(k, 0.0) for k in COUNT_COLS}
+        out.update({
+            "GP": gp,
+            "POSS": poss,
+            "FG_PCT": t.get("FGM", 0) / t["FGA"] if t.get("FGA") else 0.0,
+            "FG3_PCT": t.get("FG3M", 0) / t["FG3A"] if t.get("FG3A") else 0.0,
+            "TS_PCT": t.get("PTS", 0) / tsa if tsa else 0.0,
+        })
+        for col in POSS_WEIGHTED_COLS:
+            out[col] = t[f"{col}_W"] / poss if poss else 0.0
+        minutes = t.get("MIN", 0)
+        for col in PER_100_COLS:
+            out[f"{col}_100"] = t.get(col, 0) / poss * 100 if poss else 0.0
+            out[f"{col}_36"] = t.get(col, 0) / minutes * 36 if minutes else 0.0
+        out["POSS_EST"] = poss
+        return out
+
+    def date_range(self, date_from, date_to) -> Optional[Dict[str, float]]:
+        lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date_from)), side="left")
+        # date_to 当天的比赛也算在内
+        hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(date_to) + pd.Timedelta(days=1)), side="left")
+        return self.summarize(int(lo), int(hi))
+
+    def last_n(self, n: int) -> Optional[Dict[str, float]]:
+        return self.summarize(len(self) - n, len(self))
+
+    def season(self) -> Optional[Dict[str, float]]:
+        return self.summarize(0, len(self))
+
+    def rolling(self, window: int) -> pd.DataFrame:
+        """每场比赛结束时最近 window 场的滚动表现 (不足 window 场时按已有场次)"""
+        n = len(self)
+        if n == 0:
+            return pd.DataFrame(columns=["GAME_DATE", "PTS", "TS_PCT", "USG_PCT", "PTS_100"])
+        idx = np.arange(1, n + 1)
+        lo = np.maximum(idx - window, 0)
+        diff = self.prefix[idx] - self.prefix[lo]
+        col = {c: i for i, c in enumerate(self.columns)}
+        gp = (idx - lo).astype(float)
+        poss = diff[:, col["POSS"]]
+        tsa = 2 * (diff[:, col["FGA"]] + 0.44 * diff[:, col["FTA"]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frame = pd.DataFrame({
+                "GAME_DATE": self.dates,
+                "PTS": diff[:, col["PTS"]] / gp,
+                "TS_PCT": np.where(tsa > 0, diff[:, col["PTS"]] / tsa, 0.0),
+                "USG_PCT": np.where(poss > 0, diff[:, col["USG_PCT_W"]] / poss, 0.0),
+                "PTS_100": np.where(poss > 0, diff[:, col["PTS"]] / poss * 100, 0.0),
+            })
+        return frame
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+# 阵容表按列存储：数值列为 float64/int64 数组，文本列为定长 unicode 数组
+NUMERIC_COLS = ["GROUP_SIZE", "TEAM_ID", "GP", "W", "L", "MIN", "PTS", "PLUS_MINUS", "POSS",
+                "OFF_RATING", "DEF_RATING", "NET_RATING", "PACE", "TS_PCT", "EFG_PCT",
+                "AST_PCT", "OREB_PCT", "DREB_PCT", "TM_TOV_PCT"]
+TEXT_COLS = ["GROUP_ID", "GROUP_NAME", "TEAM_ABBREVIATION"]
+INT_COLS = ("GROUP_SIZE", "TEAM_ID", "GP", "W", "L")
+
+def parse_group_id(group_id: str) -> np.ndarray:
+    """'-201939-202691-' -> [201939, 202691]"""
+    return np.array([int(p) for p in str(group_id).strip("-").split("-") if p], dtype=np.int64)
+
+def _postings(keys: np.ndarray, rows: np.ndarray):
+    """倒排表 (CSR)：keys 去重排序，rows 按 key 分段，每段内行号升序"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    uniq, starts = np.unique(sorted_keys, return_index=True)
+    offsets = np.append(starts, len(sorted_keys)).astype(np.int64)
+    return uniq, offsets, rows[order]
+
+class LineupIndex:
+    """单赛季全联盟阵容 (2/3/5 人) 的列式索引。
+
+    球员 -> 阵容行号、球队 -> 阵容行号各建一张倒排表 (CSR)；"同时包含 X 和 Y" 是几条
+    有序行号数组求交集，之后的分钟/人数过滤与排序都只在候选行上做向量化运算。
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], members: np.ndarray, member_offsets: np.ndarray):
+        self.columns = columns
+        self.members = members
+        self.member_offsets = member_offsets
+        n = len(member_offsets) - 1
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(member_offsets))
+        self.player_keys, self.player_offsets, self.player_rows = _postings(members, rows)
+        self.team_keys, self.team_offsets, self.team_rows = _postings(
+            columns["TEAM_ID"], np.arange(n, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.member_offsets) - 1
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "LineupIndex":
+        """df 需含 GROUP_ID / GROUP_SIZE / TEAM_ID；缺失的指标列记为 NaN"""
+        columns = {}
+        for col in NUMERIC_COLS:
+            values = pd.to_numeric(df[col], errors="coerce") if col in df.columns else pd.Series(np.nan, index=df.index)
+            columns[col] = values.fillna(0).to_numpy(np.int64) if col in INT_COLS else values.to_numpy(np.float64)
+        for col in TEXT_COLS:
+            columns[col] = df[col].astype(str).to_numpy(dtype=str) if col in df.columns else np.full(len(df), "")
+        groups = [parse_group_id(g) for g in columns["GROUP_ID"]]
+        sizes = np.array([len(g) for g in groups], dtype=np.int64)
+        members = np.concatenate(groups) if groups else np.array([], dtype=np.int64)
+        return cls(columns, members, np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """落盘用 (np.savez)：列 + 成员 CSR，倒排表加载时重建"""
+        out = {f"col_{c}": v for c, v in self.columns.items()}
+        out.update({"members": self.members, "member_offsets": self.member_offsets})
+        return out
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "LineupIndex":
+        columns = {k[4:]: arrays[k] for k in arrays.keys() if k.startswith("col_")}
+        return cls(columns, arrays["members"], arrays["member_offsets"])
+
+    def _posting(self, keys: np.ndarray, offsets: np.ndarray, rows: np.ndarray, key: int) -> np.ndarray:
+        i = np.searchsorted(keys, key)
+        if i >= len(keys) or keys[i] != key:
+            return rows[:0]
+        return rows[offsets[i]:offsets[i + 1]]
+
+    def rows_with_player(self, player_id: int) -> np.ndarray:
+        return self._posting(self.player_keys, self.player_offsets, self.player_rows, player_id)
+
+    def rows_of_team(self, team_id: int) -> np.ndarray:
+        return self._posting(self.team_keys, self.team_offsets, self.team_rows, team_id)
+
+    def players(self, row: int) -> np.ndarray:
+        return self.members[self.member_offsets[row]:self.member_offsets[row + 1]]
+
+    def query(self, players: Iterable[int] = (), team_id: Optional[int] = None, size: Optional[int] = None,
+              min_minutes: float = 0, sort: str = "NET_RATING", ascending: bool = False,
+              limit: Optional[int] = None) -> pd.DataFrame:
+        """包含全部 players 的阵容，按 team/size/min_minutes 过滤后以 sort 排序 (NaN 排在最后)"""
+        postings = [self.rows_with_player(int(p)) for p in dict.fromkeys(players)]
+        if team_id is not None:
+            postings.append(self.rows_of_team(int(team_id)))
+        if postings:
+            # 从最短的倒排表开始求交集，候选集只会越来越小
+            postings.sort(key=len)
+            rows = postings[0]
+            for other in postings[1:]:
+                rows = np.intersect1d(rows, other, assume_unique=True)
+        else:
+            rows = np.arange(len(self), dtype=np.int64)
+
+        mask = self.columns["MIN"][rows] >= min_minutes
+        if size is not None:
+            mask &= self.columns["GROUP_SIZE"][rows] == size
+        rows = rows[mask]
+        values = self.columns[sort][rows]
+        rows = rows[np.argsort(values if ascending else -values, kind="stable")]
+        if limit is not None:
+            rows = rows[:limit]
+        return pd.DataFrame({c: v[rows] for c, v in self.columns.items()})
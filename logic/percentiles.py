@@ -0,0 +1,33 @@
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+
+RANK_COLS = ["PTS", "rTS%", "AST_PCT", "USG_PCT", "DEFLECTIONS", "CONTESTED_SHOTS", "HUSTLE_SCORE"]
+HUSTLE_FACTORS = ["DEFLECTIONS", "CONTESTED_SHOTS", "SCREEN_ASSISTS", "LOOSE_BALLS_RECOVERED", "BOX_OUTS"]
+# 百分位的比较人群：全联盟 / 同位置 / 同出场时间档
+GROUPINGS = ["LEAGUE", "POSITION", "MIN_BAND"]
+POSITIONS = ["Guard", "Forward", "Center"]
+MIN_BANDS = [(12, 20), (20, 28), (28, 34), (34, 48)]
+
+def position_group(pos: pd.Series) -> pd.Series:
+    """PlayerIndex 的 POSITION (G / F-C / ...) -> Guard / Forward / Center，缺失记为 Forward"""
+    pos = pos.fillna("").astype(str).str.upper()
+    return pd.Series(np.select([pos.str.contains("C"), pos.str.contains("F"), pos.str.contains("G")],
+                               ["Center", "Forward", "Guard"], "Forward"), index=pos.index)
+
+def band_labels() -> List[str]:
+    return [f"{lo}-{hi}" for lo, hi in MIN_BANDS]
+
+def minutes_band(minutes: pd.Series) -> pd.Series:
+    """场均分钟 -> '12-20' 等档位标签"""
+    # 最后一档不设上限 (加时赛可能让场均超过 48 分钟)
+    edges = [lo for lo, _ in MIN_BANDS] + [np.inf]
+    return pd.cut(minutes, bins=edges, labels=band_labels(), right=False, include_lowest=True).astype(str)
+
+def percentile_ranks(df: pd.DataFrame, cols: List[str] = RANK_COLS) -> Dict[str, np.ndarray]:
+    """一个赛季的三种人群百分位 (0-100)，{grouping: (行数, 指标数) float32 矩阵}；缺失的指标列记 NaN"""
+    values = df.reindex(columns=cols).astype(float)
+    out = {"LEAGUE": values.rank(pct=True).to_numpy(np.float32) * 100}
+    for grouping in GROUPINGS[1:]:
+        out[grouping] = values.groupby(df[grouping]).rank(pct=True).to_numpy(np.float32) * 100
+    return out
@@ -0,0 +1,37 @@
+from typing import List
+import numpy as np
+import pandas as pd
+
+RATE_COLS = ["PTS", "REB", "AST", "STL", "BLK", "TOV", "FGA", "FG3A", "FTA", "OREB", "DREB"]
+
+def rate_columns() -> List[str]:
+    return ["POSS_EST"] + [f"{c}_100" for c in RATE_COLS] + [f"{c}_36" for c in RATE_COLS]
+
+def estimate_possessions(df: pd.DataFrame) -> pd.Series:
+    """优先使用官方 POSS，缺失或为 0 时按 FGA + 0.44*FTA + TOV 估算"""
+    est = df.get("FGA", 0) + 0.44 * df.get("FTA", 0) + df.get("TOV", 0)
+    est = pd.Series(est, index=df.index, dtype=float)
+    if "POSS" in df.columns:
+        official = pd.to_numeric(df["POSS"], errors="coerce")
+        est = official.where(official > 0, est)
+    return est
+
+def add_rate_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """整张表一次性算出每 100 回合 / 每 36 分钟数据，回合估计值存为 POSS_EST。
+
+    计数列与 POSS/MIN 口径一致即可 (Totals 或 PerGame 均可)，返回新表，不修改入参。
+    """
+    if df.empty:
+        return df.assign(**{c: pd.Series(dtype=float) for c in rate_columns()})
+    poss = estimate_possessions(df).to_numpy(dtype=float)
+    minutes = pd.to_numeric(df["MIN"], errors="coerce").to_numpy(dtype=float) if "MIN" in df.columns \
+        else np.zeros(len(df))
+    cols = [c for c in RATE_COLS if c in df.columns]
+    counts = df[cols].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_100 = np.where(poss[:, None] > 0, counts / poss[:, None] * 100, 0.0)
+        per_36 = np.where(minutes[:, None] > 0, counts / minutes[:, None] * 36, 0.0)
+    new = {"POSS_EST": poss}
+    new.update({f"{c}_100": per_100[:, i] for i, c in enumerate(cols)})
+    new.update({f"{c}_36": per_36[:, i] for i, c in enumerate(cols)})
+    return df.assign(**new)
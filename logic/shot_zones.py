@@ -0,0 +1,70 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+# TeamDashboardByShootingSplits 的 5 英尺分段 -> 区域 (20-24 ft 同时含长两分与底角三分，三分另按 FG3 计数统计)
+ZONE_BUCKETS = {
+    "Less Than 5 ft.": "RIM",
+    "5-9 ft.": "PAINT",
+    "10-14 ft.": "MID",
+    "15-19 ft.": "MID",
+    "20-24 ft.": "LONG",
+    "25-29 ft.": "DEEP",
+    "30-34 ft.": "DEEP",
+    "35-39 ft.": "DEEP",
+    "40+ ft.": "DEEP",
+}
+ZONES = ["RIM", "PAINT", "MID", "LONG", "DEEP"]
+COUNT_COLS = ["FGM", "FGA", "FG3M", "FG3A"]
+
+def _ratio(num: pd.Series, den: pd.Series) -> pd.Series:
+    return (num / den.where(den > 0)).astype(float)
+
+def zone_profile(shots: pd.DataFrame) -> pd.DataFrame:
+    """多支球队的距离分段表 (需含 TEAM_ID) 一次聚合成区域画像，每队一行，按 TEAM_ID 建索引。
+
+    每个区域: {ZONE}_FGA / {ZONE}_FG_PCT (区域内投中数 / 出手数，即按出手量加权) / {ZONE}_FREQ (出手占比)；
+    三分: FG3_PCT = 三分命中总数 / 三分出手总数，FG3A_FREQ = 三分出手 / 总出手。
+    """
+    cols = [f"{z}_{m}" for z in ZONES for m in ("FGA", "FG_PCT", "FREQ")] + ["FGA", "FG3A", "FG3_PCT", "FG3A_FREQ"]
+    if shots is None or shots.empty or "GROUP_VALUE" not in shots.columns:
+        return pd.DataFrame(columns=cols)
+    df = shots.assign(ZONE=shots["GROUP_VALUE"].map(ZONE_BUCKETS))
+    df = df[df["ZONE"].notna()]
+    counts = df[COUNT_COLS].apply(pd.to_numeric, errors="coerce").fillna(0)
+    by_zone = counts.groupby([df["TEAM_ID"], df["ZONE"]]).sum()
+    fgm = by_zone["FGM"].unstack("ZONE").reindex(columns=ZONES, fill_value=0).fillna(0)
+    fga = by_zone["FGA"].unstack("ZONE").reindex(columns=ZONES, fill_value=0).fillna(0)
+    totals = by_zone.groupby(level="TEAM_ID").sum()
+
+    out = pd.DataFrame(index=fga.index)
+    for zone in ZONES:
+        out[f"{zone}_FGA"] = fga[zone]
+        out[f"{zone}_FG_PCT"] = _ratio(fgm[zone], fga[zone])
+        out[f"{zone}_FREQ"] = _ratio(fga[zone], totals["FGA"])
+    out["FGA"] = totals["FGA"]
+    out["FG3A"] = totals["FG3A"]
+    out["FG3_PCT"] = _ratio(totals["FG3M"], totals["FG3A"])
+    out["FG3A_FREQ"] = _ratio(totals["FG3A"], totals["FGA"])
+    out.index.name = None
+    return out[cols]
+
+def zone_ranks(profile: pd.DataFrame) -> pd.DataFrame:
+    """联盟排名 (1 = 最高)，与 zone_profile 同形"""
+    return profile.rank(ascending=False, method="min")
+
+def summary(row: pd.Series) -> Dict[str, float]:
+    """一支球队的区域画像行 -> 对比页使用的键 (缺失记为 None)"""
+    def val(col):
+        v = row.get(col)
+        return None if v is None or pd.isna(v) else float(v)
+
+    res = {
+        "Rim FG%": val("RIM_FG_PCT"),
+        "Rim Freq": val("RIM_FREQ"),
+        "Mid FG%": val("MID_FG_PCT"),
+        "Mid Freq": val("MID_FREQ"),
+        "3P FG%": val("FG3_PCT"),
+        "3P Freq": val("FG3A_FREQ"),
+    }
+    return {k: v for k, v in res.items() if v is not None and np.isfinite(v)}
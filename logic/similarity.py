@@ -0,0 +1,158 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy 为可选依赖，缺失时退回 numpy 暴力搜索 (两万行量级仍是毫秒级)
+    cKDTree = None
+
+KEY_COLS = ["PLAYER_ID", "PLAYER_NAME", "SEASON", "TEAM_ABBREVIATION", "GP", "MIN"]
+SYNERGY_FEATURES = {
+    "Isolation": "ISO_FREQ",
+    "PRBallHandler": "PNR_BH_FREQ",
+    "PRRollman": "PNR_ROLL_FREQ",
+    "Postup": "POSTUP_FREQ",
+    "Spotup": "SPOTUP_FREQ",
+    "Handoff": "HANDOFF_FREQ",
+    "Cut": "CUT_FREQ",
+    "OffScreen": "OFFSCREEN_FREQ",
+    "Transition": "TRANSITION_FREQ",
+}
+TRACKING_FEATURES = {"Catch and Shoot": "CS_FGA_FREQ", "Pull Ups": "PU_FGA_FREQ"}
+FEATURE_GROUPS = {
+    "box": ["PTS_100", "AST_100", "OREB_100", "DREB_100", "STL_100", "BLK_100", "TOV_100",
+            "FGA_100", "FG3A_100", "FTA_100"],
+    "advanced": ["TS_PCT", "EFG_PCT", "USG_PCT", "AST_PCT", "OREB_PCT", "DREB_PCT", "FG3_PCT", "FT_PCT"],
+    "synergy": list(SYNERGY_FEATURES.values()),
+    "tracking": list(TRACKING_FEATURES.values()),
+}
+# 风格类特征只覆盖近十年，权重减半，避免缺失赛季 (按联盟平均填补) 与现代赛季拉开过大距离
+GROUP_WEIGHTS = {"box": 1.0, "advanced": 1.0, "synergy": 0.5, "tracking": 0.5}
+
+def feature_columns() -> List[str]:
+    return [c for cols in FEATURE_GROUPS.values() for c in cols]
+
+def standardize_season(df: pd.DataFrame, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """单赛季内做 z-score (时代校正：与同赛季联盟比较)，缺失特征记为联盟平均 0，再乘组权重。
+
+    每个赛季独立标准化，新赛季入库不会改变已有赛季的向量，索引只需追加。
+    """
+    weights = weights or GROUP_WEIGHTS
+    out = df[[c for c in KEY_COLS if c in df.columns]].copy()
+    for group, cols in FEATURE_GROUPS.items():
+        scale = np.sqrt(weights.get(group, 1.0))
+        for col in cols:
+            values = pd.to_numeric(df[col], errors="coerce") if col in df.columns \
+                else pd.Series(np.nan, index=df.index)
+            std = values.std()
+            z = (values - values.mean()) / std if std and std > 0 else values * 0
+            out[col] = (z.fillna(0.0) * scale).astype(float)
+    return out
+
+class SimilarityIndex:
+    """历史球员赛季相似度索引。
+
+    向量为 standardize_season 的结果；主体存入 KD 树 (scipy 可用时)，新入库或更新的赛季
+    先放在增量区暴力搜索，增量超过 rebuild_ratio 时整体重建。更新某赛季时旧行只打删除标记，
+    查询时过滤，因此本赛季每天刷新也不必重建整棵树。
+    """
+
+    def __init__(self, features: Optional[Iterable[str]] = None, rebuild_ratio: float = 0.2):
+        self.features = list(features or feature_columns())
+        self.rebuild_ratio = rebuild_ratio
+        self.keys = pd.DataFrame(columns=KEY_COLS)
+        self._vectors = np.zeros((0, len(self.features)))
+        self._alive = np.zeros(0, dtype=bool)
+        self._tree = None
+        self._indexed = 0  # 前 _indexed 行已进入 KD 树，之后为增量区
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self._alive.sum())
+
+    def seasons(self) -> List[str]:
+        with self._lock:
+            return sorted(self.keys.loc[self._alive, "SEASON"].unique())
+
+    def upsert(self, frame: pd.DataFrame):
+        """写入 (或替换) 一个或多个赛季的标准化向量"""
+        if frame.empty:
+            return
+        keys = frame.reindex(columns=KEY_COLS).reset_index(drop=True)
+        vectors = frame.reindex(columns=self.features).fillna(0.0).to_numpy(dtype=float)
+        with self._lock:
+            self._alive &= ~self.keys["SEASON"].isin(keys["SEASON"].unique()).to_numpy()
+            self.keys = pd.concat([self.keys, keys], ignore_index=True) if len(self.keys) else keys
+            self._vectors = np.vstack([self._vectors, vectors])
+            self._alive = np.concatenate([self._alive, np.ones(len(keys), dtype=bool)])
+            if len(self._vectors) - self._indexed > self.rebuild_ratio * max(self._indexed, 1):
+                self._rebuild()
+
+    def rebuild(self):
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        # 压缩掉已删除的行，全部向量进入新树
+        self.keys = self.keys[self._alive].reset_index(drop=True)
+        self._vectors = self._vectors[self._alive]
+        self._alive = np.ones(len(self._vectors), dtype=bool)
+        self._indexed = len(self._vectors)
+        self._tree = cKDTree(self._vectors) if cKDTree is not None and self._indexed else None
+
+    def _candidates(self, vector: np.ndarray, k: int):
+        """返回 (行号, 距离)：树内用 KD 树查询，增量区与无 scipy 时直接算距离"""
+        rows, dists = [], []
+        start = 0
+        if self._tree is not None:
+            n = min(k, self._indexed)
+            d, i = self._tree.query(vector, k=n)
+            rows.append(np.atleast_1d(i))
+            dists.append(np.atleast_1d(d))
+            start = self._indexed
+        if start < len(self._vectors):
+            d = np.sqrt(((self._vectors[start:] - vector) ** 2).sum(axis=1))
+            rows.append(np.arange(start, len(self._vectors)))
+            dists.append(d)
+        if not rows:
+            return np.zeros(0, dtype=int), np.zeros(0)
+        return np.concatenate(rows), np.concatenate(dists)
+
+    def locate(self, player_id: int, season: str) -> Optional[int]:
+        hit = np.flatnonzero(self._alive & (self.keys["PLAYER_ID"].to_numpy() == player_id)
+                             & (self.keys["SEASON"].to_numpy() == season))
+        return int(hit[-1]) if len(hit) else None
+
+    def query(self, player_id: int, season: str, k: int = 10, exclude_player: bool = True) -> pd.DataFrame:
+        """与某个球员赛季最相似的 k 个球员赛季，按距离升序；exclude_player 时排除同一球员的其他赛季"""
+        with self._lock:
+            row = self.locate(player_id, season)
+            if row is None:
+                raise KeyError(f"{player_id} {season} 不在索引中 (未达出场时间门槛或赛季未入库)")
+            vector = self._vectors[row]
+            same = self.keys["PLAYER_ID"].to_numpy() == player_id
+            # 多取的候选覆盖已删除行与被排除的行，过滤后仍够 k 个
+            extra = int((~self._alive[:self._indexed]).sum()) + (int(same.sum()) if exclude_player else 1)
+            rows, dists = self._candidates(vector, k + extra)
+            keep = self._alive[rows] & (rows != row)
+            if exclude_player:
+                keep &= ~same[rows]
+            rows, dists = rows[keep], dists[keep]
+            order = np.argsort(dists, kind="stable")[:k]
+            result = self.keys.iloc[rows[order]].reset_index(drop=True)
+        result["DISTANCE"] = dists[order]
+        # 距离换算成 0-100 的相似度，按特征维数缩放
+        result["SIMILARITY"] = 100 * np.exp(-result["DISTANCE"] / np.sqrt(len(self.features)))
+        return result
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "rows": int(self._alive.sum()),
+                "indexed": self._indexed,
+                "delta": len(self._vectors) - self._indexed,
+                "deleted": int((~self._alive).sum()),
+                "backend": "kdtree" if self._tree is not None else "numpy",
+            }
@@ -0,0 +1,194 @@
+import threading
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+BOX_COLS = ["PTS", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA", "OREB", "DREB", "AST", "TOV", "MIN"]
+# 前缀和的列：本队、对手 (OPP_) 计数，以及场次、胜场与回合
+PREFIX_COLS = BOX_COLS + [f"OPP_{c}" for c in BOX_COLS] + ["G", "W", "POSS"]
+ROLLING_WINDOWS = (5, 10, 20)
+CHANGE_METRICS = ("NET_RATING", "OFF_RATING", "DEF_RATING", "EFG_PCT", "TM_TOV_PCT", "OREB_PCT", "FT_PER_FGA")
+
+def with_opponents(league_logs: pd.DataFrame) -> pd.DataFrame:
+    """联盟球队比赛日志按 GAME_ID 自连接，每行补上对手的同名计数 (OPP_ 前缀)"""
+    if league_logs.empty:
+        return league_logs.assign(**{f"OPP_{c}": pd.Series(dtype=float) for c in BOX_COLS})
+    cols = ["GAME_ID", "TEAM_ID"] + [c for c in BOX_COLS if c in league_logs.columns]
+    opp = league_logs[cols].rename(columns={c: f"OPP_{c}" for c in cols if c != "GAME_ID"})
+    df = league_logs.merge(opp, on="GAME_ID", how="inner")
+    return df[df["TEAM_ID"] != df["OPP_TEAM_ID"]].reset_index(drop=True)
+
+def _factors(t: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """由 (向量化的) 区间计数算出四要素与攻防效率；分母为 0 时记 0"""
+    def ratio(num, den, scale=1.0):
+        num, den = np.asarray(num, dtype=float), np.asarray(den, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(den > 0, num / den * scale, 0.0)
+
+    poss = t["POSS"]
+    # 球队 MIN 有的接口为五人分钟之和 (每场 240)，有的为比赛时长 (每场 48)
+    minutes = np.where(t["MIN"] > 100 * t["G"], t["MIN"] / 5, t["MIN"])
+    off = ratio(t["PTS"], poss, 100)
+    dfn = ratio(t["OPP_PTS"], poss, 100)
+    return {
+        "OFF_RATING": off,
+        "DEF_RATING": dfn,
+        "NET_RATING": off - dfn,
+        # 每 48 分钟回合数
+        "PACE": ratio(poss * 48, minutes),
+        "EFG_PCT": ratio(t["FGM"] + 0.5 * t["FG3M"], t["FGA"]),
+        "TS_PCT": ratio(t["PTS"], 2 * (t["FGA"] + 0.44 * t["FTA"])),
+        # 与官方高阶表一致：失误率为每 100 次进攻回合的百分数
+        "TM_TOV_PCT": ratio(t["TOV"], t["FGA"] + 0.44 * t["FTA"] + t["TOV"], 100),
+        "OREB_PCT": ratio(t["OREB"], t["OREB"] + t["OPP_DREB"]),
+        # 四要素的罚球项为 FTM / FGA (不是官方 FTA_RATE 的 FTA / FGA)
+        "FT_PER_FGA": ratio(t["FTM"], t["FGA"]),
+        "OPP_EFG_PCT": ratio(t["OPP_FGM"] + 0.5 * t["OPP_FG3M"], t["OPP_FGA"]),
+        "OPP_TOV_PCT": ratio(t["OPP_TOV"], t["OPP_FGA"] + 0.44 * t["OPP_FTA"] + t["OPP_TOV"], 100),
+        "DREB_PCT": ratio(t["DREB"], t["DREB"] + t["OPP_OREB"]),
+        "OPP_FT_PER_FGA": ratio(t["OPP_FTM"], t["OPP_FGA"]),
+        "AST_PCT": ratio(t["AST"], t["FGM"]),
+        "AST_TO": ratio(t["AST"], t["TOV"]),
+    }
+
+class TeamFormEngine:
+    """单支球队单赛季的四要素引擎。
+
+    比赛日志 (含对手计数) 只摄入一次，按日期排序后对计数做前缀和：任意日期区间、最近 N 场、
+    滚动窗口的四要素与攻防效率都是两次前缀和相减，O(1) 完成；
+    change_points() 一次向量化扫描所有切分点，找出前后表现变化最大的日期。
+    """
+
+    def __init__(self, logs: pd.DataFrame, team_id: Optional[int] = None):
+        self.team_id = team_id
+        self.dates = np.array([], dtype="datetime64[ns]")
+        self.prefix = np.zeros((1, len(PREFIX_COLS)))
+        self._col = {c: i for i, c in enumerate(PREFIX_COLS)}
+        self._lock = threading.Lock()
+        self.append_games(logs)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def last_date(self) -> Optional[pd.Timestamp]:
+        dates = self.dates
+        return pd.Timestamp(dates[-1]) if len(dates) else None
+
+    def _matrix(self, logs: pd.DataFrame) -> np.ndarray:
+        df = logs.copy()
+        for col in BOX_COLS + [f"OPP_{c}" for c in BOX_COLS]:
+            if col not in df.columns:
+                df[col] = 0.0
+        df["G"] = 1.0
+        df["W"] = (df["WL"] == "W").astype(float) if "WL" in df.columns else 0.0
+        own = df["FGA"] + 0.44 * df["FTA"] - df["OREB"] + df["TOV"]
+        opp = df["OPP_FGA"] + 0.44 * df["OPP_FTA"] - df["OPP_OREB"] + df["OPP_TOV"]
+        # 两队回合数几乎相同，取平均减小估算误差
+        df["POSS"] = (own + opp) / 2
+        return df[PREFIX_COLS].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    def append_games(self, logs: pd.DataFrame) -> int:
+        """追加新比赛 (只接收晚于已有最后一场的日志)，返回新增场次；logs 可以是整个联盟的日志"""
+        with self._lock:
+            if logs is None or logs.empty:
+                return 0
+            if self.team_id is not None and "TEAM_ID" in logs.columns:
+                logs = logs[logs["TEAM_ID"] == self.team_id]
+            if "OPP_PTS" not in logs.columns:
+                raise ValueError("球队日志缺少对手计数，请先经过 with_opponents()")
+            logs = logs.assign(GAME_DATE=pd.to_datetime(logs["GAME_DATE"])).sort_values("GAME_DATE")
+            if len(self.dates):
+                logs = logs[logs["GAME_DATE"] > self.last_date]
+            if logs.empty:
+                return 0
+            tail = self.prefix[-1] + np.cumsum(self._matrix(logs), axis=0)
+            # 读取方经 _snapshot() 在锁内成对取走 (prefix, dates)，追加期间拿到的仍是旧的一对
+            self.prefix = np.vstack([self.prefix, tail])
+            self.dates = np.concatenate([self.dates, logs["GAME_DATE"].to_numpy(dtype="datetime64[ns]")])
+            return len(logs)
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """同一时刻的 (前缀和, 日期)，一次查询只用这一对，不受并发追加影响"""
+        with self._lock:
+            return self.prefix, self.dates
+
+    def _totals(self, prefix: np.ndarray, lo, hi) -> Dict[str, np.ndarray]:
+        diff = prefix[hi] - prefix[lo]
+        return {c: diff[..., i] for c, i in self._col.items()}
+
+    def summarize(self, start: int, end: int) -> Optional[Dict[str, float]]:
+        """第 start 场 (含) 到第 end 场 (不含)；键与 NBATeamDataEngine.merge_general 的结果一致"""
+        return self._summarize(self._snapshot()[0], start, end)
+
+    def _summarize(self, prefix: np.ndarray, start: int, end: int) -> Optional[Dict[str, float]]:
+        start, end = max(0, start), min(len(prefix) - 1, end)
+        if end <= start:
+            return None
+        t = self._totals(prefix, start, end)
+        gp = end - start
+        out = {k: float(v) for k, v in _factors(t).items()}
+        wins = float(t["W"])
+        out.update({
+            "GP": gp, "W": wins, "L": gp - wins, "W_PCT": wins / gp,
+            "PTS": float(t["PTS"]) / gp,
+            "PLUS_MINUS": float(t["PTS"] - t["OPP_PTS"]) / gp,
+            "POSS": float(t["POSS"]),
+        })
+        return out
+
+    def date_range(self, date_from, date_to) -> Optional[Dict[str, float]]:
+        prefix, dates = self._snapshot()
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(date_from)), side="left")
+        # date_to 当天的比赛也算在内
+        hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(date_to) + pd.Timedelta(days=1)), side="left")
+        return self._summarize(prefix, int(lo), int(hi))
+
+    def last_n(self, n: int) -> Optional[Dict[str, float]]:
+        prefix = self._snapshot()[0]
+        games = len(prefix) - 1
+        return self._summarize(prefix, games - n, games)
+
+    def season(self) -> Optional[Dict[str, float]]:
+        prefix = self._snapshot()[0]
+        return self._summarize(prefix, 0, len(prefix) - 1)
+
+    def rolling(self, window: int) -> pd.DataFrame:
+        """每场比赛结束时最近 window 场的四要素与效率 (不足 window 场时按已有场次)"""
+        prefix, dates = self._snapshot()
+        idx = np.arange(1, len(dates) + 1)
+        lo = np.maximum(idx - window, 0)
+        frame = pd.DataFrame(_factors(self._totals(prefix, lo, idx)))
+        frame.insert(0, "GAME_DATE", dates)
+        return frame
+
+    def change_points(self, metric: str = "NET_RATING", min_games: int = 8, top: int = 3) -> pd.DataFrame:
+        """扫描所有切分点 k (前 k 场 vs 之后)，按前后差值绝对值排序，返回变化最大的 top 个。
+
+        前后两段的计数都由前缀和一次性向量化得到，整季扫描只是两次矩阵减法。
+        相邻切分点高度相关，保留的拐点之间至少相隔 min_games 场。
+        """
+        prefix, dates = self._snapshot()
+        n = len(dates)
+        cols = ["SPLIT_DATE", "GAMES_BEFORE", "GAMES_AFTER", "BEFORE", "AFTER", "DELTA"]
+        if n < 2 * min_games:
+            return pd.DataFrame(columns=cols)
+        k = np.arange(min_games, n - min_games + 1)
+        before = _factors(self._totals(prefix, np.zeros_like(k), k))[metric]
+        after = _factors(self._totals(prefix, k, np.full_like(k, n)))[metric]
+        delta = after - before
+        picked = []
+        for i in np.argsort(-np.abs(delta), kind="stable"):
+            if all(abs(k[i] - k[j]) >= min_games for j in picked):
+                picked.append(i)
+            if len(picked) == top:
+                break
+        return pd.DataFrame({
+            # 切分日期 = 后半段第一场比赛的日期
+            "SPLIT_DATE": dates[k[picked]],
+            "GAMES_BEFORE": k[picked],
+            "GAMES_AFTER": n - k[picked],
+            "BEFORE": before[picked],
+            "AFTER": after[picked],
+            "DELTA": delta[picked],
+        }, columns=cols)
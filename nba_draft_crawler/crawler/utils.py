@@ -1,8 +1,18 @@
-import time
+import sys
+from pathlib import Path
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from config import REQUEST_DELAY
+from config import BASE_URL, REQUEST_DELAY
+
+ROOT = str(Path(__file__).resolve().parents[2])
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.ratelimit import is_throttle_error, retry_after, set_limit
+
+# 令牌桶代替每次请求后固定 sleep：REQUEST_DELAY 折算成速率，被 429 后自动降速
+LIMITER = set_limit(BASE_URL, 1 / REQUEST_DELAY)
 
 def create_session():
     session = requests.Session()
@@ -44,11 +54,14 @@ SESSION = create_session()
 
 def get_soup(url):
     try:
+        LIMITER.acquire()
         resp = SESSION.get(url, timeout=15)
         resp.raise_for_status()
-        time.sleep(REQUEST_DELAY)
+        LIMITER.reward()
         return resp.text
     except requests.exceptions.RequestException as e:
+        if is_throttle_error(e):
+            LIMITER.penalize(retry_after(e))
         print(f"⚠️ 请求失败: {url}")
         print(e)
         return None
\ No newline at end of file
@@ -1,18 +1,31 @@
+import sys
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-import time
 
 # NBA API Endpoints
 from nba_api.stats.endpoints import (
     PlayerDashboardByGeneralSplits,
-    SynergyPlayTypes,
     PlayerDashPtShots
 )
 from nba_api.stats.static import players
 
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.career import CareerLoader
+from data.comps import get_similarity_index
+from data.nba_client import fetch_frames
+from data.store import get_store
+from data.synergy import current_season, get_synergy_store
+from logic.form import PlayerFormEngine, ROLLING_WINDOWS
+from logic.rates import add_rate_columns, rate_columns
+
 # ==========================================
 # 1. 页面配置与 CSS (Visual Design)
 # ==========================================
@@ -54,6 +67,21 @@ st.markdown("""
 # ==========================================
 # 2. 真实数据引擎 (Real Data Engine)
 # ==========================================
+SYNERGY_PLAY_TYPES = {
+    "P&R Handler": "PRBallHandler",
+    "Isolation": "Isolation",
+    "Spot-up": "Spotup",
+    "Off Screen": "OffScreen"
+}
+# 两名球员 × (Base/Advanced/4 种战术/Tracking) = 14 个任务，同赛季的战术联盟表只下载一次
+PROFILE_WORKERS = 14
+# 多人模式使用全联盟投篮追踪表的两个区间
+TRACKING_RANGES = {"C&S": "Catch and Shoot", "Pull-up": "Pull Ups"}
+MAX_MULTI_PLAYERS = 15
+# 相似赛季模式：结果表之外，前几名与目标一起画雷达对比
+COMPS_RADAR_TOP = 4
+
+
 class NBADataEngine:
     def __init__(self):
         pass
@@ -65,134 +93,96 @@ class NBADataEngine:
         except:
             return None
 
-    def _normalize_per_100(self, stats_dict):
-        """将基础数据转换为每100回合数据"""
-        if not stats_dict: return {}
-        try:
-            # 优先使用 API 返回的 POSS (回合数)
-            poss = stats_dict.get('POSS', 0)
-            # 如果 API 没返回 POSS，手动估算: FGA + 0.44*FTA + TOV
-            if poss == 0:
-                poss = stats_dict.get('FGA', 0) + 0.44 * stats_dict.get('FTA', 0) + stats_dict.get('TOV', 0)
-
-            if poss == 0: return stats_dict  # 避免除以零
-
-            normalized = stats_dict.copy()
-            # 需要转换的关键基础数据
-            targets = ['PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'FGA', 'FG3A']
-            for key in targets:
-                if key in stats_dict:
-                    normalized[f"{key}_100"] = (stats_dict[key] / poss) * 100
-
-            normalized['POSS_EST'] = poss  # 记录使用的回合数
-            return normalized
-        except Exception as e:
-            print(f"归一化计算出错: {e}")
-            return stats_dict
-
-    def fetch_base_advanced_stats(self, player_id, season, date_from="", date_to="", last_n=0):
+    def fetch_dashboard(self, player_id, season, measure, date_from="", date_to="", last_n=0):
         """
         调用 PlayerDashboardByGeneralSplits 获取最精准的切片数据
         [修复1] 参数名 measure_type_detailed
         [修复2] 参数名 season_type_playoffs (对应报错 season_type_all_star)
         """
-        try:
-            time.sleep(0.3)  # 防止 API 限制
+        return fetch_frames(
+            PlayerDashboardByGeneralSplits,
+            player_id=player_id,
+            season=season,
+            date_from_nullable=date_from,
+            date_to_nullable=date_to,
+            last_n_games=last_n,
+            measure_type_detailed=measure,
+            month=0,
+            # --- 修正点：改为 season_type_playoffs ---
+            season_type_playoffs='Regular Season'
+        )[0]  # Overall Player Dashboard
+
+    def merge_base_advanced(self, df_base, df_adv):
+        if df_base is None or df_adv is None or df_base.empty or df_adv.empty:
+            return None
 
-            # 1. 获取基础数据 (Base)
-            dash_base = PlayerDashboardByGeneralSplits(
-                player_id=player_id,
-                season=season,
-                date_from_nullable=date_from,
-                date_to_nullable=date_to,
-                last_n_games=last_n,
-                measure_type_detailed='Base',
-                month=0,
-                # --- 修正点：改为 season_type_playoffs ---
-                season_type_playoffs='Regular Season'
-            )
-            df_base = dash_base.get_data_frames()[0]  # Overall Player Dashboard
-
-            # 2. 获取高阶数据 (Advanced)
-            dash_adv = PlayerDashboardByGeneralSplits(
-                player_id=player_id,
-                season=season,
-                date_from_nullable=date_from,
-                date_to_nullable=date_to,
-                last_n_games=last_n,
-                measure_type_detailed='Advanced',
-                month=0,
-                # --- 修正点：改为 season_type_playoffs ---
-                season_type_playoffs='Regular Season'
-            )
-            df_adv = dash_adv.get_data_frames()[0]
-
-            if df_base.empty or df_adv.empty:
-                return None
-
-            # 提取数据 (只取第一行，即总计)
-            base_row = df_base.iloc[0]
-            adv_row = df_adv.iloc[0]
-
-            # 合并结果
-            result = {
-                "GP": base_row['GP'],
-                "PTS": base_row['PTS'],
-                "REB": base_row['REB'],
-                "AST": base_row['AST'],
-                "STL": base_row['STL'],
-                "BLK": base_row['BLK'],
-                "TOV": base_row['TOV'],
-                "FGA": base_row['FGA'],
-                "FTA": base_row['FTA'],
-                "FG3A": base_row['FG3A'],
-                "FG_PCT": base_row['FG_PCT'],
-                "FG3_PCT": base_row['FG3_PCT'],
-                "TS_PCT": adv_row['TS_PCT'],
-                "USG_PCT": adv_row['USG_PCT'],
-                "AST_PCT": adv_row['AST_PCT'],
-                "PIE": adv_row['PIE'],
-                "POSS": adv_row.get('POSS', 0)  # 尝试获取官方回合数
-            }
-            return result
+        # 提取数据 (只取第一行，即总计)
+        base_row = df_base.iloc[0]
+        adv_row = df_adv.iloc[0]
+
+        # 合并结果
+        result = {
+            "GP": base_row['GP'],
+            "MIN": base_row['MIN'],
+            "PTS": base_row['PTS'],
+            "REB": base_row['REB'],
+            "AST": base_row['AST'],
+            "STL": base_row['STL'],
+            "BLK": base_row['BLK'],
+            "TOV": base_row['TOV'],
+            "FGA": base_row['FGA'],
+            "FTA": base_row['FTA'],
+            "FG3A": base_row['FG3A'],
+            "FG_PCT": base_row['FG_PCT'],
+            "FG3_PCT": base_row['FG3_PCT'],
+            "TS_PCT": adv_row['TS_PCT'],
+            "USG_PCT": adv_row['USG_PCT'],
+            "AST_PCT": adv_row['AST_PCT'],
+            "PIE": adv_row['PIE'],
+            "POSS": adv_row.get('POSS', 0)  # 尝试获取官方回合数
+        }
+        # Per 100 / Per 36：联盟表在加载时已整表算好 (data.store / data.career)，直接读取；
+        # 单球员切片接口返回的行则用同一个向量化函数现算
+        if 'PTS_100' not in base_row.index:
+            base_row = add_rate_columns(df_base.head(1).assign(POSS=result["POSS"])).iloc[0]
+        result.update({c: base_row[c] for c in rate_columns() if c in base_row.index})
+        return result
 
+    def fetch_base_advanced_stats(self, player_id, season, date_from="", date_to="", last_n=0):
+        try:
+            df_base = self.fetch_dashboard(player_id, season, 'Base', date_from, date_to, last_n)
+            df_adv = self.fetch_dashboard(player_id, season, 'Advanced', date_from, date_to, last_n)
+            return self.merge_base_advanced(df_base, df_adv)
         except Exception as e:
             print(f"API Fetch Error (Base/Adv): {e}")
             return None
-    def fetch_synergy(self, player_id, season):
-        """获取战术风格 (Season Level only)"""
+
+    def fetch_synergy_play_type(self, player_id, season, pt_key):
+        """单个战术类型 (Season Level only)，返回 {"Freq", "PPP"} 或 None"""
         # 注意：Synergy 不支持 DateFrom/To，只能按赛季查
-        target_play_types = {
-            "P&R Handler": "PRBallHandler",
-            "Isolation": "Isolation",
-            "Spot-up": "Spotup",
-            "Off Screen": "OffScreen"
+        return self._synergy_entry(get_synergy_store().lookup(season, pt_key, player_id))
+
+    def _synergy_entry(self, player_stats):
+        if player_stats is None:
+            return None
+        # 智能列名匹配 (POSS_PCT vs PERCENT_OF_POSS)
+        cols = player_stats.index
+        freq_col = 'POSS_PCT' if 'POSS_PCT' in cols else 'PERCENT_OF_POSS'
+        if freq_col not in cols:
+            return None
+        return {
+            "Freq": player_stats[freq_col],
+            "PPP": player_stats['PPP']
         }
+
+    def fetch_synergy(self, player_id, season):
+        """获取战术风格 (Season Level only)"""
         results = {}
         try:
-            for label, pt_key in target_play_types.items():
-                time.sleep(0.4)
-                synergy = SynergyPlayTypes(
-                    player_or_team_abbreviation='P',
-                    play_type_nullable=pt_key,
-                    season=season,
-                    type_grouping_nullable='offensive',
-                    per_mode_simple='PerGame',
-                    season_type_all_star='Regular Season'
-                )
-                df = synergy.get_data_frames()[0]
-                player_stats = df[df['PLAYER_ID'] == player_id]
-
-                if not player_stats.empty:
-                    # 智能列名匹配 (POSS_PCT vs PERCENT_OF_POSS)
-                    cols = player_stats.columns
-                    freq_col = 'POSS_PCT' if 'POSS_PCT' in cols else 'PERCENT_OF_POSS'
-
-                    if freq_col in cols:
-                        results[label] = {
-                            "Freq": player_stats[freq_col].values[0],
-                            "PPP": player_stats['PPP'].values[0]
-                        }
+            for label, pt_key in SYNERGY_PLAY_TYPES.items():
+                entry = self.fetch_synergy_play_type(player_id, season, pt_key)
+                if entry:
+                    results[label] = entry
         except Exception as e:
             print(f"Synergy Error: {e}")
 
@@ -201,7 +191,8 @@ class NBADataEngine:
     def fetch_tracking(self, player_id, season, date_from="", date_to="", last_n=0):
         """获取投篮机制 (支持切片)"""
         try:
-            dash = PlayerDashPtShots(
+            df = fetch_frames(
+                PlayerDashPtShots,
                 player_id=player_id,
                 season=season,
                 date_from_nullable=date_from,
@@ -211,8 +202,7 @@ class NBADataEngine:
                 opponent_team_id=0, period=0,
                 outcome_nullable="", location_nullable="", season_segment_nullable="",
                 vs_conference_nullable="", vs_division_nullable="", game_segment_nullable=""
-            )
-            df = dash.get_data_frames()[1]  # GeneralShooting
+            )[1]  # GeneralShooting
 
             res = {}
             if not df.empty:
@@ -245,8 +235,11 @@ class NBADataEngine:
             return f"{start_year}-{end_year}"
         return season_str
 
-    def get_full_profile(self, player_name, season, date_range=None, last_n=0):
-        """主入口：聚合所有数据"""
+    def _submit_profile(self, pool, player_name, season, date_range=None, last_n=0, form=None):
+        """把一个球员画像拆成互不依赖的请求任务，全部提交到线程池
+
+        传入 form (PlayerFormEngine) 时 Base/Advanced 直接由比赛日志前缀和得出，不再请求切片接口。
+        """
         # --- 修复点 1：自动格式化赛季字符串 ---
         season = self._format_season(season)
 
@@ -260,47 +253,240 @@ class NBADataEngine:
             d_from = date_range[0].strftime("%m/%d/%Y")
             d_to = date_range[1].strftime("%m/%d/%Y")
 
-        # 1. Base & Advanced (支持切片)
-        base_adv = self.fetch_base_advanced_stats(pid, season, d_from, d_to, last_n)
-        if not base_adv:
-            return {"error": f"无法获取 {player_name} 在 {season} 的数据 (可能未出场或赛季错误)"}
-
-        # 归一化
-        base_adv = self._normalize_per_100(base_adv)
-
-        # 2. Synergy (不支持切片，仅赛季)
-        synergy = {}
         # --- 修复点 2：转换赛季年份用于判断 ---
         # "2023-24" -> 取前4位 "2023" 转 int
         start_year = int(season[:4])
 
+        # 1. Base & Advanced (支持切片)
+        tasks = {}
+        pending = {"meta": {"name": player_name, "season": season, "id": pid}, "tasks": tasks}
+        if form is not None:
+            if date_range:
+                pending["form_base"] = form.date_range(date_range[0], date_range[1])
+            elif last_n:
+                pending["form_base"] = form.last_n(last_n)
+            else:
+                pending["form_base"] = form.season()
+        else:
+            tasks["base"] = pool.submit(self.fetch_dashboard, pid, season, 'Base', d_from, d_to, last_n)
+            tasks["adv"] = pool.submit(self.fetch_dashboard, pid, season, 'Advanced', d_from, d_to, last_n)
+        # 2. Synergy (不支持切片，仅赛季)
         if start_year >= 2015:
-            synergy = self.fetch_synergy(pid, season)
-
+            for label, pt_key in SYNERGY_PLAY_TYPES.items():
+                tasks[("synergy", label)] = pool.submit(self.fetch_synergy_play_type, pid, season, pt_key)
         # 3. Tracking (支持切片)
-        tracking = {}
         if start_year >= 2013:
-            tracking = self.fetch_tracking(pid, season, d_from, d_to, last_n)
+            tasks["tracking"] = pool.submit(self.fetch_tracking, pid, season, d_from, d_to, last_n)
+
+        return pending
+
+    def _assemble_profile(self, pending):
+        if "error" in pending:
+            return pending
+        meta, tasks = pending["meta"], pending["tasks"]
+
+        def result(key, default=None):
+            try:
+                return tasks[key].result()
+            except Exception as e:
+                print(f"API Fetch Error ({key}): {e}")
+                return default
+
+        if "form_base" in pending:
+            base_adv = pending["form_base"]
+        else:
+            base_adv = self.merge_base_advanced(result("base"), result("adv"))
+        if not base_adv:
+            return {"error": f"无法获取 {meta['name']} 在 {meta['season']} 的数据 (可能未出场或赛季错误)"}
+
+        synergy = {}
+        for label in SYNERGY_PLAY_TYPES:
+            entry = result(("synergy", label)) if ("synergy", label) in tasks else None
+            if entry:
+                synergy[label] = entry
+
+        return {
+            "meta": meta,
+            "base": base_adv,
+            "synergy": synergy,
+            "tracking": result("tracking", {}) if "tracking" in tasks else {}
+        }
+
+    def get_profiles(self, requests):
+        """并发构建多个画像：requests 为 [(球员, 赛季, date_range, last_n[, form]), ...]
+
+        所有球员的全部请求同时提交，由 data.nba_client 的全局限速器控制间隔，
+        相同请求 (例如同赛季同战术类型) 会被合并成一次。
+        """
+        with ThreadPoolExecutor(max_workers=PROFILE_WORKERS) as pool:
+            pending = [self._submit_profile(pool, *req) for req in requests]
+            return [self._assemble_profile(p) for p in pending]
 
+    def get_full_profile(self, player_name, season, date_range=None, last_n=0):
+        """主入口：聚合所有数据"""
+        return self.get_profiles([(player_name, season, date_range, last_n)])[0]
+
+    def career_profile(self, career, player_name, season):
+        """从已缓存的生涯数据中取某个赛季的画像，不发请求"""
+        season = self._format_season(season)
+        base, adv = career["base"], career["adv"]
+        if season not in base.index or season not in adv.index:
+            return {"error": f"{player_name} 在 {season} 没有常规赛数据"}
+        base_adv = self.merge_base_advanced(base.loc[[season]], adv.loc[[season]])
+        synergy = {}
+        rows = career["synergy"].get(season, {})
+        for label, pt_key in SYNERGY_PLAY_TYPES.items():
+            entry = self._synergy_entry(rows.get(pt_key))
+            if entry:
+                synergy[label] = entry
+        tracking = {}
+        for prefix, general_range in TRACKING_RANGES.items():
+            row = career["tracking"].get(season, {}).get(general_range)
+            if row is not None:
+                tracking[f"{prefix} 3P%"] = row['FG3_PCT']
+                tracking[f"{prefix} Freq"] = row['FG3A_FREQUENCY']
         return {
-            "meta": {"name": player_name, "season": season, "id": pid},
+            "meta": {"name": player_name, "season": season, "id": career["player_id"]},
             "base": base_adv,
             "synergy": synergy,
             "tracking": tracking
         }
 
+    def career_trajectory(self, career):
+        """生涯逐季走势 (Per 100 / TS% / USG%)"""
+        rows = []
+        for season in career["seasons"]:
+            profile = self.career_profile(career, "", season)
+            if "error" in profile:
+                continue
+            b = profile["base"]
+            rows.append({"SEASON": season, "PTS/100": b.get('PTS_100'), "AST/100": b.get('AST_100'),
+                         "REB/100": b.get('REB_100'), "TS%": b.get('TS_PCT'), "USG%": b.get('USG_PCT')})
+        return pd.DataFrame(rows)
+
+    def _submit_league_tables(self, pool, season):
+        """某赛季 N 人对比所需的全部联盟总表 (与人数无关)"""
+        store, synergy = get_store(), get_synergy_store()
+        start_year = int(season[:4])
+        # Base + Advanced 合并表，Per 100 已按官方 POSS 整表算好
+        tasks = {"rates": pool.submit(store.player_rates, season, 'Totals')}
+        if start_year >= 2015:
+            for label, pt_key in SYNERGY_PLAY_TYPES.items():
+                tasks[("synergy", label)] = pool.submit(synergy.table, season, pt_key)
+        if start_year >= 2013:
+            for prefix, general_range in TRACKING_RANGES.items():
+                tasks[("tracking", prefix)] = pool.submit(store.player_pt_shot, season, general_range)
+        return tasks
+
+    def get_league_profiles(self, requests):
+        """N 人对比：requests 为 [(球员, 赛季), ...] 或 [(球员, 赛季, PLAYER_ID), ...]
+
+        已知 PLAYER_ID 时直接使用，不再按姓名查找 (同名球员如 Gary Payton / Gary Payton II 会解析错)。
+        按赛季分组，每个赛季只拉一次 Base/Advanced/Synergy/Tracking 联盟总表，
+        再按 PLAYER_ID 取行，请求数只随不同赛季数增长，与球员人数无关。
+        """
+        resolved = []
+        for req in requests:
+            name, season = req[0], self._format_season(req[1])
+            pid = req[2] if len(req) > 2 and req[2] else self.get_player_id(name)
+            resolved.append((name, season, int(pid) if pid else None))
+        seasons = sorted({season for _, season, pid in resolved if pid})
+        with ThreadPoolExecutor(max_workers=PROFILE_WORKERS) as pool:
+            pending = {season: self._submit_league_tables(pool, season) for season in seasons}
+            tables = {}
+            for season, tasks in pending.items():
+                tables[season] = {}
+                for key, fut in tasks.items():
+                    try:
+                        tables[season][key] = fut.result()
+                    except Exception as e:
+                        print(f"League Table Error ({season} {key}): {e}")
+
+        profiles = []
+        for name, season, pid in resolved:
+            if not pid:
+                profiles.append({"error": f"找不到球员: {name}"})
+                continue
+            t = tables[season]
+            rates = t.get("rates")
+            base_adv = None
+            if rates is not None:
+                row = rates[rates['PLAYER_ID'] == pid]
+                base_adv = self.merge_base_advanced(row, row)
+            if not base_adv:
+                profiles.append({"error": f"无法获取 {name} 在 {season} 的数据 (可能未出场或赛季错误)"})
+                continue
+
+            synergy = {}
+            for label in SYNERGY_PLAY_TYPES:
+                df = t.get(("synergy", label))
+                if df is not None and pid in df.index:
+                    entry = self._synergy_entry(df.loc[pid])
+                    if entry:
+                        synergy[label] = entry
+
+            tracking = {}
+            for prefix in TRACKING_RANGES:
+                df = t.get(("tracking", prefix))
+                if df is None or 'PLAYER_ID' not in df.columns:
+                    continue
+                row = df[df['PLAYER_ID'] == pid]
+                if not row.empty:
+                    tracking[f"{prefix} 3P%"] = row['FG3_PCT'].values[0]
+                    tracking[f"{prefix} Freq"] = row['FG3A_FREQUENCY'].values[0]
+
+            profiles.append({
+                "meta": {"name": name, "season": season, "id": pid},
+                "base": base_adv,
+                "synergy": synergy,
+                "tracking": tracking
+            })
+        return profiles
+
 # 初始化引擎
 engine = NBADataEngine()
 
+
+@st.cache_resource(show_spinner=False)
+def get_career_loader():
+    """进程级生涯加载器：后台线程批量拉取，所有会话共享结果"""
+    return CareerLoader(play_types=SYNERGY_PLAY_TYPES.values(), tracking_ranges=TRACKING_RANGES.values())
+
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_form_engine(player_id, season):
+    """整季比赛日志只拉一次 (Base + Advanced)，之后所有切片都在内存里算"""
+    store = get_store()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        base = pool.submit(store.player_game_logs, season, player_id=player_id)
+        adv = pool.submit(store.player_game_logs, season, player_id=player_id, measure='Advanced')
+        return PlayerFormEngine(base.result(), adv.result())
+
+
+def get_form_engine(player_id, season):
+    form = load_form_engine(player_id, season)
+    # 本赛季：只补拉最后一场之后的新比赛，追加到前缀和末尾
+    if season == current_season() and form.last_date is not None:
+        since = (form.last_date + pd.Timedelta(days=1)).strftime("%m/%d/%Y")
+        store = get_store()
+        form.append_games(store.player_game_logs(season, date_from=since, player_id=player_id),
+                          store.player_game_logs(season, date_from=since, player_id=player_id, measure='Advanced'))
+    return form
+
 # ==========================================
 # 3. 侧边栏：控制面板
 # ==========================================
 st.sidebar.title("⚙️ 数据对比配置")
 mode = st.sidebar.selectbox("选择模式",
-                            ["横向对比 (Player A vs B)", "纵向进化 (Year X vs Y)", "赛季切片 (Date/Game Split)"])
+                            ["横向对比 (Player A vs B)", "多人对比 (N Players)", "纵向进化 (Year X vs Y)",
+                             "赛季切片 (Date/Game Split)", "相似赛季 (Comps)"])
 
 p1_data = None
 p2_data = None
+multi_data = None
+form = None
+career_view = None
+comps_view = None
 run_analysis = False
 
 # --- 模式 A: 横向对比 ---
@@ -315,8 +501,27 @@ if mode == "横向对比 (Player A vs B)":
     if st.sidebar.button("开始对比 🚀"):
         run_analysis = True
         with st.spinner("正在从 NBA API 拉取真实数据..."):
-            p1_data = engine.get_full_profile(p1_name, p1_season)
-            p2_data = engine.get_full_profile(p2_name, p2_season)
+            p1_data, p2_data = engine.get_profiles([(p1_name, p1_season, None, 0),
+                                                    (p2_name, p2_season, None, 0)])
+
+# --- 模式 A+: 多人对比 ---
+elif mode == "多人对比 (N Players)":
+    raw = st.sidebar.text_area(f"球员列表 (每行: 姓名, 赛季；最多 {MAX_MULTI_PLAYERS} 行)",
+                               "Stephen Curry, 2015-16\nKlay Thompson, 2015-16\nDamian Lillard, 2019-20\n"
+                               "Kyrie Irving, 2016-17",
+                               height=200)
+    entries = []
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        name, _, season_text = line.partition(",")
+        entries.append((name.strip(), season_text.strip() or current_season()))
+
+    if st.sidebar.button("批量对比 🚀"):
+        if len(entries) > MAX_MULTI_PLAYERS:
+            st.sidebar.warning(f"最多对比 {MAX_MULTI_PLAYERS} 个球员赛季，已截取前 {MAX_MULTI_PLAYERS} 个")
+        with st.spinner("正在按赛季拉取联盟总表..."):
+            multi_data = engine.get_league_profiles(entries[:MAX_MULTI_PLAYERS])
 
 # --- 模式 B: 纵向进化 ---
 elif mode == "纵向进化 (Year X vs Y)":
@@ -325,11 +530,28 @@ elif mode == "纵向进化 (Year X vs Y)":
     p1_season = c1.text_input("起始赛季", "2018-19")
     p2_season = c2.text_input("目标赛季", "2023-24")
 
+    # 输入球员后立即在后台预取整个生涯，之后任意赛季组合都直接从内存读取
+    career_pid = engine.get_player_id(p_name)
+    career_loader = get_career_loader()
+    if career_pid:
+        career_loader.submit(career_pid)
+        st.sidebar.caption("✅ 生涯数据已缓存" if career_loader.ready(career_pid) else "⏳ 正在后台预取生涯数据...")
+
     if st.sidebar.button("分析进化 📈"):
         run_analysis = True
-        with st.spinner("正在分析进化路径..."):
-            p1_data = engine.get_full_profile(p_name, p1_season)
-            p2_data = engine.get_full_profile(p_name, p2_season)
+        if not career_pid:
+            p1_data = p2_data = {"error": f"找不到球员: {p_name}"}
+        else:
+            with st.spinner("正在分析进化路径..."):
+                try:
+                    career = career_loader.get(career_pid)
+                except Exception as e:
+                    career = None
+                    p1_data = p2_data = {"error": f"生涯数据获取失败: {e}"}
+            if career is not None:
+                p1_data = engine.career_profile(career, p_name, p1_season)
+                p2_data = engine.career_profile(career, p_name, p2_season)
+                career_view = (p_name, career)
 
 # --- 模式 C: 赛季切片 ---
 elif mode == "赛季切片 (Date/Game Split)":
@@ -356,9 +578,32 @@ elif mode == "赛季切片 (Date/Game Split)":
     if st.sidebar.button("执行切片 ✂️"):
         run_analysis = True
         with st.spinner("正在切割赛季数据..."):
-            p1_data = engine.get_full_profile(p_name, season, date_range=d1_range)
+            slice_pid = engine.get_player_id(p_name)
+            form = get_form_engine(slice_pid, engine._format_season(season)) if slice_pid else None
             # 切片2：可能是日期，可能是Last N
-            p2_data = engine.get_full_profile(p_name, season, date_range=d2_range, last_n=last_n)
+            p1_data, p2_data = engine.get_profiles([(p_name, season, d1_range, 0, form),
+                                                    (p_name, season, d2_range, last_n, form)])
+
+# --- 模式 D: 相似赛季 ---
+elif mode == "相似赛季 (Comps)":
+    p_name = st.sidebar.text_input("球员姓名", "Kon Knueppel")
+    season = engine._format_season(st.sidebar.text_input("赛季", current_season()))
+    top_k = st.sidebar.slider("相似赛季个数", 5, 25, 10)
+    same_player = st.sidebar.checkbox("包含该球员的其他赛季", False)
+
+    if st.sidebar.button("寻找相似赛季 🔍"):
+        comps_pid = engine.get_player_id(p_name)
+        if not comps_pid:
+            comps_view = {"error": f"找不到球员: {p_name}"}
+        else:
+            # 首次构建需拉取 1996 年以来的联盟总表 (往季落盘缓存)，之后查询为毫秒级
+            with st.spinner("正在加载历史相似度索引..."):
+                index = get_similarity_index()
+            try:
+                comps = index.query(comps_pid, season, k=top_k, exclude_player=not same_player)
+                comps_view = {"name": p_name, "season": season, "player_id": comps_pid, "comps": comps}
+            except KeyError:
+                comps_view = {"error": f"{p_name} 在 {season} 不在索引中 (出场时间不足或赛季错误)"}
 
 
 # ==========================================
@@ -397,6 +642,117 @@ def render_metric_card(label, v1, v2, suffix="", is_pct=False):
     """, unsafe_allow_html=True)
 
 
+RADAR_CATEGORIES = ['得分(PTS)', '组织(AST)', '篮板(REB)', '防守(STL+BLK)', '效率(TS%)', '球权(USG%)']
+TRACKING_METRICS = [
+    ("运球投三分 (Pull-up 3P%)", "Pull-up 3P%"),
+    ("接球投三分 (C&S 3P%)", "C&S 3P%"),
+    ("运球投频率 (Pull-up Freq)", "Pull-up Freq"),
+    ("接球投频率 (C&S Freq)", "C&S Freq")
+]
+
+
+def norm(val, limit):
+    return min((val or 0) / limit, 1.0)
+
+
+def get_radar_data(base):
+    return [
+        norm(base.get('PTS_100'), 45),
+        norm(base.get('AST_100'), 15),
+        norm(base.get('REB_100'), 18),
+        norm((base.get('STL_100', 0) + base.get('BLK_100', 0)), 5),
+        norm(base.get('TS_PCT'), 0.70),
+        norm(base.get('USG_PCT'), 0.40)
+    ]
+
+
+def radar_figure(series):
+    """series: [(图例名, base 数据, 颜色), ...]"""
+    fig = go.Figure()
+    for label, base, color in series:
+        fig.add_trace(go.Scatterpolar(r=get_radar_data(base), theta=RADAR_CATEGORIES, fill='toself', name=label,
+                                      line_color=color))
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 1], showticklabels=False), bgcolor='#1F2937'),
+        paper_bgcolor='rgba(0,0,0,0)', font_color='white',
+        margin=dict(t=20, b=20), legend=dict(orientation="h")
+    )
+    return fig
+
+
+def render_multi(profiles):
+    """N 人对比：雷达、Synergy、Tracking 全部按整组渲染"""
+    ok = [p for p in profiles if not check_error(p)]
+    if not ok:
+        return
+    palette = px.colors.qualitative.Plotly + px.colors.qualitative.Set2
+    labels = [f"{p['meta']['name']} ({p['meta']['season']})" for p in ok]
+    colors = {label: palette[i % len(palette)] for i, label in enumerate(labels)}
+
+    st.title("📊 MULTI-PLAYER COMPARISON")
+    st.markdown("---")
+
+    st.subheader("1. 核心战力 (Per 100 Possessions)")
+    core = pd.DataFrame([{
+        "球员": label,
+        "PTS/100": p['base'].get('PTS_100'),
+        "AST/100": p['base'].get('AST_100'),
+        "REB/100": p['base'].get('REB_100'),
+        "TS%": p['base'].get('TS_PCT'),
+        "USG%": p['base'].get('USG_PCT'),
+    } for label, p in zip(labels, ok)])
+    st.dataframe(core.style.format({"PTS/100": "{:.1f}", "AST/100": "{:.1f}", "REB/100": "{:.1f}",
+                                    "TS%": "{:.1%}", "USG%": "{:.1%}"}, na_rep="-"),
+                 hide_index=True, use_container_width=True)
+
+    st.subheader("2. 综合能力雷达")
+    st.plotly_chart(radar_figure([(label, p['base'], colors[label]) for label, p in zip(labels, ok)]),
+                    use_container_width=True)
+
+    c_left, c_right = st.columns(2)
+    with c_left:
+        st.subheader("3. 战术风格 (Synergy)")
+        s_data = [{"Type": k, "Freq": v['Freq'], "Player": label}
+                  for label, p in zip(labels, ok) for k, v in p['synergy'].items()]
+        if s_data:
+            fig_s = px.bar(pd.DataFrame(s_data), x="Freq", y="Type", color="Player", barmode="group",
+                           orientation='h', color_discrete_map=colors)
+            fig_s.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color='white')
+            st.plotly_chart(fig_s, use_container_width=True)
+        else:
+            st.info("⚠️ 无 Synergy 数据 (仅支持 2015-16 后)")
+
+    with c_right:
+        st.subheader("4. 投篮机制 (Tracking)")
+        if not any(p['tracking'] for p in ok):
+            st.info("⚠️ 无 Tracking 数据 (仅支持 2013-14 后)")
+        else:
+            rows = []
+            for metric_label, key in TRACKING_METRICS:
+                row = {"指标": metric_label}
+                for label, p in zip(labels, ok):
+                    val = p['tracking'].get(key)
+                    row[label] = f"{val * 100:.1f}%" if val is not None else "-"
+                rows.append(row)
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+
+if multi_data is not None:
+    render_multi(multi_data)
+
+if comps_view is not None and not check_error(comps_view):
+    st.title(f"🔍 {comps_view['name']} ({comps_view['season']}) 的历史相似赛季")
+    comps = comps_view['comps']
+    table = comps[["PLAYER_NAME", "SEASON", "TEAM_ABBREVIATION", "GP", "MIN", "SIMILARITY"]].rename(columns={
+        "PLAYER_NAME": "球员", "SEASON": "赛季", "TEAM_ABBREVIATION": "球队", "SIMILARITY": "相似度"})
+    st.dataframe(table.style.format({"MIN": "{:.0f}", "相似度": "{:.1f}"}), hide_index=True,
+                 use_container_width=True)
+    # 相似赛季直接带上索引返回的 PLAYER_ID，避免同名球员按姓名解析错
+    targets = [(comps_view['name'], comps_view['season'], comps_view['player_id'])] + \
+              list(zip(comps["PLAYER_NAME"], comps["SEASON"], comps["PLAYER_ID"]))[:COMPS_RADAR_TOP]
+    with st.spinner("正在拉取相似赛季画像..."):
+        render_multi(engine.get_league_profiles(targets))
+
 if run_analysis:
     # 错误检查
     err1 = check_error(p1_data)
@@ -428,35 +784,8 @@ if run_analysis:
 
         # --- 2. 雷达图 ---
         st.subheader("2. 综合能力雷达")
-        categories = ['得分(PTS)', '组织(AST)', '篮板(REB)', '防守(STL+BLK)', '效率(TS%)', '球权(USG%)']
-
-
-        def norm(val, limit):
-            return min((val or 0) / limit, 1.0)
-
-
-        def get_radar_data(base):
-            return [
-                norm(base.get('PTS_100'), 45),
-                norm(base.get('AST_100'), 15),
-                norm(base.get('REB_100'), 18),
-                norm((base.get('STL_100', 0) + base.get('BLK_100', 0)), 5),
-                norm(base.get('TS_PCT'), 0.70),
-                norm(base.get('USG_PCT'), 0.40)
-            ]
-
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(r=get_radar_data(b1), theta=categories, fill='toself', name=f"{name1} (A)",
-                                      line_color='#3B82F6'))
-        fig.add_trace(go.Scatterpolar(r=get_radar_data(b2), theta=categories, fill='toself', name=f"{name2} (B)",
-                                      line_color='#EF4444'))
-        fig.update_layout(
-            polar=dict(radialaxis=dict(visible=True, range=[0, 1], showticklabels=False), bgcolor='#1F2937'),
-            paper_bgcolor='rgba(0,0,0,0)', font_color='white',
-            margin=dict(t=20, b=20), legend=dict(orientation="h")
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(radar_figure([(f"{name1} (A)", b1, '#3B82F6'), (f"{name2} (B)", b2, '#EF4444')]),
+                        use_container_width=True)
 
         # --- 3. 风格与机制 ---
         c_left, c_right = st.columns(2)
@@ -488,15 +817,9 @@ if run_analysis:
             else:
                 # 简单表格展示
                 t1, t2 = p1_data['tracking'], p2_data['tracking']
-                metrics = [
-                    ("运球投三分 (Pull-up 3P%)", "Pull-up 3P%"),
-                    ("接球投三分 (C&S 3P%)", "C&S 3P%"),
-                    ("运球投频率 (Pull-up Freq)", "Pull-up Freq"),
-                    ("接球投频率 (C&S Freq)", "C&S Freq")
-                ]
 
                 rows = []
-                for label, key in metrics:
+                for label, key in TRACKING_METRICS:
                     val1 = t1.get(key)
                     val2 = t2.get(key)
                     rows.append({
@@ -505,4 +828,35 @@ if run_analysis:
                         f"{name2} (B)": f"{val2 * 100:.1f}%" if val2 is not None else "-"
                     })
 
-                st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
\ No newline at end of file
+                st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+        # --- 5. 状态走势 (仅赛季切片：由比赛日志前缀和直接算出，不额外请求) ---
+        if form is not None and len(form):
+            st.subheader("5. 状态走势 (Rolling)")
+            rolls = {w: form.rolling(w) for w in ROLLING_WINDOWS}
+            tab_pts, tab_ts = st.tabs(["场均得分 (PTS)", "真实命中率 (TS%)"])
+            for tab, col in ((tab_pts, "PTS"), (tab_ts, "TS_PCT")):
+                fig_r = go.Figure()
+                for w, rdf in rolls.items():
+                    fig_r.add_trace(go.Scatter(x=rdf["GAME_DATE"], y=rdf[col], mode="lines", name=f"近 {w} 场"))
+                fig_r.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color='white',
+                                    margin=dict(t=20, b=20), legend=dict(orientation="h"))
+                tab.plotly_chart(fig_r, use_container_width=True)
+
+        # --- 5. 生涯轨迹 (仅纵向进化：整段生涯已在内存中) ---
+        if career_view is not None:
+            st.subheader("5. 生涯轨迹 (Career Trajectory)")
+            traj = engine.career_trajectory(career_view[1])
+            if traj.empty:
+                st.info("暂无生涯数据")
+            else:
+                tab_vol, tab_eff = st.tabs(["产量 (Per 100)", "效率与球权"])
+                for tab, cols in ((tab_vol, ["PTS/100", "AST/100", "REB/100"]), (tab_eff, ["TS%", "USG%"])):
+                    fig_c = go.Figure()
+                    for col in cols:
+                        fig_c.add_trace(go.Scatter(x=traj["SEASON"], y=traj[col], mode="lines+markers", name=col))
+                    for s_mark in (p1_data['meta']['season'], p2_data['meta']['season']):
+                        fig_c.add_vline(x=s_mark, line_dash="dot", line_color="#9CA3AF")
+                    fig_c.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                                        font_color='white', margin=dict(t=20, b=20), legend=dict(orientation="h"))
+                    tab.plotly_chart(fig_c, use_container_width=True)
@@ -1,11 +1,28 @@
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 import pandas as pd
-import time
-from nba_api.stats.endpoints import SynergyPlayTypes, PlayerDashPtShots
 from nba_api.stats.static import players
 
-# --- 1. 设置对比对象 ---
-KLAY_SEASON = '2015-16'
-KON_SEASON = '2025-26'
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.career import SYNERGY_FIRST_SEASON, TRACKING_FIRST_SEASON
+from data.store import get_store
+from data.synergy import get_synergy_store
+
+# --- 1. 默认对比对象 (未指定 --pairs 时) ---
+DEFAULT_PAIRS = [("Klay Thompson", "2015-16", "Kon Knueppel", "2025-26")]
+
+TARGET_PLAY_TYPES = {
+    "OffScreen": "绕掩护 (Off Screen)",
+    "PRBallHandler": "挡拆持球 (P&R Handler)",
+    "Isolation": "单打 (Isolation)",
+    "Spotup": "定点投突 (Spot-up)"
+}
+TRACKING_RANGES = ["Catch and Shoot", "Pull Ups"]
 
 
 def get_player_id(name):
@@ -16,172 +33,222 @@ def get_player_id(name):
         return None
 
 
-# --- 2. 获取进攻方式 (Synergy Play Type) ---
-def get_synergy_data(player_id, season):
-    target_play_types = {
-        "OffScreen": "绕掩护 (Off Screen)",
-        "PRBallHandler": "挡拆持球 (P&R Handler)",
-        "Isolation": "单打 (Isolation)",
-        "Spotup": "定点投突 (Spot-up)"
-    }
-
+def read_pairs(path):
+    """每行一组: 球员A, 赛季A, 球员B, 赛季B (# 开头为注释)，重复的组合只保留一次"""
+    pairs = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = [p.strip() for p in line.split(",")]
+        if len(parts) != 4 or not all(parts):
+            print(f"   [!] 跳过格式错误的行: {line}", file=sys.stderr)
+            continue
+        pairs.append(tuple(parts))
+    return list(dict.fromkeys(pairs))
+
+
+# --- 2. 联盟总表：所有组合涉及的赛季去重后一次性并发拉取 ---
+def load_league_tables(seasons, workers=8):
+    """{(kind, season, name): DataFrame}；请求经 data.nba_client 统一限速，同表只下载一次"""
+    store, synergy = get_store(), get_synergy_store()
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for season in sorted(seasons):
+            start_year = int(season[:4])
+            if start_year >= SYNERGY_FIRST_SEASON:
+                for pt_key in TARGET_PLAY_TYPES:
+                    jobs[pool.submit(synergy.table, season, pt_key)] = ("synergy", season, pt_key)
+            if start_year >= TRACKING_FIRST_SEASON:
+                for general_range in TRACKING_RANGES:
+                    jobs[pool.submit(store.player_pt_shot, season, general_range)] = ("tracking", season, general_range)
+        tables = {}
+        for fut in as_completed(jobs):
+            key = jobs[fut]
+            try:
+                tables[key] = fut.result()
+            except Exception as e:
+                print(f"   [!] 联盟表获取失败 {key}: {e}", file=sys.stderr)
+    return tables
+
+
+# --- 3. 进攻方式 (Synergy Play Type) ---
+def get_synergy_data(tables, player_id, season):
     results = {}
-    try:
-        print(f"   正在拉取 Synergy 数据: {season}...")
-        for pt_key, pt_name in target_play_types.items():
-            time.sleep(0.6)
-
-            synergy = SynergyPlayTypes(
-                player_or_team_abbreviation='P',
-                play_type_nullable=pt_key,
-                season=season,
-                type_grouping_nullable='offensive',
-                per_mode_simple='PerGame',
-                season_type_all_star='Regular Season'
-            )
-            df = synergy.get_data_frames()[0]
-
-            player_stats = df[df['PLAYER_ID'] == player_id]
-
-            if not player_stats.empty:
-                # --- 【强制修正】 ---
-                # 根据Debug结果，列名绝对是 POSS_PCT。不再尝试其他名字。
-                # 如果这里报错，说明API返回的结构在瞬间变了，或者数据为空。
-                if 'POSS_PCT' in player_stats.columns:
-                    freq = player_stats['POSS_PCT'].values[0]
-                    ppp = player_stats['PPP'].values[0]
-                    results[pt_name] = f"{freq * 100:.1f}% (效率: {ppp:.2f})"
-                else:
-                    # 最后的防线：如果真的没有这一列，打印出当前有什么
-                    print(f"   [调试] 找不到 POSS_PCT。当前列名: {player_stats.columns.tolist()}")
-                    results[pt_name] = "列名错误"
-            else:
-                results[pt_name] = "0.0% (无数据)"
-
-    except Exception as e:
-        print(f"   [!] 获取 Synergy 数据出错 ({season}): {e}")
-        return {}
-
+    for pt_key, pt_name in TARGET_PLAY_TYPES.items():
+        df = tables.get(("synergy", season, pt_key))
+        if df is None:
+            continue
+        if player_id not in df.index:
+            results[pt_name] = "0.0% (无数据)"
+            continue
+        player_stats = df.loc[player_id]
+        if 'POSS_PCT' in player_stats.index:
+            freq = player_stats['POSS_PCT']
+            ppp = player_stats['PPP']
+            results[pt_name] = f"{freq * 100:.1f}% (效率: {ppp:.2f})"
+        else:
+            results[pt_name] = "列名错误"
     return results
 
 
-# --- 3. 获取投篮分布 (Tracking: C&S vs Pull-up) ---
-def get_shooting_tracking(player_id, season):
-    try:
-        print(f"   正在拉取 Tracking 数据: {season}...")
-        dash = PlayerDashPtShots(
-            player_id=player_id,
-            team_id=0,
-            season=season,
-            season_type_all_star="Regular Season",
-            month=0,
-            opponent_team_id=0,
-            period=0,
-            last_n_games=0,
-            outcome_nullable="",
-            location_nullable="",
-            season_segment_nullable="",
-            date_from_nullable="",
-            date_to_nullable="",
-            vs_conference_nullable="",
-            vs_division_nullable="",
-            game_segment_nullable=""
-        )
-
-        df = dash.get_data_frames()[1]
-        if df.empty: return {}
-
-        cs_data = df[df['SHOT_TYPE'] == 'Catch and Shoot']
-        pu_data = df[df['SHOT_TYPE'] == 'Pull Ups']
-
-        res = {}
-
-        if not cs_data.empty:
-            cs_freq = cs_data['FG3A_FREQUENCY'].values[0]
-            cs_fg3 = cs_data['FG3_PCT'].values[0]
-            res['接球投 (C&S) 三分命中率'] = f"{cs_fg3 * 100:.1f}%"
-            res['接球投 (C&S) 占比'] = f"{cs_freq * 100:.1f}%"
-        else:
-            res['接球投 (C&S) 三分命中率'] = "N/A"
-
-        if not pu_data.empty:
-            pu_freq = pu_data['FG3A_FREQUENCY'].values[0]
-            pu_fg3 = pu_data['FG3_PCT'].values[0]
-            pu_efg = pu_data['EFG_PCT'].values[0]
-            res['运球投 (Pull-up) 三分命中率'] = f"{pu_fg3 * 100:.1f}%"
-            res['运球投 (Pull-up) 有效命中率'] = f"{pu_efg * 100:.1f}%"
-            res['运球投 (Pull-up) 占比'] = f"{pu_freq * 100:.1f}%"
-        else:
-            res['运球投 (Pull-up) 三分命中率'] = "N/A"
+# --- 4. 投篮分布 (Tracking: C&S vs Pull-up)，取自全联盟投篮追踪表 ---
+def _tracking_row(tables, player_id, season, general_range):
+    df = tables.get(("tracking", season, general_range))
+    if df is None or 'PLAYER_ID' not in df.columns:
+        return None
+    rows = df[df['PLAYER_ID'] == player_id]
+    return rows.iloc[0] if not rows.empty else None
 
-        return res
 
-    except Exception as e:
-        print(f"   [!] 获取 Tracking 数据出错 ({season}): {e}")
+def get_shooting_tracking(tables, player_id, season):
+    if int(season[:4]) < TRACKING_FIRST_SEASON:
         return {}
+    res = {}
+
+    cs = _tracking_row(tables, player_id, season, "Catch and Shoot")
+    if cs is not None:
+        res['接球投 (C&S) 三分命中率'] = f"{cs['FG3_PCT'] * 100:.1f}%"
+        res['接球投 (C&S) 占比'] = f"{cs['FG3A_FREQUENCY'] * 100:.1f}%"
+    else:
+        res['接球投 (C&S) 三分命中率'] = "N/A"
+
+    pu = _tracking_row(tables, player_id, season, "Pull Ups")
+    if pu is not None:
+        res['运球投 (Pull-up) 三分命中率'] = f"{pu['FG3_PCT'] * 100:.1f}%"
+        res['运球投 (Pull-up) 有效命中率'] = f"{pu['EFG_PCT'] * 100:.1f}%"
+        res['运球投 (Pull-up) 占比'] = f"{pu['FG3A_FREQUENCY'] * 100:.1f}%"
+    else:
+        res['运球投 (Pull-up) 三分命中率'] = "N/A"
+
+    return res
 
 
-# --- 4. 辅助函数 ---
-def format_data(klay_d, kon_d):
+# --- 5. 辅助函数 ---
+def format_data(a_d, b_d):
+    """两名球员的同名指标并排成表，取值列固定为 A / B (展示时再换成球员标签，见 with_labels)"""
     data = []
-    if not klay_d: klay_d = {}
-    if not kon_d: kon_d = {}
+    if not a_d: a_d = {}
+    if not b_d: b_d = {}
 
-    all_keys = list(set(list(klay_d.keys()) + list(kon_d.keys())))
+    all_keys = list(dict.fromkeys(list(a_d.keys()) + list(b_d.keys())))
     # 逻辑排序
     all_keys.sort(key=lambda x: "占比" in x or "OffScreen" in x or "BallHandler" in x, reverse=True)
 
     for k in all_keys:
         data.append({
             "对比维度": k,
-            "巅峰克莱 (15-16)": klay_d.get(k, "-"),
-            "新秀克努佩尔 (25-26)": kon_d.get(k, "-")
+            "A": a_d.get(k, "-"),
+            "B": b_d.get(k, "-")
         })
-    return pd.DataFrame(data)
+    return pd.DataFrame(data, columns=["对比维度", "A", "B"])
 
 
-# --- 5. 主程序 ---
-if __name__ == "__main__":
-    print(f"\n>>> 开始拉取最终对比: 克莱({KLAY_SEASON}) vs 克努佩尔({KON_SEASON})")
+def with_labels(df, labels):
+    """A / B 列换成球员标签作表头；同一球员同一赛季对比自身时加上 A / B 区分"""
+    a_label, b_label = labels
+    if a_label == b_label:
+        a_label, b_label = f"{a_label} [A]", f"{b_label} [B]"
+    return df.rename(columns={"A": a_label, "B": b_label})
 
-    klay_id = get_player_id("Klay Thompson")
-    kon_id = get_player_id("Kon Knueppel")
 
-    # 1. 跑克莱数据
-    print(f"\n--- 获取克莱·汤普森数据 ---")
-    klay_synergy = get_synergy_data(klay_id, KLAY_SEASON)
-    klay_tracking = get_shooting_tracking(klay_id, KLAY_SEASON)
+def table_text(df):
+    try:
+        return df.to_markdown(index=False)
+    except ImportError:
+        # 未安装 tabulate 时退回纯文本
+        return df.to_string(index=False)
+
+
+# --- 6. 批量报告 ---
+def build_reports(pairs, workers=8):
+    """pairs: [(球员A, 赛季A, 球员B, 赛季B), ...]；返回每组的 {标题, 战术表, 投篮表, 错误}"""
+    names = {name for a, _, b, _ in pairs for name in (a, b)}
+    ids = {name: get_player_id(name) for name in names}
+    seasons = {season for _, sa, _, sb in pairs for season in (sa, sb)}
+    print(f">>> {len(pairs)} 组对比，{len(names)} 名球员，{len(seasons)} 个赛季", file=sys.stderr)
+    tables = load_league_tables(seasons, workers=workers)
+
+    profiles = {}
+    for name, season in {(n, s) for a, sa, b, sb in pairs for n, s in ((a, sa), (b, sb))}:
+        pid = ids.get(name)
+        if pid:
+            profiles[(name, season)] = (get_synergy_data(tables, pid, season),
+                                        get_shooting_tracking(tables, pid, season))
+
+    reports = []
+    for a, sa, b, sb in pairs:
+        a_label, b_label = f"{a} ({sa})", f"{b} ({sb})"
+        report = {"title": f"{a_label} vs {b_label}", "labels": (a_label, b_label), "errors": []}
+        for name in (a, b):
+            if not ids.get(name):
+                report["errors"].append(f"未找到球员: {name}")
+        a_syn, a_trk = profiles.get((a, sa), ({}, {}))
+        b_syn, b_trk = profiles.get((b, sb), ({}, {}))
+        report["synergy"] = format_data(a_syn, b_syn)
+        report["tracking"] = format_data(a_trk, b_trk)
+        reports.append(report)
+    return reports
+
+
+def render_markdown(reports):
+    lines = []
+    for r in reports:
+        lines.append(f"## {r['title']}\n")
+        for err in r["errors"]:
+            lines.append(f"> [!] {err}\n")
+        if not r["synergy"].empty:
+            lines += ["### 战术风格对比 (Play Type)\n", table_text(with_labels(r["synergy"], r["labels"])), ""]
+        else:
+            lines.append("暂无 Synergy 数据 (仅支持 2015-16 后)\n")
+        if not r["tracking"].empty:
+            lines += ["### 投篮机制对比 (Tracking Data)\n", table_text(with_labels(r["tracking"], r["labels"])), ""]
+        else:
+            lines.append("暂无 Tracking 数据 (仅支持 2013-14 后)\n")
+    return "\n".join(lines)
+
+
+def render_csv(reports):
+    """长表：每组对比的每个维度一行，A/B 两列取值"""
+    rows = []
+    for r in reports:
+        for section, df in (("Synergy", r["synergy"]), ("Tracking", r["tracking"])):
+            for _, row in df.iterrows():
+                rows.append({"对比组": r["title"], "类别": section, "对比维度": row["对比维度"],
+                             "A": row["A"], "B": row["B"]})
+    return pd.DataFrame(rows, columns=["对比组", "类别", "对比维度", "A", "B"])
 
-    # 2. 跑克努佩尔数据
-    kon_synergy = {}
-    kon_tracking = {}
 
-    if kon_id:
-        print(f"\n--- 获取康·克努佩尔数据 ---")
-        kon_synergy = get_synergy_data(kon_id, KON_SEASON)
-        kon_tracking = get_shooting_tracking(kon_id, KON_SEASON)
+def build_parser():
+    parser = argparse.ArgumentParser(description="球员赛季对位报告 (Synergy 战术 + 投篮追踪)，支持批量")
+    parser.add_argument("--pairs", default=None, help="对比文件，每行: 球员A, 赛季A, 球员B, 赛季B")
+    parser.add_argument("--output", default=None, help="输出 .md / .csv；省略时在终端打印 Markdown")
+    parser.add_argument("--workers", type=int, default=8, help="并发拉取联盟表的线程数 (整体仍受限速器约束)")
+    return parser
 
-        # 兜底：如果 Tracking 有数据但 Synergy 没数据
-        if not kon_synergy: kon_synergy = {"提示": "暂无Synergy数据"}
+
+# --- 7. 主程序 ---
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    pairs = read_pairs(Path(args.pairs)) if args.pairs else DEFAULT_PAIRS
+    if not pairs:
+        print("对比文件中没有有效的组合", file=sys.stderr)
+        sys.exit(1)
+
+    reports = build_reports(pairs, workers=args.workers)
+
+    if args.output is None:
+        print("\n" + "=" * 60)
+        print(render_markdown(reports))
+        print("=" * 60)
     else:
-        print(f"\n[!] 警告: 未找到 Kon Knueppel 的 ID。")
-
-    # 3. 输出表格
-    print("\n" + "=" * 60)
-    if klay_synergy or kon_synergy:
-        df1 = format_data(klay_synergy, kon_synergy)
-        print("【战术风格对比 (Play Type) - 终极版】")
-        try:
-            print(df1.to_markdown(index=False))
-        except:
-            print(df1.to_string(index=False))
-        print("-" * 60)
-
-    if klay_tracking or kon_tracking:
-        df2 = format_data(klay_tracking, kon_tracking)
-        print("【投篮机制对比 (Tracking Data) - 终极版】")
-        try:
-            print(df2.to_markdown(index=False))
-        except:
-            print(df2.to_string(index=False))
-    print("=" * 60)
\ No newline at end of file
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if output.suffix.lower() == ".csv":
+            render_csv(reports).to_csv(output, index=False, encoding="utf-8-sig")
+        elif output.suffix.lower() in (".md", ".markdown"):
+            output.write_text(render_markdown(reports), encoding="utf-8")
+        else:
+            print(f"不支持的输出格式: {output.suffix} (可选 .md / .csv)", file=sys.stderr)
+            sys.exit(1)
+        print(f">>> 已写入 {len(reports)} 组对比 -> {output}", file=sys.stderr)
@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import streamlit as st
+
+ROOT = Path(__file__).resolve().parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# 统一入口：所有子应用作为页面运行在同一个进程里，共享 data.store 的联盟总表。
+# 各页面自己调用 st.set_page_config，因此这里在 pg.run() 之前不输出任何元素。
+PAGES = {
+    "球员": [
+        st.Page(str(ROOT / "app.py"), title="球员评级", icon="🏀", url_path="rater", default=True),
+        st.Page(str(ROOT / "player" / "compare.py"), title="球员对比", icon="⚔️", url_path="player-compare"),
+        st.Page(str(ROOT / "team" / "test.py"), title="数据深度视界", icon="📊", url_path="data-vision"),
+        st.Page(str(ROOT / "rookie" / "app.py"), title="新秀观察", icon="🌱", url_path="rookie-watch"),
+    ],
+    "球队与排名": [
+        st.Page(str(ROOT / "team" / "compare.py"), title="球队对比", icon="🛡️", url_path="team-compare"),
+        st.Page(str(ROOT / "rank" / "red&black.py"), title="红黑榜", icon="🏆", url_path="power-ranking"),
+    ],
+}
+
+pg = st.navigation(PAGES)
+pg.run()
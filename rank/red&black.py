@@ -1,20 +1,22 @@
+import sys
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
-import time
 import numpy as np
 
 # NBA API Imports
-from nba_api.stats.endpoints import (
-    leaguedashplayerstats,
-    leaguedashptdefend,
-    leaguehustlestatsplayer,
-    synergyplaytypes
-)
 from nba_api.stats.static import teams
 
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.synergy import get_synergy_store
+from data.store import get_store
+
 # ==========================================
 # 配置区
 # ==========================================
@@ -81,19 +83,13 @@ class PowerRankingEngine:
     @st.cache_data(ttl=3600)
     def fetch_data(_self, season, date_from=None, date_to=None):
         _self.status = {"Base": False, "Defense": False, "Hustle": False, "Iso": False}
+        # 联盟总表由进程级仓库共享，返回的表不可原地修改
+        store = get_store()
         try:
             # 1. Base + Advanced Stats
-            time.sleep(0.2)
-            base = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season, date_from_nullable=date_from, date_to_nullable=date_to,
-                measure_type_detailed_defense='Base', per_mode_detailed='PerGame'
-            ).get_data_frames()[0]
-
-            time.sleep(0.2)
-            adv = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season, date_from_nullable=date_from, date_to_nullable=date_to,
-                measure_type_detailed_defense='Advanced', per_mode_detailed='PerGame'
-            ).get_data_frames()[0]
+            base = store.player_stats(season, 'Base', per_mode='PerGame', date_from=date_from, date_to=date_to)
+
+            adv = store.player_stats(season, 'Advanced', per_mode='PerGame', date_from=date_from, date_to=date_to)
 
             if base.empty: return pd.DataFrame()
             _self.status["Base"] = True
@@ -102,25 +98,17 @@ class PowerRankingEngine:
             defense = pd.DataFrame()
             try:
                 # 尝试 A: 精确日期
-                time.sleep(0.2)
-                defense = leaguedashptdefend.LeagueDashPtDefend(
-                    season=season, date_from_nullable=date_from, date_to_nullable=date_to,
-                    defense_category='Overall', per_mode_simple='PerGame', season_type_all_star='Regular Season'
-                ).get_data_frames()[0]
+                defense = store.player_defense(season, date_from=date_from, date_to=date_to)
                 if defense.empty: raise ValueError
             except:
                 # 尝试 B: 赛季平均
                 try:
-                    time.sleep(0.2)
-                    defense = leaguedashptdefend.LeagueDashPtDefend(
-                        season=season, defense_category='Overall', per_mode_simple='PerGame',
-                        season_type_all_star='Regular Season'
-                    ).get_data_frames()[0]
+                    defense = store.player_defense(season)
                 except:
                     pass
 
             if not defense.empty:
-                defense.columns = [c.upper() for c in defense.columns]
+                defense = defense.rename(columns=str.upper)
                 if 'CLOSE_DEF_PERSON_ID' in defense.columns: defense = defense.rename(
                     columns={'CLOSE_DEF_PERSON_ID': 'PLAYER_ID'})
                 if 'D_FGA' in defense.columns: defense = defense.rename(columns={'D_FGA': 'CONTESTED_SHOTS'})
@@ -129,12 +117,9 @@ class PowerRankingEngine:
             # 3. Hustle (截断)
             hustle = pd.DataFrame()
             try:
-                time.sleep(0.2)
-                hustle = leaguehustlestatsplayer.LeagueHustleStatsPlayer(
-                    season=season, per_mode_time='PerGame', season_type_all_star='Regular Season'
-                ).get_data_frames()[0]
+                hustle = store.player_hustle(season, per_mode='PerGame')
                 if not hustle.empty:
-                    hustle.columns = [c.upper() for c in hustle.columns]
+                    hustle = hustle.rename(columns=str.upper)
                     _self.status["Hustle"] = True
             except:
                 pass
@@ -142,11 +127,7 @@ class PowerRankingEngine:
             # 4. Synergy Isolation
             iso_def = pd.DataFrame()
             try:
-                time.sleep(0.2)
-                iso_data = synergyplaytypes.SynergyPlayTypes(
-                    player_or_team_abbreviation='P', play_type_nullable='Isolation', season=season,
-                    type_grouping_nullable='Defensive', per_mode_simple='PerGame', season_type_all_star='Regular Season'
-                ).get_data_frames()[0]
+                iso_data = get_synergy_store().table(season, 'Isolation', who='P', grouping='defensive')
                 if not iso_data.empty:
                     iso_cols = [c for c in ['PLAYER_ID', 'PPP'] if c in iso_data.columns]
                     iso_def = iso_data[iso_cols].rename(columns={'PPP': 'ISO_PPP'})
@@ -157,8 +138,8 @@ class PowerRankingEngine:
             # --- Merge Logic ---
             cols_adv = ['PLAYER_ID', 'DEF_RATING', 'OFF_RATING', 'TS_PCT', 'USG_PCT', 'PACE', 'PIE', 'AST_PCT',
                         'AST_TO']
-            base.columns = [c.upper() for c in base.columns]
-            adv.columns = [c.upper() for c in adv.columns]
+            base = base.rename(columns=str.upper)
+            adv = adv.rename(columns=str.upper)
 
             merged = pd.merge(base, adv[cols_adv], on='PLAYER_ID', suffixes=('', '_ADV'))
 
@@ -1,11 +1,17 @@
+import sys
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from nba_api.stats.endpoints import playergamelogs, commonallplayers, leaguedashplayerstats, playerindex
 from datetime import datetime, timedelta
-import os
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.store import get_store
 
 # === 1. 页面配置 ===
 st.set_page_config(
@@ -89,32 +95,23 @@ class RookieRankerEngine:
 
     @st.cache_data(ttl=3600)
     def fetch_data(_self, date_from="", date_to=""):
+        # 联盟总表与比赛日志由进程级仓库共享，返回的表不可原地修改
+        store = get_store()
         try:
             # 1. 基础数据 (Base)
-            base_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-                per_mode_detailed='PerGame', season=_self.season, season_type_all_star='Regular Season',
-                date_from_nullable=date_from, date_to_nullable=date_to
-            ).get_data_frames()[0]
+            base_stats = store.player_stats(_self.season, 'Base', date_from=date_from, date_to=date_to)
 
             if base_stats.empty:
                 return pd.DataFrame(), pd.DataFrame()
 
             # 2. 高阶数据 (Advanced)
-            adv_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-                per_mode_detailed='PerGame', measure_type_detailed_defense='Advanced', 
-                season=_self.season, season_type_all_star='Regular Season',
-                date_from_nullable=date_from, date_to_nullable=date_to
-            ).get_data_frames()[0]
+            adv_stats = store.player_stats(_self.season, 'Advanced', date_from=date_from, date_to=date_to)
 
             # 3. 得分方式数据 (Scoring) - 获取 %Unassisted
-            score_stats = leaguedashplayerstats.LeagueDashPlayerStats(
-                per_mode_detailed='PerGame', measure_type_detailed_defense='Scoring', 
-                season=_self.season, season_type_all_star='Regular Season',
-                date_from_nullable=date_from, date_to_nullable=date_to
-            ).get_data_frames()[0]
+            score_stats = store.player_stats(_self.season, 'Scoring', date_from=date_from, date_to=date_to)
 
             # 4. 位置信息 (PlayerIndex)
-            p_index = playerindex.PlayerIndex(season=_self.season, historical_nullable=0).get_data_frames()[0]
+            p_index = store.player_index(_self.season)
             p_pos_df = p_index[['PERSON_ID', 'POSITION']].rename(columns={'PERSON_ID': 'PLAYER_ID'})
 
             # 5. 合并数据
@@ -129,13 +126,8 @@ class RookieRankerEngine:
 
             # 6. 比赛日志
             try:
-                logs = playergamelogs.PlayerGameLogs(
-                    season_nullable=_self.season, 
-                    date_from_nullable=date_from, 
-                    date_to_nullable=date_to
-                )
-                logs_df = logs.get_data_frames()[0]
-                logs_df['GAME_DATE'] = pd.to_datetime(logs_df['GAME_DATE'])
+                # GAME_DATE 已由仓库统一转换为 datetime
+                logs_df = store.player_game_logs(_self.season, date_from=date_from, date_to=date_to)
             except:
                 logs_df = pd.DataFrame()
 
@@ -149,6 +141,8 @@ class RookieRankerEngine:
         if logs_df.empty: 
             return pd.DataFrame(columns=['PLAYER_ID', 'GmSc_Std'])
         try:
+            # 日志表为进程内共享数据，先复制再加列
+            logs_df = logs_df.copy()
             logs_df['GmSc'] = (logs_df['PTS'] + 0.4 * logs_df['FGM'] - 0.7 * logs_df['FGA'] - 0.4 * (logs_df['FTA'] - logs_df['FTM']) + 
                                0.7 * logs_df['OREB'] + 0.3 * logs_df['DREB'] + logs_df['STL'] + 0.7 * logs_df['AST'] + 
                                0.7 * logs_df['BLK'] - 0.4 * logs_df['PF'] - logs_df['TOV'])
@@ -163,7 +157,8 @@ class RookieRankerEngine:
         score = 70 + (series * 10 / scale_factor)
         return score.clip(40, 100)
 
-    def apply_ranking_model(self, league_df, consistency_df, weights):
+    def compute_component_scores(self, league_df, consistency_df):
+        """六维分项得分 (与权重无关，可缓存复用)"""
         if league_df.empty: return pd.DataFrame()
         df = league_df.copy()
 
@@ -297,7 +292,11 @@ class RookieRankerEngine:
         # 5. 最终截断
         df['Score_Dura'] = df['Score_Dura'].clip(0, 100)
 
-        # === 总分计算 ===
+        return df
+
+    def apply_weights(self, df, weights):
+        """总分计算：拖动权重滑块时只重算这一步"""
+        df = df.copy()
         df['Final_Score'] = (
             df['Score_Prod'] * weights['prod'] +
             df['Score_Eff'] * weights['eff'] +
@@ -306,12 +305,17 @@ class RookieRankerEngine:
             df['Score_Team'] * weights['team'] +
             df['Score_Dura'] * weights['dura']
         )
-        
         return df
 
+    def apply_ranking_model(self, league_df, consistency_df, weights):
+        df = self.compute_component_scores(league_df, consistency_df)
+        if df.empty: return df
+        return self.apply_weights(df, weights)
+
 # === 4. 侧边栏 ===
-if os.path.exists("unnamed.jpg"):
-    st.sidebar.image("unnamed.jpg", use_container_width=True)
+LOGO_PATH = Path(__file__).resolve().parent / "unnamed.jpg"
+if LOGO_PATH.exists():
+    st.sidebar.image(str(LOGO_PATH), use_container_width=True)
 else:
     st.sidebar.markdown("# 🏀 篮球星图")
 
@@ -351,20 +355,7 @@ else:
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("**模式：基石球员优先**")
-
-w_prod = st.sidebar.slider("📊 基础统治力", 0.0, 1.0, 0.40, 0.05)
-w_eff = st.sidebar.slider("🎯 进攻效率", 0.0, 1.0, 0.20, 0.05)
-w_def = st.sidebar.slider("🛡️ 个人防守", 0.0, 1.0, 0.10, 0.05)
-w_team = st.sidebar.slider("🏆 球队贡献", 0.0, 1.0, 0.10, 0.05)
-w_dura = st.sidebar.slider("🔋 出勤/稳定", 0.0, 1.0, 0.10, 0.05)
-w_to = st.sidebar.slider("🧠 失误控制", 0.0, 1.0, 0.10, 0.05)
-
-total_w = w_prod + w_eff + w_def + w_to + w_team + w_dura
-if total_w == 0: total_w = 1
-weights = {
-    'prod': w_prod/total_w, 'eff': w_eff/total_w, 'def': w_def/total_w, 
-    'to': w_to/total_w, 'team': w_team/total_w, 'dura': w_dura/total_w
-}
+st.sidebar.caption("评分权重在主界面调整，拖动滑块只重算排名，不会重新拉取数据。")
 
 # === 5. 主界面 ===
 st.title(f"🏀 篮球星图 | {CURRENT_SEASON} NBA 新秀观察")
@@ -375,167 +366,198 @@ else:
 
 ranker = RookieRankerEngine(season=CURRENT_SEASON)
 
-full_ranked_df = pd.DataFrame()
-logs_df = pd.DataFrame()
+def get_static_pos(name):
+    raw = ROOKIE_POSITIONS.get(name, 'F')
+    return ranker.simplify_position(raw)
 
-with st.spinner('正在从 NBA 官方数据库获取实时数据...'):
-    league_df, logs_df = ranker.fetch_data(date_from=date_from_str, date_to=date_to_str)
+def process_display(row):
+    pos, cn_name = ranker.map_info(row['PLAYER_NAME'])
+    if pos == "N/A": 
+        pos = row.get('POSITION', 'N/A')
+    return pd.Series([pos, cn_name])
 
-consistency_df = ranker.calculate_consistency(logs_df)
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_rookie_board(date_from, date_to):
+    """与权重无关的部分：拉数据、分项得分、新秀名单对齐，只在统计周期变化时重算"""
+    full_ranked_df = pd.DataFrame()
+    league_df, logs_df = ranker.fetch_data(date_from=date_from, date_to=date_to)
 
-if not league_df.empty:
-    full_ranked_df = ranker.apply_ranking_model(league_df, consistency_df, weights)
+    consistency_df = ranker.calculate_consistency(logs_df)
 
-# 3. 强制筛选 & 补零
-all_targets = list(ROOKIE_POSITIONS.keys())
-target_df = pd.DataFrame(all_targets, columns=['PLAYER_NAME'])
+    if not league_df.empty:
+        full_ranked_df = ranker.compute_component_scores(league_df, consistency_df)
 
-if not full_ranked_df.empty and 'PLAYER_NAME' in full_ranked_df.columns:
-    season_ranked = pd.merge(target_df, full_ranked_df, on='PLAYER_NAME', how='left')
-else:
-    season_ranked = target_df.copy()
+    # 3. 强制筛选 & 补零
+    all_targets = list(ROOKIE_POSITIONS.keys())
+    target_df = pd.DataFrame(all_targets, columns=['PLAYER_NAME'])
 
-numeric_cols = season_ranked.select_dtypes(include=[np.number]).columns
-season_ranked[numeric_cols] = season_ranked[numeric_cols].fillna(0)
+    if not full_ranked_df.empty and 'PLAYER_NAME' in full_ranked_df.columns:
+        season_ranked = pd.merge(target_df, full_ranked_df, on='PLAYER_NAME', how='left')
+    else:
+        season_ranked = target_df.copy()
 
-if 'POSITION' in season_ranked.columns:
-    season_ranked['POSITION'] = season_ranked['POSITION'].fillna('')
+    numeric_cols = season_ranked.select_dtypes(include=[np.number]).columns
+    season_ranked[numeric_cols] = season_ranked[numeric_cols].fillna(0)
 
-def get_static_pos(name):
-    raw = ROOKIE_POSITIONS.get(name, 'F')
-    return ranker.simplify_position(raw)
+    if 'POSITION' in season_ranked.columns:
+        season_ranked['POSITION'] = season_ranked['POSITION'].fillna('')
 
-if 'Calc_Pos' not in season_ranked.columns:
-    season_ranked['Calc_Pos'] = None
+    if 'Calc_Pos' not in season_ranked.columns:
+        season_ranked['Calc_Pos'] = None
 
-season_ranked['Calc_Pos'] = season_ranked.apply(
-    lambda x: x['Calc_Pos'] if pd.notna(x['Calc_Pos']) and x['Calc_Pos'] != 0 else get_static_pos(x['PLAYER_NAME']), 
-    axis=1
-)
+    season_ranked['Calc_Pos'] = season_ranked.apply(
+        lambda x: x['Calc_Pos'] if pd.notna(x['Calc_Pos']) and x['Calc_Pos'] != 0 else get_static_pos(x['PLAYER_NAME']), 
+        axis=1
+    )
 
-def process_display(row):
-    pos, cn_name = ranker.map_info(row['PLAYER_NAME'])
-    if pos == "N/A": 
-        pos = row.get('POSITION', 'N/A')
-    return pd.Series([pos, cn_name])
+    season_ranked[['Pos_Display', 'CN_Name']] = season_ranked.apply(process_display, axis=1)
+    season_ranked['Display_Name'] = season_ranked.apply(lambda row: f"{row['CN_Name']} ({row['PLAYER_NAME']})" if row['CN_Name'] != row['PLAYER_NAME'] else row['PLAYER_NAME'], axis=1)
+    return season_ranked
 
-season_ranked[['Pos_Display', 'CN_Name']] = season_ranked.apply(process_display, axis=1)
-season_ranked['Display_Name'] = season_ranked.apply(lambda row: f"{row['CN_Name']} ({row['PLAYER_NAME']})" if row['CN_Name'] != row['PLAYER_NAME'] else row['PLAYER_NAME'], axis=1)
-
-# 排序
-season_ranked = season_ranked.sort_values(by='Final_Score', ascending=False).reset_index(drop=True)
-
-# === 新增：添加排名和顺位列 ===
-season_ranked['Rank'] = season_ranked.index + 1
-season_ranked['Pick'] = season_ranked['PLAYER_NAME'].map(ROOKIE_DRAFT_PICKS).fillna(99).astype(int)
-
-# === KPI 展示 ===
-col1, col2, col3, col4 = st.columns(4)
-if not season_ranked.empty:
-    top1 = season_ranked.iloc[0]
-    col1.metric("👑 榜单领跑", top1['CN_Name'], f"{top1['Final_Score']:.1f}")
-    
-    eff_king = season_ranked.sort_values('Score_Eff', ascending=False).iloc[0]
-    col2.metric("💎 效率之王", eff_king['CN_Name'], f"TS% {eff_king['TS_PCT']:.1%}")
-    
-    def_king = season_ranked.sort_values('Score_Def', ascending=False).iloc[0]
-    col3.metric("🛡️ 铁闸", def_king['CN_Name'], f"评 {def_king['Score_Def']:.1f}")
-    
-    iron_man = season_ranked.sort_values('GP', ascending=False).iloc[0]
-    col4.metric("🔋 劳模", iron_man['CN_Name'], f"{iron_man['GP']} 场")
-
-st.markdown("---")
-
-# === 核心 Tabs ===
-main_tab1, main_tab2, main_tab3 = st.tabs(["🏆 综合排名", "🔬 六维能力雷达", "🗃️ 原始数据"])
-
-with main_tab1:
-    pos_tab1, pos_tab2, pos_tab3, pos_tab4 = st.tabs(["💠 全员", "🛡️ 后卫", "⚔️ 锋线", "🦍 中锋"])
-    
-    def render_chart(df, title_suf):
-        if df.empty:
-            st.info("暂无数据")
-            return
-        fig = px.bar(df.head(20), x='Final_Score', y='Display_Name', orientation='h',
-                     color='Score_Prod', color_continuous_scale='Viridis', text_auto='.1f',
-                     title=f"排名 {title_suf} (颜色=统治力)")
-        fig.update_layout(yaxis={'categoryorder':'total ascending', 'title':''}, xaxis={'title':'Franchise Player Score'}, height=600)
-        st.plotly_chart(fig, use_container_width=True)
-
-    with pos_tab1: render_chart(season_ranked, "(全员)")
-    with pos_tab2: render_chart(season_ranked[season_ranked['Calc_Pos']=='Guard'], "(后卫)")
-    with pos_tab3: render_chart(season_ranked[season_ranked['Calc_Pos']=='Forward'], "(锋线)")
-    with pos_tab4: render_chart(season_ranked[season_ranked['Calc_Pos']=='Center'], "(中锋)")
-
-with main_tab2:
-    c1, c2 = st.columns([1, 2])
-    with c1:
-        st.subheader("新秀对比")
-        p_list = season_ranked['Display_Name'].tolist()
-        p1 = st.selectbox("球员 1", p_list, index=0)
-        p2 = st.selectbox("球员 2", p_list, index=1 if len(p_list)>1 else 0)
-        
-    with c2:
-        def get_radar_vals(name):
-            r = season_ranked[season_ranked['Display_Name'] == name].iloc[0]
-            return [r['Score_Prod'], r['Score_Eff'], r['Score_Def'], r['Score_TO'], r['Score_Team'], r['Score_Dura']], r['CN_Name']
-
-        vals1, n1 = get_radar_vals(p1)
-        vals2, n2 = get_radar_vals(p2)
-        cats = ['统治力', '进攻效率', '个人防守', '失误控制', '球队贡献', '出勤耐用']
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(r=vals1, theta=cats, fill='toself', name=n1))
-        fig.add_trace(go.Scatterpolar(r=vals2, theta=cats, fill='toself', name=n2))
-        fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), title="六维能力模型对比", height=500)
-        st.plotly_chart(fig, use_container_width=True)
-
-with main_tab3:
-    st.subheader("数据监控室")
-    st.markdown(f"统计范围: **{date_from_str if date_from_str else '赛季至今'}** 至 **{date_to_str if date_to_str else '今'}**")
-    
-    # 增加 Rank (排名) 和 Pick (顺位)
-    cols = ['Rank', 'Pick', 'Display_Name', 'Pos_Display', 'Final_Score', 
-            'Score_Dura',
-            'Score_Prod', 'Score_Eff', 'Score_Def', 'Score_TO', 'Score_Team',
-            'GP', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PLUS_MINUS',
-            'FG_PCT', 'FG3_PCT', 'FT_PCT',
-            'USG_PCT', 'PCT_UAST_FGM', 'TS_PCT']
-    
-    show_df = season_ranked[cols].rename(columns={
-        'Rank': '排名', 'Pick': '顺位',
-        'Display_Name': '球员', 'Pos_Display': '位置', 'Final_Score': '总分',
-        'Score_Dura': '出勤分',
-        'Score_Prod': '统治', 'Score_Eff': '效率', 'Score_Def': '防守', 'Score_TO': '控失', 'Score_Team': '贡献',
-        'GP': '场次', 'MIN': '时间', 'PTS': '得分', 'REB': '篮板', 'AST': '助攻', 'STL': '抢断', 'BLK': '盖帽', 'TOV': '失误', 'PLUS_MINUS': '正负值',
-        'FG_PCT': '投篮%', 'FG3_PCT': '三分%', 'FT_PCT': '罚球%',
-        'USG_PCT': '球权%', 'PCT_UAST_FGM': '非助攻%', 'TS_PCT': '真命%'
-    })
-    
-    st.dataframe(
-        show_df,
-        column_config={
-            "排名": st.column_config.NumberColumn("排名", format="#%d"),
-            "顺位": st.column_config.NumberColumn("顺位", format="#%d"),
-            "总分": st.column_config.ProgressColumn("总分", format="%.1f", min_value=0, max_value=100),
-            "出勤分": st.column_config.NumberColumn("出勤分", format="%.1f"),
-            "场次": st.column_config.NumberColumn("场次", format="%d"),
-            "时间": st.column_config.NumberColumn("时间", format="%.1f"),
-            "真命%": st.column_config.NumberColumn("真实命中%", format="%.1%"),
-            "投篮%": st.column_config.NumberColumn("投篮%", format="%.1%"),
-            "三分%": st.column_config.NumberColumn("三分%", format="%.1%"),
-            "罚球%": st.column_config.NumberColumn("罚球%", format="%.1%"),
-            "球权%": st.column_config.NumberColumn("使用率%", format="%.1%"),
-            "非助攻%": st.column_config.NumberColumn("非受助攻%", format="%.1%"),
-            "正负值": st.column_config.NumberColumn("正负值", format="%+.1f"),
-            "得分": st.column_config.NumberColumn("得分", format="%.1f"),
-            "篮板": st.column_config.NumberColumn("篮板", format="%.1f"),
-            "助攻": st.column_config.NumberColumn("助攻", format="%.1f"),
-            "抢断": st.column_config.NumberColumn("抢断", format="%.1f"),
-            "盖帽": st.column_config.NumberColumn("盖帽", format="%.1f"),
-            "失误": st.column_config.NumberColumn("失误", format="%.1f"),
-        },
-        use_container_width=True,
-        hide_index=True,
-        height=800
-    )
+with st.spinner('正在从 NBA 官方数据库获取实时数据...'):
+    season_board = build_rookie_board(date_from_str, date_to_str)
+
+@st.fragment
+def render_rankings(board):
+    """局部重跑区域：权重滑块、排名、雷达图与数据表"""
+    with st.expander("⚖️ 评分权重", expanded=True):
+        wc = st.columns(6)
+        w_prod = wc[0].slider("📊 基础统治力", 0.0, 1.0, 0.40, 0.05)
+        w_eff = wc[1].slider("🎯 进攻效率", 0.0, 1.0, 0.20, 0.05)
+        w_def = wc[2].slider("🛡️ 个人防守", 0.0, 1.0, 0.10, 0.05)
+        w_team = wc[3].slider("🏆 球队贡献", 0.0, 1.0, 0.10, 0.05)
+        w_dura = wc[4].slider("🔋 出勤/稳定", 0.0, 1.0, 0.10, 0.05)
+        w_to = wc[5].slider("🧠 失误控制", 0.0, 1.0, 0.10, 0.05)
+
+    total_w = w_prod + w_eff + w_def + w_to + w_team + w_dura
+    if total_w == 0: total_w = 1
+    weights = {
+        'prod': w_prod/total_w, 'eff': w_eff/total_w, 'def': w_def/total_w, 
+        'to': w_to/total_w, 'team': w_team/total_w, 'dura': w_dura/total_w
+    }
+
+    if 'Score_Prod' in board.columns:
+        season_ranked = ranker.apply_weights(board, weights)
+    else:
+        season_ranked = board.copy()
+        season_ranked['Final_Score'] = 0.0
+
+    # 排序
+    season_ranked = season_ranked.sort_values(by='Final_Score', ascending=False).reset_index(drop=True)
+
+    # === 新增：添加排名和顺位列 ===
+    season_ranked['Rank'] = season_ranked.index + 1
+    season_ranked['Pick'] = season_ranked['PLAYER_NAME'].map(ROOKIE_DRAFT_PICKS).fillna(99).astype(int)
+
+    # === KPI 展示 ===
+    col1, col2, col3, col4 = st.columns(4)
+    if not season_ranked.empty:
+        top1 = season_ranked.iloc[0]
+        col1.metric("👑 榜单领跑", top1['CN_Name'], f"{top1['Final_Score']:.1f}")
+
+        eff_king = season_ranked.sort_values('Score_Eff', ascending=False).iloc[0]
+        col2.metric("💎 效率之王", eff_king['CN_Name'], f"TS% {eff_king['TS_PCT']:.1%}")
+
+        def_king = season_ranked.sort_values('Score_Def', ascending=False).iloc[0]
+        col3.metric("🛡️ 铁闸", def_king['CN_Name'], f"评 {def_king['Score_Def']:.1f}")
+
+        iron_man = season_ranked.sort_values('GP', ascending=False).iloc[0]
+        col4.metric("🔋 劳模", iron_man['CN_Name'], f"{iron_man['GP']} 场")
+
+    st.markdown("---")
+
+    # === 核心 Tabs ===
+    main_tab1, main_tab2, main_tab3 = st.tabs(["🏆 综合排名", "🔬 六维能力雷达", "🗃️ 原始数据"])
+
+    with main_tab1:
+        pos_tab1, pos_tab2, pos_tab3, pos_tab4 = st.tabs(["💠 全员", "🛡️ 后卫", "⚔️ 锋线", "🦍 中锋"])
+
+        def render_chart(df, title_suf):
+            if df.empty:
+                st.info("暂无数据")
+                return
+            fig = px.bar(df.head(20), x='Final_Score', y='Display_Name', orientation='h',
+                         color='Score_Prod', color_continuous_scale='Viridis', text_auto='.1f',
+                         title=f"排名 {title_suf} (颜色=统治力)")
+            fig.update_layout(yaxis={'categoryorder':'total ascending', 'title':''}, xaxis={'title':'Franchise Player Score'}, height=600)
+            st.plotly_chart(fig, use_container_width=True)
+
+        with pos_tab1: render_chart(season_ranked, "(全员)")
+        with pos_tab2: render_chart(season_ranked[season_ranked['Calc_Pos']=='Guard'], "(后卫)")
+        with pos_tab3: render_chart(season_ranked[season_ranked['Calc_Pos']=='Forward'], "(锋线)")
+        with pos_tab4: render_chart(season_ranked[season_ranked['Calc_Pos']=='Center'], "(中锋)")
+
+    with main_tab2:
+        c1, c2 = st.columns([1, 2])
+        with c1:
+            st.subheader("新秀对比")
+            p_list = season_ranked['Display_Name'].tolist()
+            p1 = st.selectbox("球员 1", p_list, index=0)
+            p2 = st.selectbox("球员 2", p_list, index=1 if len(p_list)>1 else 0)
+
+        with c2:
+            def get_radar_vals(name):
+                r = season_ranked[season_ranked['Display_Name'] == name].iloc[0]
+                return [r['Score_Prod'], r['Score_Eff'], r['Score_Def'], r['Score_TO'], r['Score_Team'], r['Score_Dura']], r['CN_Name']
+
+            vals1, n1 = get_radar_vals(p1)
+            vals2, n2 = get_radar_vals(p2)
+            cats = ['统治力', '进攻效率', '个人防守', '失误控制', '球队贡献', '出勤耐用']
+
+            fig = go.Figure()
+            fig.add_trace(go.Scatterpolar(r=vals1, theta=cats, fill='toself', name=n1))
+            fig.add_trace(go.Scatterpolar(r=vals2, theta=cats, fill='toself', name=n2))
+            fig.update_layout(polar=dict(radialaxis=dict(visible=True, range=[0, 100])), title="六维能力模型对比", height=500)
+            st.plotly_chart(fig, use_container_width=True)
+
+    with main_tab3:
+        st.subheader("数据监控室")
+        st.markdown(f"统计范围: **{date_from_str if date_from_str else '赛季至今'}** 至 **{date_to_str if date_to_str else '今'}**")
+
+        # 增加 Rank (排名) 和 Pick (顺位)
+        cols = ['Rank', 'Pick', 'Display_Name', 'Pos_Display', 'Final_Score', 
+                'Score_Dura',
+                'Score_Prod', 'Score_Eff', 'Score_Def', 'Score_TO', 'Score_Team',
+                'GP', 'MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TOV', 'PLUS_MINUS',
+                'FG_PCT', 'FG3_PCT', 'FT_PCT',
+                'USG_PCT', 'PCT_UAST_FGM', 'TS_PCT']
+
+        show_df = season_ranked[cols].rename(columns={
+            'Rank': '排名', 'Pick': '顺位',
+            'Display_Name': '球员', 'Pos_Display': '位置', 'Final_Score': '总分',
+            'Score_Dura': '出勤分',
+            'Score_Prod': '统治', 'Score_Eff': '效率', 'Score_Def': '防守', 'Score_TO': '控失', 'Score_Team': '贡献',
+            'GP': '场次', 'MIN': '时间', 'PTS': '得分', 'REB': '篮板', 'AST': '助攻', 'STL': '抢断', 'BLK': '盖帽', 'TOV': '失误', 'PLUS_MINUS': '正负值',
+            'FG_PCT': '投篮%', 'FG3_PCT': '三分%', 'FT_PCT': '罚球%',
+            'USG_PCT': '球权%', 'PCT_UAST_FGM': '非助攻%', 'TS_PCT': '真命%'
+        })
+
+        st.dataframe(
+            show_df,
+            column_config={
+                "排名": st.column_config.NumberColumn("排名", format="#%d"),
+                "顺位": st.column_config.NumberColumn("顺位", format="#%d"),
+                "总分": st.column_config.ProgressColumn("总分", format="%.1f", min_value=0, max_value=100),
+                "出勤分": st.column_config.NumberColumn("出勤分", format="%.1f"),
+                "场次": st.column_config.NumberColumn("场次", format="%d"),
+                "时间": st.column_config.NumberColumn("时间", format="%.1f"),
+                "真命%": st.column_config.NumberColumn("真实命中%", format="%.1%"),
+                "投篮%": st.column_config.NumberColumn("投篮%", format="%.1%"),
+                "三分%": st.column_config.NumberColumn("三分%", format="%.1%"),
+                "罚球%": st.column_config.NumberColumn("罚球%", format="%.1%"),
+                "球权%": st.column_config.NumberColumn("使用率%", format="%.1%"),
+                "非助攻%": st.column_config.NumberColumn("非受助攻%", format="%.1%"),
+                "正负值": st.column_config.NumberColumn("正负值", format="%+.1f"),
+                "得分": st.column_config.NumberColumn("得分", format="%.1f"),
+                "篮板": st.column_config.NumberColumn("篮板", format="%.1f"),
+                "助攻": st.column_config.NumberColumn("助攻", format="%.1f"),
+                "抢断": st.column_config.NumberColumn("抢断", format="%.1f"),
+                "盖帽": st.column_config.NumberColumn("盖帽", format="%.1f"),
+                "失误": st.column_config.NumberColumn("失误", format="%.1f"),
+            },
+            use_container_width=True,
+            hide_index=True,
+            height=800
+        )
+
+render_rankings(season_board)
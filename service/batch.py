@@ -0,0 +1,195 @@
+import json
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from data.fetcher import NBADataFetcher
+from logic.calculator import calculate_sub_scores_frame, calculate_ovr_frame, get_tier_badges
+
+SUB_SCORE_COLS = ["Scoring", "Playmaking", "Shooting", "Rebounding", "Defense", "Isolation", "Clutch"]
+STAT_COLS = ["GP", "MIN", "PTS", "TS_PCT", "AST_PCT", "AST_TO", "REB_PCT", "THREE_PCT", "THREE_PM",
+             "STL_PCT", "BLK_PCT", "INSUFFICIENT"]
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+def read_names(path: Path) -> List[str]:
+    seen = set()
+    names = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        name = line.split("#", 1)[0].strip()
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+def write_output(df: pd.DataFrame, path: Path, table: str = "batch_ratings"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    elif suffix == ".parquet":
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError as e:
+            raise RuntimeError(f"写入 Parquet 需要 pyarrow 或 fastparquet: {e}")
+    elif suffix in SQLITE_SUFFIXES:
+        conn = sqlite3.connect(str(path))
+        try:
+            df.to_sql(table, conn, if_exists="append", index=False)
+        finally:
+            conn.close()
+    else:
+        raise ValueError(f"不支持的输出格式: {path.suffix} (可选 .csv / .parquet / .db)")
+
+class CheckpointMismatch(ValueError):
+    pass
+
+class Checkpoint:
+    """追加写入的 JSONL 断点文件：每完成一批就落盘，崩溃后可从断点续跑。
+
+    首行记录本次运行的配置 (原型、滑块、赛季)，配置不一致的断点拒绝续跑，避免混入不同口径的结果。
+    """
+
+    def __init__(self, path: Path, config: Optional[Dict] = None):
+        self.path = path
+        self.config = config
+        self._lock = threading.Lock()
+
+    def _header(self) -> Dict:
+        return {"__config__": json.loads(json.dumps(self.config, ensure_ascii=False, default=str))}
+
+    def load(self) -> List[Dict]:
+        if not self.path.exists():
+            return []
+        rows, header = [], None
+        for i, line in enumerate(self.path.read_text(encoding="utf-8").splitlines()):
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # 最后一行可能在崩溃时只写了一半
+                continue
+            if i == 0 and isinstance(row, dict) and "__config__" in row:
+                header = row
+                continue
+            rows.append(row)
+        if self.config is not None and rows and header != self._header():
+            found = header["__config__"] if header else "未记录"
+            raise CheckpointMismatch(f"断点文件 {self.path} 的运行配置与本次不一致 ({found})，"
+                             f"请删除该文件或用 --checkpoint 指定新的断点文件")
+        return rows
+
+    def append(self, rows: List[Dict]):
+        with self._lock:
+            new_file = not self.path.exists() or self.path.stat().st_size == 0
+            with self.path.open("a", encoding="utf-8") as f:
+                if new_file and self.config is not None:
+                    f.write(json.dumps(self._header(), ensure_ascii=False) + "\n")
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+
+    def remove(self):
+        if self.path.exists():
+            self.path.unlink()
+
+class BatchRater:
+    def __init__(self, archetype: str, sliders: Dict, season: Optional[str] = None, workers: int = 4,
+                 chunk_size: int = 50):
+        self.fetcher = NBADataFetcher()
+        self.archetype = archetype
+        self.sliders = sliders
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        if season:
+            self.seasons = [season]
+        else:
+            self.seasons = [self.fetcher._season_str(), self.fetcher._prev_season_str()]
+        self.tables: Dict[str, pd.DataFrame] = {}
+
+    @property
+    def config(self) -> Dict:
+        """决定评级结果的全部参数，写入断点首行"""
+        return {"archetype": self.archetype, "sliders": dict(sorted(self.sliders.items())), "seasons": self.seasons}
+
+    def load_tables(self):
+        # 每个赛季的联盟总表只下载一次，所有球员共用
+        jobs = [(season, measure) for season in self.seasons for measure in ("Base", "Advanced")]
+        raw = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetcher._league_table, m, s): (s, m) for s, m in jobs}
+            for fut in as_completed(futures):
+                season, measure = futures[fut]
+                try:
+                    raw[(season, measure)] = fut.result()
+                except Exception as e:
+                    print(f"[rate] 下载 {season} {measure} 失败: {e}", file=sys.stderr, flush=True)
+        for season in self.seasons:
+            base = raw.get((season, "Base"))
+            adv = raw.get((season, "Advanced"), pd.DataFrame())
+            if base is None or base.empty:
+                continue
+            clean = self.fetcher._clean_frame(base, adv)
+            self.tables[season] = clean.drop_duplicates("PLAYER_ID").set_index("PLAYER_ID", drop=False)
+        if not self.tables:
+            raise RuntimeError("所有赛季的联盟数据均获取失败")
+
+    def score_chunk(self, names: List[str], resolved: Dict[str, Optional[int]]) -> List[Dict]:
+        rated_at = datetime.now().isoformat(timespec="seconds")
+        found, rows = [], []
+        for name in names:
+            pid = resolved.get(name)
+            season = next((s for s in self.seasons if s in self.tables and pid in self.tables[s].index), None)
+            if pid is None:
+                rows.append({"INPUT_NAME": name, "STATUS": "not_found", "RATED_AT": rated_at})
+            elif season is None:
+                rows.append({"INPUT_NAME": name, "PLAYER_ID": pid, "STATUS": "no_stats", "RATED_AT": rated_at})
+            else:
+                found.append((name, pid, season))
+        for season in self.seasons:
+            group = [(n, pid) for n, pid, s in found if s == season]
+            if not group:
+                continue
+            stats = self.tables[season].loc[[pid for _, pid in group]].reset_index(drop=True)
+            subs = calculate_sub_scores_frame(stats, self.archetype, self.sliders)
+            ovr = calculate_ovr_frame(subs, self.archetype)
+            out = pd.concat([stats[["PLAYER_ID", "PLAYER_NAME"] + STAT_COLS], subs], axis=1)
+            out.insert(0, "INPUT_NAME", [n for n, _ in group])
+            out["OVR"] = ovr
+            out["TIER"] = get_tier_badges(ovr)
+            out["SEASON"] = season
+            out["ARCHETYPE"] = self.archetype
+            out["STATUS"] = "ok"
+            out["RATED_AT"] = rated_at
+            rows.extend(json.loads(out.to_json(orient="records", force_ascii=False)))
+        return rows
+
+    def run(self, names: List[str], checkpoint: Checkpoint) -> pd.DataFrame:
+        done = checkpoint.load()
+        done_names = {r.get("INPUT_NAME") for r in done}
+        pending = [n for n in names if n not in done_names]
+        total = len(names)
+        completed = total - len(pending)
+        if done:
+            print(f"[rate] 从断点恢复: 已完成 {completed}/{total}", file=sys.stderr, flush=True)
+        if pending:
+            self.load_tables()
+            resolved = self.fetcher.resolve_players(pending)
+            chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(self.score_chunk, chunk, resolved) for chunk in chunks]
+                for fut in as_completed(futures):
+                    rows = fut.result()
+                    checkpoint.append(rows)
+                    done.extend(rows)
+                    completed += len(rows)
+                    print(f"[rate] {completed}/{total} ({completed / total:.0%})", file=sys.stderr, flush=True)
+        order = {n: i for i, n in enumerate(names)}
+        df = pd.DataFrame(done)
+        if df.empty:
+            return df
+        df = df[df["INPUT_NAME"].isin(order)]
+        return df.sort_values("INPUT_NAME", key=lambda s: s.map(order)).reset_index(drop=True)
@@ -0,0 +1,239 @@
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from config.settings import ARCHETYPES
+from data.cache import TTLCache
+from data.database import init_db, save_rating, get_player_history, get_leaderboard
+from data.fetcher import run_data_pipeline
+from data.nba_client import request_stats
+from data.ratelimit import limiter_stats
+from logic.calculator import rate_player
+
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH_SIZE = 100
+SLIDER_KEYS = ("isolation", "def_eye_test", "clutch")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class RatingService:
+    def __init__(self, workers: int = 8, queue_limit: int = 256, offline: bool = False, ttl: float = 3600):
+        # 有界线程池执行阻塞的抓取/计算/写库，信号量限制排队中的任务数
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rater")
+        self.slots = asyncio.Semaphore(queue_limit)
+        self.pipelines = TTLCache(ttl=ttl, maxsize=4096)
+        self.offline = offline
+
+    def _load(self, name: str) -> Dict:
+        # 按球员名合并：同一名字的并发请求只跑一次 pipeline，其余等待并共享结果
+        return self.pipelines.get_or_load(name, lambda: run_data_pipeline(name, offline=self.offline))
+
+    def rate(self, payload: Dict) -> Dict:
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "payload must be an object")
+        name = str(payload.get("name") or "").strip()
+        if not name:
+            raise HTTPError(400, "name is required")
+        archetype = payload.get("archetype") or ARCHETYPES[0]
+        if archetype not in ARCHETYPES:
+            raise HTTPError(400, f"unknown archetype: {archetype}")
+        raw_sliders = payload.get("sliders") or {}
+        try:
+            sliders = {k: int(raw_sliders.get(k, 75)) for k in SLIDER_KEYS}
+        except (TypeError, ValueError, AttributeError):
+            raise HTTPError(400, "sliders must be integers")
+        data = self._load(name)
+        result = rate_player(data["stats"], archetype, sliders)
+        if payload.get("save", True):
+            save_rating(name, archetype, result["ovr"], result["sub_scores"])
+        return {
+            "name": name,
+            "archetype": archetype,
+            "source": data["source"],
+            "reason": data.get("reason"),
+            "stats": data["stats"],
+            **result,
+        }
+
+    def history(self, name: str, limit: int) -> Dict:
+        rows = get_player_history(name, limit=limit)
+        return {"name": name, "history": [{"ovr": r[0], "created_at": r[1]} for r in rows]}
+
+    def leaderboard(self, limit: int, archetype: Optional[str]) -> Dict:
+        rows = get_leaderboard(limit=limit, archetype=archetype)
+        return {"leaderboard": [
+            {"name": r[0], "archetype": r[1], "ovr": r[2], "created_at": r[3]} for r in rows
+        ]}
+
+    async def run(self, fn, *args):
+        async with self.slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def rate_batch(self, payload: Dict) -> Dict:
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "payload must be an object")
+        items = payload.get("players")
+        if not isinstance(items, list) or not items:
+            raise HTTPError(400, "players must be a non-empty list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise HTTPError(413, f"at most {MAX_BATCH_SIZE} players per batch")
+        defaults = {k: payload[k] for k in ("archetype", "sliders", "save") if k in payload}
+        jobs = []
+        for item in items:
+            job = dict(defaults)
+            job.update(item if isinstance(item, dict) else {"name": item})
+            jobs.append(job)
+
+        async def one(job):
+            try:
+                return await self.run(self.rate, job)
+            except HTTPError as e:
+                return {"name": job.get("name"), "error": e.message}
+            except Exception as e:
+                return {"name": job.get("name"), "error": str(e)}
+
+        results = await asyncio.gather(*(one(j) for j in jobs))
+        return {"results": results}
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/") or "/"
+        routes = {
+            "/health": "GET",
+            "/rate": "POST",
+            "/rate/batch": "POST",
+            "/history": "GET",
+            "/leaderboard": "GET",
+        }
+        if path not in routes:
+            raise HTTPError(404, f"no route for {path}")
+        if method != routes[path]:
+            raise HTTPError(405, f"{path} expects {routes[path]}")
+
+        if path == "/health":
+            return 200, {"status": "ok", "cache": self.pipelines.stats(),
+                         "upstream": request_stats(), "limiters": limiter_stats()}
+        if path in ("/history", "/leaderboard"):
+            try:
+                limit = int(query.get("limit", 15 if path == "/history" else 20))
+            except ValueError:
+                raise HTTPError(400, "limit must be an integer")
+            if path == "/history":
+                name = query.get("name", "").strip()
+                if not name:
+                    raise HTTPError(400, "name is required")
+                return 200, await self.run(self.history, name, limit)
+            return 200, await self.run(self.leaderboard, limit, query.get("archetype"))
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body must be valid JSON")
+        if path == "/rate":
+            return 200, await self.run(self.rate, payload)
+        return 200, await self.rate_batch(payload)
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3:
+            raise HTTPError(400, "malformed request line")
+        method, target, version = parts
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = h.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise HTTPError(400, "invalid content-length")
+        if length < 0:
+            raise HTTPError(400, "invalid content-length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        conn = headers.get("connection", "").lower()
+        keep_alive = conn == "keep-alive" if version == "HTTP/1.0" else conn != "close"
+        return method.upper(), target, body, keep_alive
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, payload: Dict, keep_alive: bool):
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, body, keep_alive = request
+                    status, payload = await self.dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                self._write(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(host: str, port: int, workers: int, queue_limit: int, offline: bool):
+    service = RatingService(workers=workers, queue_limit=queue_limit, offline=offline)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"NBA Player Rater API 已启动: http://{host}:{port} (workers={workers}, offline={offline})")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="NBA Player Rater 无界面 JSON 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="后台线程池大小")
+    parser.add_argument("--queue-limit", type=int, default=256, help="同时排队的最大任务数")
+    parser.add_argument("--offline", action="store_true", help="使用本地模拟数据代替 NBA API (压测用)")
+    args = parser.parse_args()
+    init_db()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue_limit, args.offline))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-import requests
-from io import BytesIO
-from PIL import Image
-from nba_api.stats.endpoints import leaguedashteamstats
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.logos import get_logo_cache
+from data.store import get_store
 
 # ===========================
 # --- 全局配置区域 ---
 # ===========================
 SEASON = '2025-26'  # 设置赛季
+OUTPUT_DIR = Path(ROOT) / 'charts'  # 图表输出目录
+DEFAULT_METRICS = ['NET_RATING', 'OFF_RATING', 'DEF_RATING']
 
 # 定义绘图风格
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -42,40 +53,51 @@ METRICS_CONFIG = {
     }
 }
 
-# Logo 映射修正 (处理少数 API 缩写与 ESPN 图源不一致的情况)
-LOGO_MAPPING = {
-    'UTA': 'uth', 'NOP': 'no', 'NYK': 'ny', 'GSW': 'gs', 'SAS': 'sa'
-}
-
-
 # ===========================
 # 1. 数据获取与处理函数 (通用版)
 # ===========================
-def get_team_data(metric_config, season=SEASON):
+def metric_config_for(metric_key, lower_is_better=False):
     """
-    根据传入的指标配置，获取数据并计算排名坐标
+    取指标配置；不在 METRICS_CONFIG 中的列 (用户自定义指标) 按列名生成默认配置
     """
-    target_col = metric_config['col_name']
-    sort_order_asc = metric_config['ascending_sort']
+    if metric_key in METRICS_CONFIG:
+        return METRICS_CONFIG[metric_key]
+    return {
+        'col_name': metric_key,
+        'title': f'NBA 球队 {metric_key}',
+        'ylabel': f"{metric_key} ({'越低越好' if lower_is_better else '越高越好'})",
+        'invert_y': lower_is_better,
+        'ascending_sort': lower_is_better
+    }
 
-    print(f"正在抓取 {season} 赛季数据，目标指标: {target_col}...")
 
-    # 获取联盟球队高阶数据
-    # 注意：为了效率，我们一次性抓取所有数据，在内存中筛选
+def load_league_table(season=SEASON):
+    """
+    联盟球队高阶总表：一个赛季只请求一次，所有指标都从这张表派生
+    """
+    print(f"正在抓取 {season} 赛季联盟球队高阶数据...")
     try:
-        stats = leaguedashteamstats.LeagueDashTeamStats(
-            season=season,
-            measure_type_nullable_default='Advanced',
-            per_mode_detailed='PerGame',
-            timeout=10  # 设置超时防止卡住
-        )
-        df = stats.get_data_frames()[0]
+        return get_store().team_stats(season, 'Advanced', 'PerGame')
     except Exception as e:
         print(f"Error fetching data from NBA API: {e}")
         return pd.DataFrame()
 
+
+def rank_metric(table, metric_config):
+    """
+    从联盟总表中取出单个指标并计算排名坐标 (不修改传入的共享表)
+    """
+    target_col = metric_config['col_name']
+    sort_order_asc = metric_config['ascending_sort']
+
+    if table.empty:
+        return pd.DataFrame()
+    if target_col not in table.columns:
+        print(f"Warning: 联盟总表中没有 {target_col} 列，跳过。")
+        return pd.DataFrame()
+
     # 只选取需要的列
-    df_filtered = df[['TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', target_col]].copy()
+    df_filtered = table[['TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', target_col]].reset_index(drop=True)
 
     # --- 核心逻辑：动态排序 ---
     # 根据配置决定是升序还是降序排列，以确定谁是第一名
@@ -90,56 +112,57 @@ def get_team_data(metric_config, season=SEASON):
     return df_sorted
 
 
+def get_team_data(metric_config, season=SEASON, table=None):
+    """
+    根据传入的指标配置，获取数据并计算排名坐标；已有联盟总表时直接传入 table，不再请求
+    """
+    print(f"正在整理 {season} 赛季数据，目标指标: {metric_config['col_name']}...")
+    if table is None:
+        table = load_league_table(season)
+    return rank_metric(table, metric_config)
+
+
+def build_metric_frames(season=SEASON, metrics=DEFAULT_METRICS, lower_is_better=()):
+    """
+    一次抓取联盟总表，派生出所有指标的排名数据: {metric_key: (config, df)}
+    """
+    table = load_league_table(season)
+    frames = {}
+    for metric_key in dict.fromkeys(metrics):
+        config = metric_config_for(metric_key, metric_key in lower_is_better)
+        frames[metric_key] = (config, rank_metric(table, config))
+    return frames
+
+
 # ===========================
-# 2. Logo 处理辅助函数 (保持不变)
+# 2. Logo 处理辅助函数
 # ===========================
 def get_team_logo_imagebox(abbreviation, zoom=0.1):
-    abbr_for_url = LOGO_MAPPING.get(abbreviation, abbreviation.lower())
-    url = f"https://a.espncdn.com/i/teamlogos/nba/500/{abbr_for_url}.png"
-    try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        return OffsetImage(img, zoom=zoom)
-    except Exception as e:
+    # Logo 来自本地内容寻址缓存 (data.logos)，每张图只下载、解码一次
+    img = get_logo_cache().image(abbreviation)
+    if img is None:
         print(f"Warning: 无法加载 {abbreviation} 的 Logo. 使用默认点代替。")
         return None
+    return OffsetImage(img, zoom=zoom)
 
 
 # ===========================
 # 3. 主绘图函数 (通用版)
 # ===========================
-def create_logo_scatter_plot(df, metric_config, season=SEASON):
+def draw_logo_scatter(fig, ax, df, metric_config, season=SEASON):
     """
-    根据传入的数据和指标配置绘制图表
+    在给定的 Figure/Axes 上绘制 Logo 散点图 (只用面向对象接口，不依赖 pyplot 的全局状态)
     """
     col_name = metric_config['col_name']
     title_text = metric_config['title']
     ylabel_text = metric_config['ylabel']
     do_invert_y = metric_config['invert_y']
 
-    if df.empty:
-        print("数据为空，跳过绘图。")
-        return
-
-    fig, ax = plt.subplots(figsize=(14, 9))
-
-    print(f"开始绘制【{title_text}】，正在嵌入 Logo (预计耗时 20-30秒)...")
+    # 缺失的 Logo 先并发下载到本地缓存，缓存命中时不产生任何网络请求
+    get_logo_cache().prefetch(df['TEAM_ABBREVIATION'])
 
     # --- 核心循环：放置 Logo ---
-    # 使用 iterrows 前先保存 Logo 对象以减少重复下载 (进阶优化，暂不实现以保持代码简单)
-    # 这里简化处理，直接循环
-    points_x = []
-    points_y = []
-
-    for index, row in df.iterrows():
-        abbrev = row['TEAM_ABBREVIATION']
-        x_pos = row['X_Pos']
-        y_val = row[col_name]
-
-        points_x.append(x_pos)
-        points_y.append(y_val)
-
+    for abbrev, x_pos, y_val in zip(df['TEAM_ABBREVIATION'], df['X_Pos'], df[col_name]):
         # 获取图片对象，zoom 控制 Logo 大小 (0.09 比较适中)
         imagebox = get_team_logo_imagebox(abbrev, zoom=0.09)
 
@@ -171,7 +194,7 @@ def create_logo_scatter_plot(df, metric_config, season=SEASON):
     ax.set_xticks([])
 
     # 设置标题和标签
-    plt.title(f"{title_text} [{season}]", fontsize=18, fontweight='bold', pad=20)
+    ax.set_title(f"{title_text} [{season}]", fontsize=18, fontweight='bold', pad=20)
     ax.set_ylabel(ylabel_text, fontsize=13, labelpad=15)
 
     # 自定义网格线
@@ -187,32 +210,99 @@ def create_logo_scatter_plot(df, metric_config, season=SEASON):
     ax.spines['right'].set_visible(False)
 
     # 添加来源说明
-    plt.figtext(0.1, 0.03, 'Data Source: NBA API (stats.nba.com)', fontsize=9, color='gray')
-    plt.figtext(0.9, 0.03, 'Visualization by Python Matplotlib', fontsize=9, color='gray', ha='right')
+    fig.text(0.1, 0.03, 'Data Source: NBA API (stats.nba.com)', fontsize=9, color='gray')
+    fig.text(0.9, 0.03, 'Visualization by Python Matplotlib', fontsize=9, color='gray', ha='right')
 
-    plt.tight_layout()
+    fig.tight_layout()
     # 调整底部边距以防止文字被遮挡
-    plt.subplots_adjust(bottom=0.1)
-    print(f"【{title_text}】绘制完成！请查看弹出的窗口。")
-    plt.show()
+    fig.subplots_adjust(bottom=0.1)
 
 
-# ===========================
-# 4. 主执行逻辑
-# ===========================
-if __name__ == "__main__":
-    # 定义要生成的图表列表
-    metrics_to_plot = ['NET_RATING', 'OFF_RATING', 'DEF_RATING']
+def create_logo_scatter_plot(df, metric_config, season=SEASON, output=None):
+    """
+    根据传入的数据和指标配置绘制图表；指定 output 时用 Agg 画布直接写文件 (无界面)，否则弹窗显示
+    """
+    title_text = metric_config['title']
 
-    # 循环生成每一张图
-    for metric_key in metrics_to_plot:
-        print(f"\n{'=' * 30}\n准备生成: {metric_key}\n{'=' * 30}")
+    if df.empty:
+        print("数据为空，跳过绘图。")
+        return None
+
+    print(f"开始绘制【{title_text}】，正在嵌入 Logo...")
+    if output is None:
+        fig, ax = plt.subplots(figsize=(14, 9))
+        draw_logo_scatter(fig, ax, df, metric_config, season)
+        print(f"【{title_text}】绘制完成！请查看弹出的窗口。")
+        plt.show()
+        return None
+
+    # 独立的 Figure + Agg 画布：不注册到 pyplot，可在多个进程中同时渲染
+    fig = Figure(figsize=(14, 9))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    draw_logo_scatter(fig, ax, df, metric_config, season)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output, dpi=150)
+    print(f"【{title_text}】已保存 -> {output}")
+    return output
+
+
+def _render_chart(job):
+    # 进程池任务：(df, config, season, output)，必须定义在模块顶层才能被 pickle
+    df, config, season, output = job
+    return create_logo_scatter_plot(df, config, season, output=output)
 
-        # 1. 获取当前指标的配置
-        config = METRICS_CONFIG[metric_key]
 
-        # 2. 获取并处理数据
-        df_metric = get_team_data(config, SEASON)
+def render_season(season=SEASON, metrics=DEFAULT_METRICS, out_dir=OUTPUT_DIR, workers=4, lower_is_better=()):
+    """
+    单赛季全部指标图：联盟总表只抓一次，Logo 统一预热到磁盘缓存，各图在进程池中并行渲染
+    """
+    frames = build_metric_frames(season, metrics, lower_is_better)
+    jobs = [(df, config, season, Path(out_dir) / f"{season}_{metric_key}.png")
+            for metric_key, (config, df) in frames.items() if not df.empty]
+    if not jobs:
+        print("数据为空，没有可绘制的图表。")
+        return []
+
+    # 子进程各自读取本地 Logo 缓存，先在主进程里把缺失的 Logo 下载好，避免重复下载
+    get_logo_cache().prefetch(pd.concat([df['TEAM_ABBREVIATION'] for df, *_ in jobs]))
+
+    if workers <= 1 or len(jobs) == 1:
+        outputs = [_render_chart(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            outputs = list(pool.map(_render_chart, jobs))
+    return [p for p in outputs if p is not None]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="NBA 球队指标排名 Logo 图 (联盟总表只抓一次，多图并行输出)")
+    parser.add_argument("--season", default=SEASON, help="赛季，如 2025-26")
+    parser.add_argument("--metrics", nargs="+", default=DEFAULT_METRICS,
+                        help="要绘制的指标；可填联盟高阶表中的任意列 (如 PACE TS_PCT)")
+    parser.add_argument("--lower-is-better", nargs="*", default=[],
+                        help="自定义指标中数值越低越好的列 (反转 Y 轴、升序排名)")
+    parser.add_argument("--out-dir", default=str(OUTPUT_DIR), help="图片输出目录")
+    parser.add_argument("--workers", type=int, default=4, help="并行渲染的进程数")
+    parser.add_argument("--show", action="store_true", help="逐张弹窗显示，不写文件")
+    return parser
 
-        # 3. 绘图
-        create_logo_scatter_plot(df_metric, config, SEASON)
\ No newline at end of file
+
+# ===========================
+# 4. 主执行逻辑
+# ===========================
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+
+    if args.show:
+        # 交互模式：仍然只抓一次联盟总表，逐张弹窗
+        for metric_key, (config, df_metric) in build_metric_frames(
+                args.season, args.metrics, args.lower_is_better).items():
+            print(f"\n{'=' * 30}\n准备生成: {metric_key}\n{'=' * 30}")
+            create_logo_scatter_plot(df_metric, config, args.season)
+    else:
+        # 无界面模式：Agg 后端，全部写入文件
+        plt.switch_backend('Agg')
+        paths = render_season(args.season, args.metrics, Path(args.out_dir), args.workers, args.lower_is_better)
+        print(f"\n>>> 共输出 {len(paths)} 张图 -> {args.out_dir}")
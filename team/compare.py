@@ -1,17 +1,26 @@
+import sys
+from pathlib import Path
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
-import time
 
 # NBA API Endpoints (Team Specific)
-from nba_api.stats.endpoints import (
-    TeamDashboardByGeneralSplits,
-    SynergyPlayTypes,
-    TeamDashboardByShootingSplits
-)
-from nba_api.stats.static import teams
+from nba_api.stats.static import players, teams
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.lineups import GROUP_SIZES, get_lineup_store
+from data.store import get_store
+from data.synergy import current_season, get_synergy_store
+from data.team_archive import get_team_archive
+from data.team_shooting import get_team_shooting_store
+from logic.shot_zones import summary as zone_summary, zone_profile
+from logic.team_form import CHANGE_METRICS, ROLLING_WINDOWS, TeamFormEngine
 
 # ==========================================
 # 1. 全局配置与 CSS (Phase 1: UI/UX)
@@ -62,6 +71,18 @@ st.markdown("""
 # ==========================================
 # 2. 数据引擎 (Phase 1 & 2: Data Logic)
 # ==========================================
+TEAM_SYNERGY_TYPES = {
+    "Isolation": "Isolation",
+    "P&R Handler": "PRBallHandler",
+    "Post-Up": "Postup",
+    "Spot-Up": "Spotup",
+    "Transition": "Transition",
+    "Cut": "Cut"
+}
+# 两支球队 × (Base/Advanced/6 种战术/Shooting) = 18 个任务，整体仍受全局限速器约束
+TEAM_PROFILE_WORKERS = 18
+
+
 class NBATeamDataEngine:
     def __init__(self):
         pass
@@ -81,125 +102,81 @@ class NBATeamDataEngine:
             return f"{s[:4]}-{s[-2:]}"
         return s
 
-    def fetch_general_splits(self, team_id, season, date_from="", date_to="", last_n=0):
-        """获取基础(Base)和高阶(Advanced)数据"""
-        try:
-            time.sleep(0.3)
-            # 1. Base Stats
-            base = TeamDashboardByGeneralSplits(
-                team_id=team_id, season=season,
-                date_from_nullable=date_from, date_to_nullable=date_to,
-                last_n_games=last_n, measure_type_detailed_defense='Base',
-                month=0, season_type_all_star='Regular Season'
-            ).get_data_frames()[0]
-
-            # 2. Advanced Stats
-            adv = TeamDashboardByGeneralSplits(
-                team_id=team_id, season=season,
-                date_from_nullable=date_from, date_to_nullable=date_to,
-                last_n_games=last_n, measure_type_detailed_defense='Advanced',
-                month=0, season_type_all_star='Regular Season'
-            ).get_data_frames()[0]
-
-            if base.empty or adv.empty: return None
-
-            b_row = base.iloc[0]
-            a_row = adv.iloc[0]
-
-            # 手动计算 POSS (Pace * MIN / 48)
-            # 注意: 这里 MIN 是总分钟数，需要除以 GP 得到场均，或者直接用 Pace 估算总回合
-            # 更简单的逻辑：直接读取 Pace，后续展示 Pace。对于累积数据归一化，使用 FGA等估算
-            pace = a_row['PACE']
-
-            return {
-                "GP": b_row['GP'], "W": b_row['W'], "L": b_row['L'],
-                "W_PCT": b_row['W_PCT'], "PTS": b_row['PTS'],
-                "PLUS_MINUS": b_row['PLUS_MINUS'],
-                "PACE": pace,
-                "OFF_RATING": a_row['OFF_RATING'],
-                "DEF_RATING": a_row['DEF_RATING'],
-                "NET_RATING": a_row['NET_RATING'],
-                "AST_PCT": a_row['AST_PCT'], "AST_TO": a_row['AST_TO'],
-                "TM_TOV_PCT": a_row['TM_TOV_PCT'], "EFG_PCT": a_row['EFG_PCT'],
-                "TS_PCT": a_row['TS_PCT'], "OREB_PCT": a_row['OREB_PCT']
-            }
-        except Exception as e:
-            print(f"General Splits Error: {e}")
+    def fetch_dashboard(self, team_id, season, measure, date_from="", date_to="", last_n=0):
+        """某支球队的整体一行：取自全联盟 LeagueDashTeamStats (每个赛季/口径/日期窗口只下载一次)"""
+        return get_store().team_row(team_id, season, measure, 'PerGame', date_from, date_to, last_n)
+
+    def merge_general(self, base, adv):
+        if base is None or adv is None or base.empty or adv.empty:
             return None
 
-    def fetch_synergy(self, team_id, season):
-        """Phase 2: 获取战术风格 (Synergy)"""
-        if int(season[:4]) < 2015: return None  # Synergy 2015后才有
-
-        target_types = {
-            "Isolation": "Isolation",
-            "P&R Handler": "PRBallHandler",
-            "Post-Up": "Postup",
-            "Spot-Up": "Spotup",
-            "Transition": "Transition",
-            "Cut": "Cut"
+        b_row = base.iloc[0]
+        a_row = adv.iloc[0]
+
+        # 手动计算 POSS (Pace * MIN / 48)
+        # 注意: 这里 MIN 是总分钟数，需要除以 GP 得到场均，或者直接用 Pace 估算总回合
+        # 更简单的逻辑：直接读取 Pace，后续展示 Pace。对于累积数据归一化，使用 FGA等估算
+        pace = a_row['PACE']
+
+        return {
+            "GP": b_row['GP'], "W": b_row['W'], "L": b_row['L'],
+            "W_PCT": b_row['W_PCT'], "PTS": b_row['PTS'],
+            "PLUS_MINUS": b_row['PLUS_MINUS'],
+            "PACE": pace,
+            "OFF_RATING": a_row['OFF_RATING'],
+            "DEF_RATING": a_row['DEF_RATING'],
+            "NET_RATING": a_row['NET_RATING'],
+            "AST_PCT": a_row['AST_PCT'], "AST_TO": a_row['AST_TO'],
+            "TM_TOV_PCT": a_row['TM_TOV_PCT'], "EFG_PCT": a_row['EFG_PCT'],
+            "TS_PCT": a_row['TS_PCT'], "OREB_PCT": a_row['OREB_PCT']
+        }
+
+    def fetch_synergy_play_type(self, team_id, season, key):
+        """单个战术类型 (整赛季)，返回 {"Freq", "PPP"} 或 None"""
+        t_stats = get_synergy_store().lookup(season, key, team_id, who='T')  # T = Team
+        return self._synergy_entry(t_stats)
+
+    def _synergy_entry(self, t_stats):
+        if t_stats is None:
+            return None
+        # 自动适配列名
+        cols = t_stats.index
+        freq_col = 'POSS_PCT' if 'POSS_PCT' in cols else 'PERCENT_OF_POSS'
+        if freq_col not in cols:
+            return None
+        return {
+            "Freq": t_stats[freq_col],
+            "PPP": t_stats['PPP']
         }
-        results = {}
-        try:
-            for label, key in target_types.items():
-                time.sleep(0.4)
-                df = SynergyPlayTypes(
-                    player_or_team_abbreviation='T',  # T = Team
-                    play_type_nullable=key,
-                    season=season,
-                    type_grouping_nullable='offensive',
-                    per_mode_simple='PerGame',
-                    season_type_all_star='Regular Season'
-                ).get_data_frames()[0]
-
-                t_stats = df[df['TEAM_ID'] == team_id]
-                if not t_stats.empty:
-                    # 自动适配列名
-                    cols = t_stats.columns
-                    freq_col = 'POSS_PCT' if 'POSS_PCT' in cols else 'PERCENT_OF_POSS'
-                    if freq_col in cols:
-                        results[label] = {
-                            "Freq": t_stats[freq_col].values[0],
-                            "PPP": t_stats['PPP'].values[0]
-                        }
-        except Exception as e:
-            print(f"Synergy Error: {e}")
-        return results
 
     def fetch_shooting(self, team_id, season, date_from="", date_to="", last_n=0):
         """Phase 2: 获取投篮热区数据"""
         try:
-            time.sleep(0.3)
-            # 获取5ft范围的投篮分布
-            df = TeamDashboardByShootingSplits(
-                team_id=team_id, season=season,
-                date_from_nullable=date_from, date_to_nullable=date_to,
-                last_n_games=last_n, measure_type_detailed_defense='Base',
-                month=0, season_type_all_star='Regular Season'
-            ).get_data_frames()[1]  # Index 1 usually is 5ft Range
-
-            # 提取关键区域: Less Than 5 ft, 5-9 ft, 10-14 ft, 25-29 ft (Approx 3P)
-            res = {}
-            if not df.empty:
-                rim = df[df['GROUP_VALUE'] == 'Less Than 5 ft.']
-                mid = df[df['GROUP_VALUE'].isin(['10-14 ft.', '15-19 ft.'])]
-                three = df[df['GROUP_VALUE'].isin(['20-24 ft.', '25-29 ft.'])]
-
-                if not rim.empty:
-                    res["Rim FG%"] = rim['FG_PCT'].values[0]
-                    res["Rim Freq"] = rim['FG3A_FREQUENCY'].values[0] if 'FG3A_FREQUENCY' in df.columns else \
-                    rim['FGA_FREQUENCY'].values[0]
-
-                if not three.empty:
-                    # 简单的加权平均或取主要区间
-                    res["3P FG%"] = three['FG_PCT'].mean()
-                    res["3P Freq"] = three['FGA_FREQUENCY'].sum()
-            return res
+            # 整赛季且联盟区域画像已缓存/已归档时直接取表；否则只拉这一队，不为一支球队触发 30 队请求
+            if not date_from and not date_to and not last_n:
+                league = get_team_shooting_store().cached(season)
+                if league is not None:
+                    return zone_summary(league.loc[team_id]) if team_id in league.index else {}
+            # 切片：获取该队 5ft 范围的投篮分布
+            df = get_store().team_shooting_splits(team_id, season, date_from, date_to, last_n)
+            return self.summarize_shooting(df.assign(TEAM_ID=team_id))
         except:
             return {}
 
-    def get_full_profile(self, team_name, season, date_range=None, last_n=0):
-        """聚合所有数据"""
+    def summarize_shooting(self, df):
+        """距离分段 -> 区域命中率/出手占比：命中率按出手量加权，三分按 FG3M / FG3A 统计"""
+        if df is None or df.empty:
+            return {}
+        if 'TEAM_ID' not in df.columns:
+            df = df.assign(TEAM_ID=0)
+        profile = zone_profile(df)
+        return zone_summary(profile.iloc[0]) if not profile.empty else {}
+
+    def _submit_profile(self, pool, team_name, season, date_range=None, last_n=0, form=None):
+        """把一支球队的画像拆成互不依赖的请求任务，全部提交到线程池
+
+        传入 form (TeamFormEngine) 时基础/高阶数据直接由比赛日志前缀和得出，不再请求切片接口。
+        """
         season = self._format_season(season)
         tid = self.get_team_id(team_name)
         if not tid: return {"error": f"找不到球队: {team_name}"}
@@ -209,26 +186,125 @@ class NBATeamDataEngine:
             d_from = date_range[0].strftime("%m/%d/%Y")
             d_to = date_range[1].strftime("%m/%d/%Y")
 
-        # 1. Base & Adv
-        general = self.fetch_general_splits(tid, season, d_from, d_to, last_n)
-        if not general: return {"error": f"无法获取 {team_name} 数据"}
+        meta = {"name": team_name, "season": season, "id": tid}
+        # 整赛季的往季画像直接读本地归档 (python cli.py team-backfill)，不联网
+        if not date_range and not last_n and season != current_season():
+            archived = get_team_archive().team(tid, season)
+            if archived is not None:
+                return {"meta": meta, "archived": archived, "tasks": {}}
+
+        pending = {"meta": meta}
+        tasks = {
+            # 3. Shooting (切片)
+            "shooting": pool.submit(self.fetch_shooting, tid, season, d_from, d_to, last_n),
+        }
+        # 1. Base & Adv (支持切片)
+        if form is not None:
+            if date_range:
+                pending["form_general"] = form.date_range(date_range[0], date_range[1])
+            elif last_n:
+                pending["form_general"] = form.last_n(last_n)
+            else:
+                pending["form_general"] = form.season()
+        else:
+            tasks["base"] = pool.submit(self.fetch_dashboard, tid, season, 'Base', d_from, d_to, last_n)
+            tasks["adv"] = pool.submit(self.fetch_dashboard, tid, season, 'Advanced', d_from, d_to, last_n)
+        # 2. Synergy (整赛季，2015 后才有)
+        if int(season[:4]) >= 2015:
+            for label, key in TEAM_SYNERGY_TYPES.items():
+                tasks[("synergy", label)] = pool.submit(self.fetch_synergy_play_type, tid, season, key)
+        pending["tasks"] = tasks
+        return pending
+
+    def _assemble_profile(self, pending):
+        if "error" in pending:
+            return pending
+        meta, tasks = pending["meta"], pending["tasks"]
+
+        def result(key, default=None):
+            try:
+                return tasks[key].result()
+            except Exception as e:
+                print(f"Team Fetch Error ({key}): {e}")
+                return default
+
+        if "archived" in pending:
+            return self._archived_profile(meta, pending["archived"])
+
+        if "form_general" in pending:
+            general = pending["form_general"]
+        else:
+            general = self.merge_general(result("base"), result("adv"))
+        if not general: return {"error": f"无法获取 {meta['name']} 数据"}
+
+        # Synergy / Shooting 失败只影响对应板块，不影响基础数据
+        synergy = None
+        if any(isinstance(k, tuple) for k in tasks):
+            synergy = {}
+            for label in TEAM_SYNERGY_TYPES:
+                entry = result(("synergy", label))
+                if entry:
+                    synergy[label] = entry
+
+        return {
+            "meta": meta,
+            "general": general,
+            "synergy": synergy,
+            "shooting": result("shooting", {})
+        }
 
-        # 2. Synergy (整赛季)
-        synergy = self.fetch_synergy(tid, season)
+    def _archived_profile(self, meta, archived):
+        general = self.merge_general(archived["base"], archived["advanced"])
+        if not general: return {"error": f"无法获取 {meta['name']} 数据"}
 
-        # 3. Shooting (切片)
-        shooting = self.fetch_shooting(tid, season, d_from, d_to, last_n)
+        synergy = None
+        plays = archived["synergy"]
+        if not plays.empty:
+            synergy = {}
+            for label, key in TEAM_SYNERGY_TYPES.items():
+                entry = self._synergy_entry(plays.loc[key]) if key in plays.index else None
+                if entry:
+                    synergy[label] = entry
 
         return {
-            "meta": {"name": team_name, "season": season, "id": tid},
+            "meta": meta,
             "general": general,
             "synergy": synergy,
-            "shooting": shooting
+            "shooting": self.summarize_shooting(archived["shooting"])
         }
 
+    def get_profiles(self, requests):
+        """并发构建多个球队画像：requests 为 [(球队, 赛季, date_range, last_n[, form]), ...]
+
+        两支球队的全部请求同时提交，由 data.nba_client 的全局限速器控制间隔，
+        相同请求 (例如同赛季同战术类型的联盟表) 只会下载一次。
+        """
+        with ThreadPoolExecutor(max_workers=TEAM_PROFILE_WORKERS) as pool:
+            pending = [self._submit_profile(pool, *req) for req in requests]
+            return [self._assemble_profile(p) for p in pending]
+
+    def get_full_profile(self, team_name, season, date_range=None, last_n=0):
+        """聚合所有数据"""
+        return self.get_profiles([(team_name, season, date_range, last_n)])[0]
+
 
 engine = NBATeamDataEngine()
 
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_team_form(team_id, season):
+    """整季联盟球队日志只拉一次 (30 队共用)，之后任意切片/滚动/拐点都在内存里算"""
+    return TeamFormEngine(get_store().team_game_logs(season), team_id)
+
+
+def get_team_form(team_id, season):
+    form = load_team_form(team_id, season)
+    # 本赛季：整季联盟日志由 store 按 TTL 刷新 (所有球队、所有会话共用同一个缓存键)，
+    # 引擎只把最后一场之后的新比赛追加到前缀和末尾；正在读取的会话拿的是追加前的快照
+    if season == current_season():
+        form.append_games(get_store().team_game_logs(season))
+    return form
+
 # ==========================================
 # 3. 侧边栏控制 (Modes)
 # ==========================================
@@ -236,10 +312,13 @@ st.sidebar.title("🎮 球队对比控制台")
 mode = st.sidebar.selectbox("选择对比模式", [
     "A. 强强对话 (Head-to-Head)",
     "B. 历史纵向 (Historical Evolution)",
-    "C. 赛季切片 (Season Splits)"
+    "C. 赛季切片 (Season Splits)",
+    "D. 阵容查询 (Lineups)"
 ])
 
 t1_data, t2_data = None, None
+team_form = None
+lineup_result = None
 run_btn = False
 
 if mode == "A. 强强对话 (Head-to-Head)":
@@ -251,8 +330,7 @@ if mode == "A. 强强对话 (Head-to-Head)":
     if st.sidebar.button("开始对比"):
         run_btn = True
         with st.spinner("正在穿越时空拉取数据..."):
-            t1_data = engine.get_full_profile(t1_name, t1_sea)
-            t2_data = engine.get_full_profile(t2_name, t2_sea)
+            t1_data, t2_data = engine.get_profiles([(t1_name, t1_sea, None, 0), (t2_name, t2_sea, None, 0)])
 
 elif mode == "B. 历史纵向 (Historical Evolution)":
     t_name = st.sidebar.text_input("球队名称", "Boston Celtics")
@@ -262,8 +340,7 @@ elif mode == "B. 历史纵向 (Historical Evolution)":
     if st.sidebar.button("分析进化"):
         run_btn = True
         with st.spinner("正在分析建队历程..."):
-            t1_data = engine.get_full_profile(t_name, t1_sea)
-            t2_data = engine.get_full_profile(t_name, t2_sea)
+            t1_data, t2_data = engine.get_profiles([(t_name, t1_sea, None, 0), (t_name, t2_sea, None, 0)])
 
 elif mode == "C. 赛季切片 (Season Splits)":
     t_name = st.sidebar.text_input("球队名称", "Dallas Mavericks")
@@ -280,8 +357,40 @@ elif mode == "C. 赛季切片 (Season Splits)":
     if st.sidebar.button("执行切片分析"):
         run_btn = True
         with st.spinner("正在切割赛季..."):
-            t1_data = engine.get_full_profile(t_name, sea, date_range=d1_r)
-            t2_data = engine.get_full_profile(t_name, sea, date_range=d2_r)
+            form_tid = engine.get_team_id(t_name)
+            team_form = get_team_form(form_tid, engine._format_season(sea)) if form_tid else None
+            t1_data, t2_data = engine.get_profiles([(t_name, sea, d1_r, 0, team_form),
+                                                    (t_name, sea, d2_r, 0, team_form)])
+
+elif mode == "D. 阵容查询 (Lineups)":
+    sea = st.sidebar.text_input("赛季", "2023-24")
+    t_name = st.sidebar.text_input("球队 (留空 = 全联盟)", "Boston Celtics")
+    p_names = st.sidebar.text_input("必须同时在场的球员 (逗号分隔)", "Jayson Tatum, Jrue Holiday")
+    c1, c2 = st.sidebar.columns(2)
+    size = c1.selectbox("阵容人数", ["全部"] + list(GROUP_SIZES), index=0)
+    min_minutes = c2.number_input("最少分钟", min_value=0, value=100, step=25)
+    sort_by = st.sidebar.selectbox("排序指标", ["NET_RATING", "OFF_RATING", "DEF_RATING", "MIN", "PLUS_MINUS",
+                                              "TS_PCT", "PACE"])
+    if st.sidebar.button("查询阵容"):
+        with st.spinner("正在加载全联盟阵容索引..."):
+            pids, missing = [], []
+            for name in [n.strip() for n in p_names.split(",") if n.strip()]:
+                found = players.find_players_by_full_name(name)
+                if found:
+                    pids.append(found[0]['id'])
+                else:
+                    missing.append(name)
+            tid = engine.get_team_id(t_name) if t_name.strip() else None
+            if t_name.strip() and not tid:
+                missing.append(t_name)
+            if missing:
+                st.error(f"未找到: {', '.join(missing)}")
+            else:
+                # 防守效率越低越好，其余指标降序
+                lineup_result = get_lineup_store().query(
+                    engine._format_season(sea), players=pids, team_id=tid,
+                    size=None if size == "全部" else size, min_minutes=min_minutes,
+                    sort=sort_by, ascending=sort_by == "DEF_RATING")
 
 
 # ==========================================
@@ -311,6 +420,19 @@ def render_metric(label, v1, v2, suffix="", is_pct=False, reverse=False):
     """, unsafe_allow_html=True)
 
 
+if lineup_result is not None:
+    st.title("阵容查询 (Lineups)")
+    if lineup_result.empty:
+        st.info("没有满足条件的阵容")
+    else:
+        cols = ["GROUP_NAME", "TEAM_ABBREVIATION", "GROUP_SIZE", "GP", "MIN", "OFF_RATING", "DEF_RATING",
+                "NET_RATING", "PACE", "TS_PCT", "PLUS_MINUS"]
+        st.caption(f"共 {len(lineup_result)} 组阵容")
+        st.dataframe(lineup_result[cols].style.format({"MIN": "{:.0f}", "OFF_RATING": "{:.1f}", "DEF_RATING": "{:.1f}",
+                                                       "NET_RATING": "{:+.1f}", "PACE": "{:.1f}", "TS_PCT": "{:.3f}",
+                                                       "PLUS_MINUS": "{:+.0f}"}),
+                     hide_index=True, use_container_width=True)
+
 if run_btn:
     # 错误处理
     if t1_data and "error" in t1_data:
@@ -390,11 +512,58 @@ if run_btn:
                 # 简单表格
                 df_shoot = pd.DataFrame([
                     {"Zone": "篮下命中率 (Rim%)", "A": sh1.get("Rim FG%"), "B": sh2.get("Rim FG%")},
+                    {"Zone": "篮下出手占比 (Rim Freq)", "A": sh1.get("Rim Freq"), "B": sh2.get("Rim Freq")},
+                    {"Zone": "中距离命中率 (Mid%)", "A": sh1.get("Mid FG%"), "B": sh2.get("Mid FG%")},
                     {"Zone": "三分命中率 (3P%)", "A": sh1.get("3P FG%"), "B": sh2.get("3P FG%")},
                     {"Zone": "三分频率 (3P Freq)", "A": sh1.get("3P Freq"), "B": sh2.get("3P Freq")},
                 ])
                 st.dataframe(df_shoot, hide_index=True, use_container_width=True)
 
+                # 全联盟区域画像：折叠的 expander 内容也会执行，未缓存/未归档时需用户勾选后才拉取 30 队分段
+                with st.expander(f"{s2} 全联盟投篮区域"):
+                    league = get_team_shooting_store().cached(s2)
+                    if league is None and st.checkbox("加载全联盟投篮分段 (约 30 次请求)", key="league_shooting"):
+                        with st.spinner("正在拉取 30 队投篮分段..."):
+                            league = get_team_shooting_store().season(s2)
+                    if league is None:
+                        st.caption("本赛季联盟投篮区域尚未缓存，勾选上方选项后加载")
+                    elif league.empty:
+                        st.info("暂无该赛季的联盟投篮分段")
+                    else:
+                        abbr = {t['id']: t['abbreviation'] for t in teams.get_teams()}
+                        zone_cols = [c for c in league.columns if c.endswith(("_FG_PCT", "_FREQ"))] + ["FG3_PCT"]
+                        st.dataframe(league[zone_cols].rename(index=abbr).style.format("{:.3f}"),
+                                     use_container_width=True)
+
+        # --- Layer 5: 走势与拐点 (仅赛季切片：由球队比赛日志前缀和直接算出，不额外请求) ---
+        if team_form is not None and len(team_form):
+            st.markdown("---")
+            st.subheader("5. 走势与拐点 (Rolling & Change Points)")
+            fig_roll = go.Figure()
+            for w in ROLLING_WINDOWS:
+                rdf = team_form.rolling(w)
+                fig_roll.add_trace(go.Scatter(x=rdf["GAME_DATE"], y=rdf["NET_RATING"], mode="lines",
+                                              name=f"近 {w} 场净效率"))
+            fig_roll.add_hline(y=0, line_dash="dot", line_color="#9CA3AF")
+            fig_roll.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color='white',
+                                   margin=dict(t=20, b=20), legend=dict(orientation="h"))
+            st.plotly_chart(fig_roll, use_container_width=True)
+
+            # 每个指标扫描全部切分日期，列出前后变化最大的点
+            rows = []
+            for metric in CHANGE_METRICS:
+                cp = team_form.change_points(metric, top=1)
+                if not cp.empty:
+                    r = cp.iloc[0]
+                    rows.append({"指标": metric, "拐点日期": pd.Timestamp(r["SPLIT_DATE"]).strftime("%Y-%m-%d"),
+                                 "之前": r["BEFORE"], "之后": r["AFTER"], "变化": r["DELTA"],
+                                 "场次 (前/后)": f"{r['GAMES_BEFORE']} / {r['GAMES_AFTER']}"})
+            if rows:
+                st.dataframe(pd.DataFrame(rows).style.format({"之前": "{:.3f}", "之后": "{:.3f}", "变化": "{:+.3f}"}),
+                             hide_index=True, use_container_width=True)
+            else:
+                st.info("场次太少，暂无拐点")
+
         # ==========================================
         # 5. Phase 3: AI 战报与导出
         # ==========================================
@@ -1,10 +1,17 @@
+import sys
+from io import BytesIO
+from pathlib import Path
 import streamlit as st
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib as mpl
 from math import pi
-from nba_api.stats.endpoints import leaguedashplayerstats, leaguehustlestatsplayer
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from data.percentile_cube import build_cube
 
 # ==========================================
 # 0. 全局配置与字体修复 (Global Config)
@@ -29,6 +36,9 @@ TEAM_COLORS = {
     'DEFAULT': '#00FF00'
 }
 
+# 百分位比较人群
+GROUPING_LABELS = {'LEAGUE': '全联盟', 'POSITION': '同位置', 'MIN_BAND': '同出场时间档'}
+
 # 核心分析指标映射 (雷达图用)
 METRICS_MAP = {
     'PTS': '得分产量 (PTS)',
@@ -44,65 +54,14 @@ METRICS_MAP = {
 # 1. 数据引擎 (Data Engine)
 # ==========================================
 
-@st.cache_data(ttl=3600)
-def load_and_process_data(season='2024-25'):
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_cube():
     """
-    全量获取数据：Base + Advanced + Hustle
+    多赛季百分位立方体：往季读本地 npz，缺失赛季并发拉取 (Base + Advanced + Hustle + 位置)，
+    全联盟 / 同位置 / 同时间档三种百分位一次算好；之后切换赛季或人群只是数组切片
     """
-    with st.spinner(f'正在构建数据军火库 ({season})...这需要请求3次NBA官网接口...'):
-        try:
-            # 1. Base Stats
-            base = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season, per_mode_detailed='PerGame', measure_type_detailed_defense='Base'
-            ).get_data_frames()[0]
-
-            # 2. Advanced Stats
-            adv = leaguedashplayerstats.LeagueDashPlayerStats(
-                season=season, per_mode_detailed='PerGame', measure_type_detailed_defense='Advanced'
-            ).get_data_frames()[0]
-
-            # 3. Hustle Stats
-            hustle = leaguehustlestatsplayer.LeagueHustleStatsPlayer(
-                season=season, per_mode_time='PerGame'
-            ).get_data_frames()[0]
-
-            # --- 合并逻辑 ---
-            # Base + Adv
-            df = pd.merge(base, adv[['PLAYER_ID', 'AST_PCT', 'USG_PCT', 'TS_PCT']], on='PLAYER_ID', how='inner')
-
-            # + Hustle (注意：Hustle数据可能缺失，用left join并填充0)
-            hustle_cols = ['PLAYER_ID', 'DEFLECTIONS', 'CONTESTED_SHOTS', 'SCREEN_ASSISTS', 'LOOSE_BALLS_RECOVERED',
-                           'BOX_OUTS']
-            # 检查接口返回的列名是否存在，防止报错
-            available_hustle_cols = [col for col in hustle_cols if col in hustle.columns]
-
-            df = pd.merge(df, hustle[available_hustle_cols], on='PLAYER_ID', how='left')
-            df[available_hustle_cols] = df[available_hustle_cols].fillna(0)
-
-            # --- 清洗 ---
-            df = df[(df['GP'] > 5) & (df['MIN'] > 12)].copy()  # 至少打5场，场均12分钟
-
-            # --- 计算高阶指标 ---
-            league_avg_ts = df['TS_PCT'].mean()
-            df['rTS%'] = (df['TS_PCT'] - league_avg_ts) * 100
-
-            # 计算综合拼搏分 (Hustle Score) = 截断 + 干扰 + 掩护助攻 + 救球 + 卡位
-            # 如果某些列不存在则忽略
-            hustle_factors = ['DEFLECTIONS', 'CONTESTED_SHOTS', 'SCREEN_ASSISTS', 'LOOSE_BALLS_RECOVERED', 'BOX_OUTS']
-            valid_factors = [c for c in hustle_factors if c in df.columns]
-            df['HUSTLE_SCORE'] = df[valid_factors].sum(axis=1)
-
-            # 计算百分位排名
-            rank_cols = ['PTS', 'rTS%', 'AST_PCT', 'USG_PCT', 'DEFLECTIONS', 'CONTESTED_SHOTS', 'HUSTLE_SCORE']
-            for col in rank_cols:
-                if col in df.columns:
-                    df[f'{col}_RANK'] = df[col].rank(pct=True) * 100
-
-            return df, league_avg_ts
-
-        except Exception as e:
-            st.error(f"数据获取失败: {e}")
-            return pd.DataFrame(), 0
+    with st.spinner('正在构建多赛季数据军火库 (首次需要请求NBA官网接口)...'):
+        return build_cube()
 
 
 # ==========================================
@@ -218,6 +177,51 @@ def plot_hustle_leaderboard(df):
     return fig
 
 
+# ==========================================
+# 2.5 图表缓存 (按球员/球员组合缓存渲染好的 PNG)
+# ==========================================
+
+def player_options(season):
+    """排好序的球员下拉选项 (每赛季建一次)"""
+    return load_cube().names(season)
+
+
+def player_record(season, name, grouping):
+    """姓名 -> 行号索引直接取单行，不扫描整表"""
+    cube = load_cube()
+    row = cube.locate(season, name)
+    return cube.record(row, grouping) if row is not None else None
+
+
+def render_png(fig):
+    # 渲染成 PNG 字节后立即释放 Figure，缓存里只留图片
+    buf = BytesIO()
+    fig.savefig(buf, format='png', dpi=200, bbox_inches='tight', facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def radar_png(season, name, grouping):
+    data = player_record(season, name, grouping)
+    return render_png(plot_radar(data, name, data['TEAM_ABBREVIATION']))
+
+
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def butterfly_png(s1, p1_name, s2, p2_name, grouping):
+    p1_data, p2_data = player_record(s1, p1_name, grouping), player_record(s2, p2_name, grouping)
+    if s1 != s2:
+        p1_name, p2_name = f"{p1_name} ({s1})", f"{p2_name} ({s2})"
+    return render_png(plot_butterfly(p1_data, p2_data, p1_name, p2_name))
+
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def hustle_png(season):
+    # 只取榜单上的 10 行，不再为整个赛季拼宽表
+    cube = load_cube()
+    return render_png(plot_hustle_leaderboard(cube.rows(cube.hustle_leaders(season))))
+
+
 # ==========================================
 # 3. 主程序逻辑 (App Layout)
 # ==========================================
@@ -228,12 +232,13 @@ def main():
     page = st.sidebar.radio("选择分析模块", ["1. 球员全息画像", "2. 巅峰对决 (PK)", "3. 蓝领拼搏榜"])
 
     # 加载数据
-    season = st.sidebar.selectbox("赛季", ['2024-25', '2023-24'])
-    df, avg_ts = load_and_process_data(season)
-
-    if df.empty:
+    cube = load_cube()
+    if not cube.seasons:
         st.warning("暂无数据，请检查网络或等待重试。")
         return
+    seasons = cube.seasons[::-1]
+    season = st.sidebar.selectbox("赛季", seasons)
+    grouping = st.sidebar.radio("百分位比较人群", list(GROUPING_LABELS), format_func=GROUPING_LABELS.get)
 
     # --- 页面 1: 球员全息画像 ---
     if page == "1. 球员全息画像":
@@ -241,16 +246,15 @@ def main():
         col_sel, col_empty = st.columns([1, 2])
         with col_sel:
             # 智能搜索
-            player_list = sorted(df['PLAYER_NAME'].unique())
+            player_list = player_options(season)
             default_idx = player_list.index('Luka Doncic') if 'Luka Doncic' in player_list else 0
             selected_player = st.selectbox("搜索球员", player_list, index=default_idx)
 
-        player_stats = df[df['PLAYER_NAME'] == selected_player].iloc[0]
+        player_stats = player_record(season, selected_player, grouping)
 
         c1, c2 = st.columns([1, 1])
         with c1:
-            fig = plot_radar(player_stats, selected_player, player_stats['TEAM_ABBREVIATION'])
-            st.pyplot(fig)
+            st.image(radar_png(season, selected_player, grouping), use_container_width=True)
         with c2:
             st.subheader("数据解读")
             st.markdown(f"""
@@ -264,19 +268,18 @@ def main():
     # --- 页面 2: 巅峰对决 ---
     elif page == "2. 巅峰对决 (PK)":
         st.header("⚔️ 球员对比系统 (Butterfly Chart)")
-        player_list = sorted(df['PLAYER_NAME'].unique())
 
+        # 两名球员可以来自不同赛季 (跨赛季对比)，百分位取各自赛季内的人群
         c1, c2 = st.columns(2)
         with c1:
-            p1_name = st.selectbox("选择球员 A (左 - 蓝色)", player_list, index=0)
+            s1 = st.selectbox("球员 A 赛季", seasons, index=0)
+            p1_name = st.selectbox("选择球员 A (左 - 蓝色)", player_options(s1), index=0)
         with c2:
-            p2_name = st.selectbox("选择球员 B (右 - 红色)", player_list, index=1)
+            s2 = st.selectbox("球员 B 赛季", seasons, index=0)
+            p2_name = st.selectbox("选择球员 B (右 - 红色)", player_options(s2), index=1)
 
         if p1_name and p2_name:
-            p1_data = df[df['PLAYER_NAME'] == p1_name].iloc[0]
-            p2_data = df[df['PLAYER_NAME'] == p2_name].iloc[0]
-
-            st.pyplot(plot_butterfly(p1_data, p2_data, p1_name, p2_name))
+            st.image(butterfly_png(s1, p1_name, s2, p2_name, grouping), use_container_width=True)
 
             st.success(
                 f"📊 分析师视角：对比 {p1_name} 和 {p2_name} 在组织(AST%)和防守侵略性(Deflections)上的差异，是判断核心风格的关键。")
@@ -286,12 +289,14 @@ def main():
         st.header("🛡️ 寻找被低估的蓝领英雄")
         st.markdown("**筛选标准：** 场均得分 < 20分，但拼搏指数 (截断+干扰+掩护+救球) 极高的球员。")
 
-        fig = plot_hustle_leaderboard(df)
-        st.pyplot(fig)
+        st.image(hustle_png(season), use_container_width=True)
 
         st.markdown("### 📝 视频选题推荐")
-        top_guy = df[(df['PTS'] < 20)].nlargest(1, 'HUSTLE_SCORE').iloc[0]
-        st.write(f"👉 **本赛季最大的防守遗珠：{top_guy['PLAYER_NAME']}**。他不占球权，但干了所有的脏活累活。")
+        cube = load_cube()
+        leaders = cube.hustle_leaders(season, n=1)
+        if len(leaders):
+            top_guy = cube.record(int(leaders[0]))
+            st.write(f"👉 **本赛季最大的防守遗珠：{top_guy['PLAYER_NAME']}**。他不占球权，但干了所有的脏活累活。")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,104 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from data.cache import TTLCache, atomic_write, singleton
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.get_or_load("a", lambda: 2) == 2
+
+def test_ttl_cache_evicts_oldest_first():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2 and cache.get("c") == 3
+
+def test_get_or_load_error_is_not_cached():
+    cache = TTLCache(ttl=60)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("a", fail)
+    assert cache.get_or_load("a", lambda: 1) == 1
+    assert cache.stats()["loads"] == 2
+
+def test_singleton_creates_once():
+    created = []
+
+    def factory():
+        created.append(1)
+        time.sleep(0.01)
+        return object()
+
+    get = singleton(factory)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        instances = list(pool.map(lambda _: get(), range(32)))
+    assert len(created) == 1
+    assert all(i is instances[0] for i in instances)
+
+def test_singleton_retries_after_failure():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("not ready")
+        return "ok"
+
+    get = singleton(factory)
+    with pytest.raises(OSError):
+        get()
+    assert get() == "ok"
+
+def test_atomic_write_replaces_and_keeps_suffix(tmp_path):
+    target = tmp_path / "2024-25.npz"
+    seen = []
+
+    def write(tmp):
+        seen.append(tmp)
+        tmp.write_text("new")
+
+    target.write_text("old")
+    atomic_write(target, write)
+    assert target.read_text() == "new"
+    assert seen[0].suffix == ".npz" and seen[0] != target
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2024-25.npz"]
+
+def test_atomic_write_failure_keeps_old_file(tmp_path):
+    target = tmp_path / "index.json"
+    target.write_text("old")
+
+    def write(tmp):
+        tmp.write_text("partial")
+        raise ValueError("disk full")
+
+    with pytest.raises(ValueError):
+        atomic_write(target, write)
+    assert target.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["index.json"]
+
+def test_atomic_write_concurrent_writers(tmp_path):
+    target = tmp_path / "manifest.json"
+    barrier = threading.Barrier(8)
+
+    def write(i):
+        def writer(tmp):
+            tmp.write_text(str(i) * 1000)
+            barrier.wait(5)
+        atomic_write(target, writer)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(8)))
+    text = target.read_text()
+    assert len(set(text)) == 1 and len(text) == 1000
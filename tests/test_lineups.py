@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from logic.lineups import LineupIndex, parse_group_id
+
+def lineup_frame():
+    return pd.DataFrame([
+        {"GROUP_ID": "-1-2-", "GROUP_SIZE": 2, "TEAM_ID": 10, "MIN": 300, "NET_RATING": 5.0, "GROUP_NAME": "A - B"},
+        {"GROUP_ID": "-1-3-", "GROUP_SIZE": 2, "TEAM_ID": 10, "MIN": 50, "NET_RATING": 12.0, "GROUP_NAME": "A - C"},
+        {"GROUP_ID": "-1-2-3-", "GROUP_SIZE": 3, "TEAM_ID": 10, "MIN": 200, "NET_RATING": -3.0, "GROUP_NAME": "A - B - C"},
+        {"GROUP_ID": "-4-5-", "GROUP_SIZE": 2, "TEAM_ID": 20, "MIN": 400, "NET_RATING": np.nan, "GROUP_NAME": "D - E"},
+        {"GROUP_ID": "-1-4-", "GROUP_SIZE": 2, "TEAM_ID": 20, "MIN": 100, "NET_RATING": 1.0, "GROUP_NAME": "A - D"},
+    ])
+
+def test_parse_group_id():
+    assert parse_group_id("-201939-202691-").tolist() == [201939, 202691]
+    assert parse_group_id("").tolist() == []
+
+def test_postings():
+    index = LineupIndex.from_frame(lineup_frame())
+    assert len(index) == 5
+    assert index.rows_with_player(1).tolist() == [0, 1, 2, 4]
+    assert index.rows_with_player(99).tolist() == []
+    assert index.rows_of_team(20).tolist() == [3, 4]
+    assert index.players(2).tolist() == [1, 2, 3]
+
+def test_query_intersects_players_and_team():
+    index = LineupIndex.from_frame(lineup_frame())
+    assert index.query(players=[1, 2])["GROUP_ID"].tolist() == ["-1-2-", "-1-2-3-"]
+    assert index.query(players=[1], team_id=20)["GROUP_ID"].tolist() == ["-1-4-"]
+    assert index.query(players=[2, 4]).empty
+
+def test_query_filters_and_sorts():
+    index = LineupIndex.from_frame(lineup_frame())
+    out = index.query(players=[1], size=2, min_minutes=60)
+    assert out["GROUP_ID"].tolist() == ["-1-2-", "-1-4-"]
+    # NaN 无论升降序都排在最后
+    assert index.query()["GROUP_ID"].tolist()[-1] == "-4-5-"
+    assert index.query(ascending=True)["GROUP_ID"].tolist()[-1] == "-4-5-"
+    assert index.query(sort="MIN", limit=2)["GROUP_ID"].tolist() == ["-4-5-", "-1-2-"]
+    # 缺失的指标列为 NaN，整数列为 0
+    assert np.isnan(out["PACE"]).all()
+    assert (out["GP"] == 0).all()
+
+def test_arrays_round_trip(tmp_path):
+    index = LineupIndex.from_frame(lineup_frame())
+    np.savez(tmp_path / "lineups.npz", **index.to_arrays())
+    with np.load(tmp_path / "lineups.npz") as arrays:
+        loaded = LineupIndex.from_arrays({k: arrays[k] for k in arrays.files})
+    pd.testing.assert_frame_equal(loaded.query(players=[1]), index.query(players=[1]))
+
+def test_empty_frame():
+    index = LineupIndex.from_frame(pd.DataFrame(columns=["GROUP_ID", "GROUP_SIZE", "TEAM_ID"]))
+    assert len(index) == 0
+    assert index.query(players=[1]).empty
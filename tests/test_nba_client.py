@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from data.cache import SingleFlight, TTLCache
+
+THREADS = 16
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+def run_gated(flight, keys, fn):
+    """每个 key 的发起者阻塞到所有调用方都排上队，保证请求确实是并发到达的"""
+    gate = threading.Event()
+    before = flight.stats()["calls"]
+
+    def call(key):
+        return flight.do(key, lambda: (gate.wait(5), fn(key))[1])
+
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        futures = [pool.submit(call, k) for k in keys]
+        wait_for(lambda: flight.stats()["calls"] - before == len(keys))
+        gate.set()
+    return futures
+
+def test_single_flight_one_request_per_key():
+    flight = SingleFlight()
+    keys = ["Base", "Advanced"] * (THREADS // 2)
+    futures = run_gated(flight, keys, lambda k: {"key": k})
+    results = [f.result() for f in futures]
+
+    stats = flight.stats()
+    assert stats["requests"] == 2
+    assert stats["coalesced"] == THREADS - 2
+    assert stats["in_flight"] == 0
+    assert sum(shared for _, shared in results) == THREADS - 2
+    for key, (value, _) in zip(keys, results):
+        assert value == {"key": key}
+    # 同一个 key 的调用方共享同一个结果对象
+    assert len({id(v) for k, (v, _) in zip(keys, results) if k == "Base"}) == 1
+
+def test_single_flight_coalesced_grows_with_sessions():
+    flight = SingleFlight()
+    for rounds, n in enumerate((2, 4, 8), start=1):
+        run_gated(flight, ["Base"] * n, lambda k: k)
+        assert flight.stats()["requests"] == rounds
+    assert flight.stats()["coalesced"] == (2 - 1) + (4 - 1) + (8 - 1)
+
+def test_single_flight_leader_error_reaches_all_waiters():
+    flight = SingleFlight()
+
+    def boom(key):
+        raise RuntimeError(f"upstream failed: {key}")
+
+    futures = run_gated(flight, ["Base"] * THREADS, boom)
+    for f in futures:
+        with pytest.raises(RuntimeError, match="upstream failed: Base"):
+            f.result()
+    stats = flight.stats()
+    assert stats["requests"] == 1
+    assert stats["in_flight"] == 0
+    # 失败不留在途记录，下一次调用重新发起请求
+    assert flight.do("Base", lambda: "ok") == ("ok", False)
+
+def test_ttl_cache_get_or_load_runs_one_loader():
+    cache = TTLCache(ttl=60)
+    calls = []
+    gate = threading.Event()
+
+    def loader():
+        calls.append(1)
+        gate.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        futures = [pool.submit(cache.get_or_load, "key", loader) for _ in range(THREADS)]
+        wait_for(lambda: cache._flight.stats()["calls"] == THREADS)
+        gate.set()
+    values = [f.result() for f in futures]
+    assert len(calls) == 1
+    assert all(v is values[0] for v in values)
+    assert cache.get_or_load("key", loader) is values[0]
+    assert len(calls) == 1
+
+def test_fetch_frames_coalesces_and_copies(monkeypatch):
+    pd = pytest.importorskip("pandas")
+    from data import nba_client
+    from data.ratelimit import TokenBucket
+
+    flight = SingleFlight()
+    monkeypatch.setattr(nba_client, "_FLIGHT", flight)
+    monkeypatch.setattr(nba_client, "get_limiter", lambda host: TokenBucket(1000, 1000))
+    gate = threading.Event()
+    created = []
+
+    class FakeEndpoint:
+        def __init__(self, **params):
+            created.append(params)
+            gate.wait(5)
+            self.params = params
+
+        def get_data_frames(self):
+            return [pd.DataFrame([{"PTS": 1.0}])]
+
+    def call(i):
+        # timeout 不参与去重
+        return nba_client.fetch_frames(FakeEndpoint, season="2024-25", timeout=i)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        futures = [pool.submit(call, i) for i in range(THREADS)]
+        wait_for(lambda: flight.stats()["calls"] == THREADS)
+        gate.set()
+    frames = [f.result()[0] for f in futures]
+
+    assert len(created) == 1
+    assert flight.stats()["coalesced"] == THREADS - 1
+    assert len({id(df) for df in frames}) == THREADS
+    frames[0]["PTS"] = 99.0
+    assert all(df["PTS"].iloc[0] == 1.0 for df in frames[1:])
+
+def test_fetch_frames_error_propagates(monkeypatch):
+    pytest.importorskip("pandas")
+    from data import nba_client
+    from data.ratelimit import TokenBucket
+
+    monkeypatch.setattr(nba_client, "_FLIGHT", SingleFlight())
+    monkeypatch.setattr(nba_client, "get_limiter", lambda host: TokenBucket(1000, 1000))
+
+    class BrokenEndpoint:
+        def __init__(self, **params):
+            raise ValueError("bad params")
+
+    with pytest.raises(ValueError, match="bad params"):
+        nba_client.fetch_frames(BrokenEndpoint, season="2024-25")
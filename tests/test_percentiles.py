@@ -0,0 +1,63 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from logic.percentiles import GROUPINGS, RANK_COLS, band_labels, minutes_band, percentile_ranks, position_group
+
+def test_position_group():
+    pos = pd.Series(["G", "F-C", "C-F", "G-F", "F", None, ""])
+    assert position_group(pos).tolist() == ["Guard", "Center", "Center", "Forward", "Forward", "Forward", "Forward"]
+
+def test_minutes_band_edges():
+    bands = minutes_band(pd.Series([12.0, 19.9, 20.0, 33.9, 34.0, 48.0, 52.5]))
+    labels = band_labels()
+    # 区间左闭右开，最后一档不设上限 (加时赛可能让场均超过 48 分钟)
+    assert bands.tolist() == [labels[0], labels[0], labels[1], labels[2], labels[3], labels[3], labels[3]]
+
+def test_percentile_ranks_by_grouping():
+    df = pd.DataFrame({
+        "PTS": [10.0, 20.0, 30.0, 40.0],
+        "POSITION": ["Guard", "Guard", "Center", "Center"],
+        "MIN_BAND": ["12-20", "20-28", "20-28", "34-48"],
+    })
+    ranks = percentile_ranks(df)
+    assert set(ranks) == set(GROUPINGS)
+    for grouping in GROUPINGS:
+        assert ranks[grouping].shape == (4, len(RANK_COLS))
+        assert ranks[grouping].dtype == np.float32
+    pts = RANK_COLS.index("PTS")
+    assert ranks["LEAGUE"][:, pts].tolist() == [25, 50, 75, 100]
+    assert ranks["POSITION"][:, pts].tolist() == [50, 100, 50, 100]
+    assert ranks["MIN_BAND"][:, pts].tolist() == [100, 50, 100, 100]
+    # 缺失的指标列记 NaN
+    assert np.isnan(ranks["LEAGUE"][:, RANK_COLS.index("USG_PCT")]).all()
+
+def cube_block(names, pts, hustle):
+    from data.percentile_cube import INFO_COLS, VALUE_COLS
+
+    n = len(names)
+    block = {c: np.array(["-"] * n) for c in INFO_COLS if c != "PLAYER_ID"}
+    block["PLAYER_NAME"] = np.array(names)
+    block["PLAYER_ID"] = np.arange(n, dtype=np.int64)
+    values = np.zeros((n, len(VALUE_COLS)), dtype=np.float32)
+    values[:, VALUE_COLS.index("PTS")] = pts
+    values[:, VALUE_COLS.index("HUSTLE_SCORE")] = hustle
+    block["values"] = values
+    block["ranks"] = np.zeros((len(GROUPINGS), n, len(RANK_COLS)), dtype=np.float32)
+    block["league_ts"] = np.array([0.57])
+    return block
+
+def test_cube_hustle_leaders():
+    pytest.importorskip("nba_api")
+    from data.percentile_cube import PercentileCube
+
+    cube = PercentileCube({
+        "2023-24": cube_block(["A", "B"], [10, 12], [30, 40]),
+        "2024-25": cube_block(["C", "D", "E", "F"], [25, 8, 15, 5], [50, 20, 35, 35]),
+    })
+    rows = cube.hustle_leaders("2024-25", n=3)
+    # 得分 >= 20 的 C 被排除；同分按原顺序
+    assert cube.rows(rows)["PLAYER_NAME"].tolist() == ["E", "F", "D"]
+    assert cube.record(int(cube.hustle_leaders("2024-25", n=1)[0]))["PLAYER_NAME"] == "E"
+    assert len(cube.hustle_leaders("1999-00")) == 0
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from data.ratelimit import TokenBucket, get_limiter, is_throttle_error, retry_after, set_limit
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class HTTPError(Exception):
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+def test_burst_then_steady_rate():
+    bucket = TokenBucket(rate=20, burst=3)
+    waits = [bucket.acquire() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(0.05, abs=0.02)
+    assert bucket.stats()["throttled"] == 2
+
+def test_queued_threads_are_spaced_out():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.acquire()
+    start = time.monotonic()
+    done = []
+    lock = threading.Lock()
+
+    def worker():
+        bucket.acquire()
+        with lock:
+            done.append(time.monotonic() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 预扣令牌：排队的调用依次顺延 0.1s，不会同时醒来
+    assert sorted(done) == pytest.approx([0.1, 0.2, 0.3, 0.4], abs=0.05)
+
+def test_penalize_halves_rate_and_pauses():
+    bucket = TokenBucket(rate=8, burst=4)
+    bucket.penalize(retry_after=0.2)
+    assert bucket.rate == 4
+    wait = bucket.acquire()
+    # 暂停 0.2s 后令牌为 0，再等一个令牌 (1/4s)
+    assert wait == pytest.approx(0.2 + 0.25, abs=0.03)
+
+def test_penalize_never_goes_below_min_rate():
+    bucket = TokenBucket(rate=8, min_rate=2)
+    for _ in range(5):
+        bucket.penalize(retry_after=0)
+    assert bucket.rate == 2
+
+def test_reward_recovers_to_max_rate():
+    bucket = TokenBucket(rate=10, recover_step=3)
+    bucket.penalize(retry_after=0)
+    for _ in range(5):
+        bucket.reward()
+    assert bucket.rate == 10
+
+def test_limiters_are_shared_per_host():
+    assert get_limiter("https://a.espncdn.com/i/x.png") is get_limiter("a.espncdn.com")
+    replaced = set_limit("example.test", rate=5, burst=2)
+    assert get_limiter("http://example.test/path") is replaced
+    assert replaced.burst == 2
+
+def test_throttle_errors():
+    assert is_throttle_error(HTTPError(FakeResponse(429)))
+    assert is_throttle_error(HTTPError(FakeResponse(503)))
+    assert not is_throttle_error(HTTPError(FakeResponse(404)))
+    assert is_throttle_error(TimeoutError())
+    assert retry_after(HTTPError(FakeResponse(429, {"Retry-After": "3"}))) == 3.0
+    assert retry_after(HTTPError(FakeResponse(429, {"Retry-After": "soon"}))) is None
+    assert retry_after(ValueError()) is None
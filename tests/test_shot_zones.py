@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from logic.shot_zones import summary, zone_profile, zone_ranks
+
+def split(team_id, bucket, fgm, fga, fg3m=0, fg3a=0):
+    return {"TEAM_ID": team_id, "GROUP_VALUE": bucket, "FGM": fgm, "FGA": fga, "FG3M": fg3m, "FG3A": fg3a}
+
+def league_shots():
+    return pd.DataFrame([
+        split(1, "Less Than 5 ft.", 30, 50),
+        split(1, "10-14 ft.", 4, 10),
+        split(1, "15-19 ft.", 6, 10),
+        split(1, "25-29 ft.", 12, 30, 12, 30),
+        split(2, "Less Than 5 ft.", 20, 40),
+        split(2, "20-24 ft.", 10, 25, 5, 10),
+        split(2, "Back Court Shot", 0, 5),
+    ])
+
+def test_zone_profile_weights_by_attempts():
+    profile = zone_profile(league_shots())
+    assert sorted(profile.index) == [1, 2]
+    one = profile.loc[1]
+    # 10-14 与 15-19 合并为 MID：(4 + 6) / (10 + 10)，不是两个命中率的平均
+    assert one["MID_FGA"] == 20
+    assert one["MID_FG_PCT"] == pytest.approx(0.5)
+    assert one["FGA"] == 100
+    assert one["RIM_FREQ"] == pytest.approx(0.5)
+    assert one["FG3_PCT"] == pytest.approx(0.4)
+    assert one["FG3A_FREQ"] == pytest.approx(0.3)
+
+def test_zone_profile_missing_zones():
+    two = zone_profile(league_shots()).loc[2]
+    # 未映射的分段不计入；没有出手的区域命中率为 NaN、出手为 0
+    assert two["FGA"] == 65
+    assert two["PAINT_FGA"] == 0
+    assert np.isnan(two["PAINT_FG_PCT"])
+    assert two["LONG_FG_PCT"] == pytest.approx(0.4)
+
+def test_zone_profile_empty():
+    assert zone_profile(pd.DataFrame()).empty
+    assert zone_profile(None).empty
+    assert "RIM_FG_PCT" in zone_profile(pd.DataFrame()).columns
+
+def test_zone_ranks_highest_first():
+    ranks = zone_ranks(zone_profile(league_shots()))
+    # 2 队篮下出手占比 40 / 65 高于 1 队的 50 / 100
+    assert ranks.loc[2, "RIM_FREQ"] == 1
+    assert ranks.loc[1, "RIM_FREQ"] == 2
+    assert ranks.loc[2, "FG3_PCT"] == 1
+    assert list(ranks.columns) == list(zone_profile(league_shots()).columns)
+
+def test_summary_drops_missing_values():
+    out = summary(zone_profile(league_shots()).loc[2])
+    assert out["Rim FG%"] == pytest.approx(0.5)
+    assert "Mid FG%" not in out
+    assert set(out) <= {"Rim FG%", "Rim Freq", "Mid FG%", "Mid Freq", "3P FG%", "3P Freq"}
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from logic.team_form import BOX_COLS, TeamFormEngine, with_opponents
+
+def league_logs(games, start="2024-10-22"):
+    """两队互打 games 场：1 队每场 110 分，2 队每场 100 分 (从第 games//2 场起 2 队改为 120 分)"""
+    rows = []
+    for g in range(games):
+        day = pd.Timestamp(start) + pd.Timedelta(days=2 * g)
+        for tid, pts in ((1, 110), (2, 100 if g < games // 2 else 120)):
+            row = {c: 10.0 for c in BOX_COLS}
+            row.update(GAME_ID=f"G{g:04d}", TEAM_ID=tid, GAME_DATE=day, PTS=float(pts), MIN=240.0,
+                       FGA=80.0, FGM=40.0, FG3M=10.0, FTA=20.0, FTM=15.0, OREB=10.0, DREB=30.0, TOV=12.0)
+            rows.append(row)
+    df = pd.DataFrame(rows)
+    df["WL"] = np.where(df.groupby("GAME_ID")["PTS"].rank(ascending=False) == 1, "W", "L")
+    return with_opponents(df)
+
+def test_with_opponents_pairs_each_game():
+    df = league_logs(4)
+    assert len(df) == 8
+    assert (df["TEAM_ID"] != df["OPP_TEAM_ID"]).all()
+    own = df[df["TEAM_ID"] == 1]
+    assert (own["OPP_PTS"] == 100).sum() == 2
+
+def test_summarize_matches_counts():
+    form = TeamFormEngine(league_logs(10), team_id=1)
+    season = form.season()
+    assert len(form) == 10
+    assert season["GP"] == 10
+    assert season["PTS"] == pytest.approx(110)
+    assert season["PLUS_MINUS"] == pytest.approx(0)
+    assert season["EFG_PCT"] == pytest.approx((40 + 5) / 80)
+    assert season["FT_PER_FGA"] == pytest.approx(15 / 80)
+    assert form.last_n(3)["GP"] == 3
+    assert form.summarize(5, 5) is None
+
+def test_date_range_includes_end_date():
+    form = TeamFormEngine(league_logs(10), team_id=1)
+    out = form.date_range("2024-10-22", "2024-10-26")
+    assert out["GP"] == 3
+
+def test_append_only_takes_newer_games():
+    logs = league_logs(10)
+    form = TeamFormEngine(logs[logs["GAME_DATE"] < "2024-11-01"], team_id=1)
+    assert len(form) == 5
+    assert form.append_games(logs) == 5
+    assert form.append_games(logs) == 0
+    assert form.season() == pytest.approx(TeamFormEngine(logs, team_id=1).season())
+
+def test_rolling_and_change_points():
+    form = TeamFormEngine(league_logs(20), team_id=1)
+    rolling = form.rolling(5)
+    assert len(rolling) == 20
+    assert rolling["NET_RATING"].iloc[-1] < rolling["NET_RATING"].iloc[4]
+    cp = form.change_points("NET_RATING", min_games=4, top=1)
+    assert int(cp["GAMES_BEFORE"].iloc[0]) == 10
+    assert cp["DELTA"].iloc[0] < 0
+
+def test_change_points_need_enough_games():
+    form = TeamFormEngine(league_logs(6), team_id=1)
+    assert form.change_points(min_games=4).empty
+
+def test_reads_use_one_snapshot_while_appending():
+    logs = league_logs(40)
+    form = TeamFormEngine(logs.iloc[:2], team_id=1)
+    days = sorted(logs["GAME_DATE"].unique())
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            try:
+                frame = form.rolling(5)
+                assert frame["GAME_DATE"].notna().all()
+                form.change_points(min_games=2)
+                form.season()
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for day in days[1:]:
+        form.append_games(logs[logs["GAME_DATE"] <= day])
+    done.set()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(form) == 40